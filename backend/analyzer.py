@@ -1,112 +1,234 @@
+import numpy as np
 import pandas as pd
 import json
-from typing import Dict
+from typing import Dict, Optional
+
+from .columnar import load_columns
+from .incremental import ANALYSIS_COLUMNS
+from .metrics import span
+
+
+GROUP_STAT_COLUMNS = [
+    'count', 'attrition', 'attrition_rate', 'income_mean', 'income_median', 'income_std',
+    'skill_mean', 'required_skill_mean',
+]
+
+
+# Up to this many groups, medians use one np.partition per group on the
+# grouped values; above it a single lexsort is cheaper than the Python loop
+PARTITION_MEDIAN_MAX_GROUPS = 256
+
+
+def _group_codes(keys: pd.Series):
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        return keys.cat.codes.to_numpy(), keys.cat.categories
+    codes, uniques = pd.factorize(keys, sort=True)
+    if len(uniques) < np.iinfo(np.int32).max:
+        codes = codes.astype(np.int32)
+    return codes, pd.Index(uniques)
+
+
+def _group_medians(codes: np.ndarray, values: np.ndarray, n: np.ndarray) -> np.ndarray:
+    medians = np.full(len(n), np.nan)
+    starts = np.concatenate(([0], np.cumsum(n)[:-1]))
+    if len(n) <= PARTITION_MEDIAN_MAX_GROUPS:
+        # Stable argsort of small integer codes is a radix sort
+        grouped = values[np.argsort(codes, kind='stable')]
+        for g in np.flatnonzero(n):
+            chunk = grouped[starts[g]:starts[g] + n[g]]
+            lo, hi = (n[g] - 1) // 2, n[g] // 2
+            part = np.partition(chunk, [lo, hi])
+            medians[g] = (part[lo] + part[hi]) / 2
+        return medians
+    ordered = values[np.lexsort((values, codes))]
+    has = n > 0
+    lo = starts + np.maximum(n - 1, 0) // 2
+    hi = starts + n // 2
+    medians[has] = (ordered[lo[has]] + ordered[hi[has]]) / 2
+    return medians
+
+
+def _take(values: np.ndarray, mask: Optional[np.ndarray]) -> np.ndarray:
+    # Boolean indexing copies the whole column, so skip it when nothing is masked
+    return values if mask is None else values[mask]
+
+
+def _mask(mask: np.ndarray) -> Optional[np.ndarray]:
+    return None if mask.all() else mask
+
+
+def _group_mean(idx: np.ndarray, values: np.ndarray, n_groups: int):
+    present = _mask(~np.isnan(values))
+    idx = _take(idx, present)
+    n = np.bincount(idx, minlength=n_groups)
+    total = np.bincount(idx, weights=_take(values, present), minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return total / n, n, present
+
+
+def group_stats(df: pd.DataFrame, by: str) -> pd.DataFrame:
+    """Every per-group worker statistic in one vectorized sweep.
+
+    Rows are bucketed by integer group code and reduced with ``np.bincount``,
+    so there is no Python work per group and high-cardinality keys (e.g.
+    per-manager or per-site) cost the same as Department. Groups with no
+    rows or a missing key are omitted.
+    """
+    codes, labels = _group_codes(df[by])
+    keep = _mask(codes >= 0)
+    codes = _take(codes, keep)
+    # bincount wants intp; keep the narrow codes too for the radix argsort
+    idx = codes.astype(np.intp)
+    n_groups = len(labels)
+    count = np.bincount(idx, minlength=n_groups)
+    attrition = np.bincount(idx, weights=_take((df['Attrition'] == 'Yes').to_numpy(), keep), minlength=n_groups)
+
+    income = _take(df['MonthlyIncome'].to_numpy(np.float64), keep)
+    income_mean, income_n, present = _group_mean(idx, income, n_groups)
+    income, idx_income = _take(income, present), _take(idx, present)
+    # Two-pass variance: subtract the group mean before squaring for stability
+    dev = income - income_mean[idx_income]
+    sq = np.bincount(idx_income, weights=dev * dev, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        income_std = np.sqrt(sq / (income_n - 1))
+        attrition_rate = attrition / count * 100
+    income_std[income_n < 2] = np.nan
+
+    income_median = _group_medians(_take(codes, present), income, income_n)
+
+    skill_mean = _group_mean(idx, _take(df['OperatorSkillScore'].to_numpy(np.float64), keep), n_groups)[0]
+    required_mean = _group_mean(idx, _take(df['RequiredSkillByRole'].to_numpy(np.float64), keep), n_groups)[0]
+
+    stats = pd.DataFrame({
+        'count': count,
+        'attrition': attrition.astype(np.int64),
+        'attrition_rate': attrition_rate,
+        'income_mean': income_mean,
+        'income_median': income_median,
+        'income_std': income_std,
+        'skill_mean': skill_mean,
+        'required_skill_mean': required_mean,
+    }, index=pd.Index(labels, name=by), columns=GROUP_STAT_COLUMNS)
+    return stats[count > 0]
 
 
 def analyze_dairy_data(dataset_path: str) -> Dict:
-    df = pd.read_csv(dataset_path)
-
-    total_employees = len(df)
-    attrition_rate = (df['Attrition'] == 'Yes').sum() / total_employees * 100
-    avg_age = df['Age'].mean()
-    avg_monthly_income = df['MonthlyIncome'].mean()
-    avg_years_at_company = df['YearsAtCompany'].mean()
-
-    department_dist = df['Department'].value_counts().to_dict()
-    job_role_dist = df['JobRole'].value_counts().to_dict()
-    gender_dist = df['Gender'].value_counts().to_dict()
-    marital_dist = df['MaritalStatus'].value_counts().to_dict()
-
-    avg_skill_score = df['OperatorSkillScore'].mean()
-    avg_required_skill = df['RequiredSkillByRole'].mean()
-    skill_gap = avg_required_skill - avg_skill_score
-
-    education_field_dist = df['EducationField'].value_counts().to_dict()
-    job_satisfaction_dist = df['JobSatisfaction'].value_counts().sort_index().to_dict()
-
-    salary_by_dept = df.groupby('Department')['MonthlyIncome'].agg(['mean', 'median', 'std']).to_dict('index')
-    salary_by_role = df.groupby('JobRole')['MonthlyIncome'].mean().sort_values(ascending=False).head(10).to_dict()
-
-    training_analysis = {
-        'avg_training_last_year': df['TrainingTimesLastYear'].mean(),
-        'total_training_sessions': df['TrainingTimesLastYear'].sum(),
-        'employees_needing_training': (df['TrainingTimesLastYear'] == 0).sum()
-    }
-
-    performance_metrics = {
-        'avg_performance_rating': df['PerformanceRating'].mean(),
-        'high_performers': (df['PerformanceRating'] >= 4).sum(),
-        'avg_job_involvement': df['JobInvolvement'].mean()
-    }
-
-    work_life_balance = df['WorkLifeBalance'].value_counts().sort_index().to_dict()
-
-    distance_analysis = {
-        'avg_distance': df['DistanceFromHome'].mean(),
-        'max_distance': df['DistanceFromHome'].max(),
-        'remote_workers': (df['DistanceFromHome'] > 30).sum()
-    }
-
-    overtime_analysis = df['OverTime'].value_counts().to_dict()
-    attrition_by_dept = df.groupby('Department')['Attrition'].apply(lambda x: (x == 'Yes').sum()).to_dict()
-    attrition_rate_by_dept = df.groupby('Department').apply(lambda x: (x['Attrition'] == 'Yes').sum() / len(x) * 100).to_dict()
-
-    tenure_analysis = {
-        'avg_years_at_company': df['YearsAtCompany'].mean(),
-        'avg_years_in_role': df['YearsInCurrentRole'].mean(),
-        'avg_years_since_promotion': df['YearsSinceLastPromotion'].mean(),
-        'avg_years_with_manager': df['YearsWithCurrManager'].mean()
-    }
-
-    df['AgeGroup'] = pd.cut(df['Age'], bins=[0, 25, 35, 45, 55, 100], labels=['18-25', '26-35', '36-45', '46-55', '55+'])
-    age_group_dist = df['AgeGroup'].value_counts().to_dict()
-
-    df['IncomeGroup'] = pd.cut(
-        df['MonthlyIncome'],
-        bins=[0, 30000, 50000, 75000, 100000, float('inf')],
-        labels=['<30K', '30K-50K', '50K-75K', '75K-100K', '>100K']
-    )
-    income_group_dist = df['IncomeGroup'].value_counts().to_dict()
-
-    correlation_data = df[[
-        'Age', 'MonthlyIncome', 'YearsAtCompany', 'JobSatisfaction',
-        'EnvironmentSatisfaction', 'OperatorSkillScore', 'TotalWorkingYears'
-    ]].corr()
-
-    results = {
-        'summary': {
-            'total_employees': int(total_employees),
-            'attrition_rate': round(attrition_rate, 2),
-            'avg_age': round(avg_age, 2),
-            'avg_monthly_income': round(avg_monthly_income, 2),
-            'avg_years_at_company': round(avg_years_at_company, 2)
-        },
-        'department_distribution': department_dist,
-        'job_role_distribution': job_role_dist,
-        'gender_distribution': gender_dist,
-        'marital_status_distribution': marital_dist,
-        'skill_analysis': {
-            'avg_operator_skill': round(avg_skill_score, 3),
-            'avg_required_skill': round(avg_required_skill, 3),
-            'skill_gap': round(skill_gap, 3)
-        },
-        'education_field_distribution': education_field_dist,
-        'job_satisfaction_distribution': job_satisfaction_dist,
-        'salary_by_department': {k: {kk: round(vv, 2) for kk, vv in v.items()} for k, v in salary_by_dept.items()},
-        'salary_by_role': {k: round(v, 2) for k, v in salary_by_role.items()},
-        'training_analysis': {k: round(v, 2) if isinstance(v, float) else int(v) for k, v in training_analysis.items()},
-        'performance_metrics': {k: round(v, 2) for k, v in performance_metrics.items()},
-        'work_life_balance': work_life_balance,
-        'distance_analysis': {k: round(v, 2) if isinstance(v, float) else int(v) for k, v in distance_analysis.items()},
-        'overtime_analysis': overtime_analysis,
-        'attrition_by_department': attrition_by_dept,
-        'attrition_rate_by_department': {k: round(v, 2) for k, v in attrition_rate_by_dept.items()},
-        'tenure_analysis': {k: round(v, 2) for k, v in tenure_analysis.items()},
-        'age_group_distribution': age_group_dist,
-        'income_group_distribution': income_group_dist,
-        'correlation_matrix': correlation_data.where(pd.notna(correlation_data), 0).to_dict()
-    }
+    with span("analyzer.read"):
+        df = load_columns(dataset_path, ANALYSIS_COLUMNS)
+    return analyze_frame(df)
+
+
+def analyze_frame(df: pd.DataFrame) -> Dict:
+    # df may be shared (e.g. the worker store's cached frame), so never mutate it
+    with span("analyzer.summary"):
+        total_employees = len(df)
+        attrition_rate = (df['Attrition'] == 'Yes').sum() / total_employees * 100
+        avg_age = df['Age'].mean()
+        avg_monthly_income = df['MonthlyIncome'].mean()
+        avg_years_at_company = df['YearsAtCompany'].mean()
+
+    with span("analyzer.distributions"):
+        department_dist = df['Department'].value_counts().to_dict()
+        job_role_dist = df['JobRole'].value_counts().to_dict()
+        gender_dist = df['Gender'].value_counts().to_dict()
+        marital_dist = df['MaritalStatus'].value_counts().to_dict()
+        education_field_dist = df['EducationField'].value_counts().to_dict()
+        job_satisfaction_dist = df['JobSatisfaction'].value_counts().sort_index().to_dict()
+        work_life_balance = df['WorkLifeBalance'].value_counts().sort_index().to_dict()
+        overtime_analysis = df['OverTime'].value_counts().to_dict()
+
+    with span("analyzer.skills"):
+        avg_skill_score = df['OperatorSkillScore'].mean()
+        avg_required_skill = df['RequiredSkillByRole'].mean()
+        skill_gap = avg_required_skill - avg_skill_score
+
+    with span("analyzer.group_stats"):
+        dept_stats = group_stats(df, 'Department')
+        role_stats = group_stats(df, 'JobRole')
+
+        salary_by_dept = dept_stats[['income_mean', 'income_median', 'income_std']].set_axis(
+            ['mean', 'median', 'std'], axis=1
+        ).to_dict('index')
+        salary_by_role = role_stats['income_mean'].sort_values(ascending=False).head(10).to_dict()
+        attrition_by_dept = dept_stats['attrition'].to_dict()
+        attrition_rate_by_dept = dept_stats['attrition_rate'].to_dict()
+
+    with span("analyzer.workforce"):
+        training_analysis = {
+            'avg_training_last_year': df['TrainingTimesLastYear'].mean(),
+            'total_training_sessions': df['TrainingTimesLastYear'].sum(),
+            'employees_needing_training': (df['TrainingTimesLastYear'] == 0).sum()
+        }
+
+        performance_metrics = {
+            'avg_performance_rating': df['PerformanceRating'].mean(),
+            'high_performers': (df['PerformanceRating'] >= 4).sum(),
+            'avg_job_involvement': df['JobInvolvement'].mean()
+        }
+
+        distance_analysis = {
+            'avg_distance': df['DistanceFromHome'].mean(),
+            'max_distance': df['DistanceFromHome'].max(),
+            'remote_workers': (df['DistanceFromHome'] > 30).sum()
+        }
+
+        tenure_analysis = {
+            'avg_years_at_company': df['YearsAtCompany'].mean(),
+            'avg_years_in_role': df['YearsInCurrentRole'].mean(),
+            'avg_years_since_promotion': df['YearsSinceLastPromotion'].mean(),
+            'avg_years_with_manager': df['YearsWithCurrManager'].mean()
+        }
+
+    with span("analyzer.bins"):
+        age_group = pd.cut(df['Age'], bins=[0, 25, 35, 45, 55, 100], labels=['18-25', '26-35', '36-45', '46-55', '55+'])
+        age_group_dist = age_group.value_counts().to_dict()
+
+        income_group = pd.cut(
+            df['MonthlyIncome'],
+            bins=[0, 30000, 50000, 75000, 100000, float('inf')],
+            labels=['<30K', '30K-50K', '50K-75K', '75K-100K', '>100K']
+        )
+        income_group_dist = income_group.value_counts().to_dict()
+
+    with span("analyzer.correlation"):
+        correlation_data = df[[
+            'Age', 'MonthlyIncome', 'YearsAtCompany', 'JobSatisfaction',
+            'EnvironmentSatisfaction', 'OperatorSkillScore', 'TotalWorkingYears'
+        ]].corr()
+
+    with span("analyzer.assemble"):
+        results = {
+            'summary': {
+                'total_employees': int(total_employees),
+                'attrition_rate': round(attrition_rate, 2),
+                'avg_age': round(avg_age, 2),
+                'avg_monthly_income': round(avg_monthly_income, 2),
+                'avg_years_at_company': round(avg_years_at_company, 2)
+            },
+            'department_distribution': department_dist,
+            'job_role_distribution': job_role_dist,
+            'gender_distribution': gender_dist,
+            'marital_status_distribution': marital_dist,
+            'skill_analysis': {
+                'avg_operator_skill': round(avg_skill_score, 3),
+                'avg_required_skill': round(avg_required_skill, 3),
+                'skill_gap': round(skill_gap, 3)
+            },
+            'education_field_distribution': education_field_dist,
+            'job_satisfaction_distribution': job_satisfaction_dist,
+            'salary_by_department': {k: {kk: round(vv, 2) for kk, vv in v.items()} for k, v in salary_by_dept.items()},
+            'salary_by_role': {k: round(v, 2) for k, v in salary_by_role.items()},
+            'training_analysis': {k: round(v, 2) if isinstance(v, float) else int(v) for k, v in training_analysis.items()},
+            'performance_metrics': {k: round(v, 2) for k, v in performance_metrics.items()},
+            'work_life_balance': work_life_balance,
+            'distance_analysis': {k: round(v, 2) if isinstance(v, float) else int(v) for k, v in distance_analysis.items()},
+            'overtime_analysis': overtime_analysis,
+            'attrition_by_department': attrition_by_dept,
+            'attrition_rate_by_department': {k: round(v, 2) for k, v in attrition_rate_by_dept.items()},
+            'tenure_analysis': {k: round(v, 2) for k, v in tenure_analysis.items()},
+            'age_group_distribution': age_group_dist,
+            'income_group_distribution': income_group_dist,
+            'correlation_matrix': correlation_data.where(pd.notna(correlation_data), 0).to_dict()
+        }
 
     return results
-
-
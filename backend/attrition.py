@@ -0,0 +1,360 @@
+"""Per-worker attrition risk from an L2-regularised logistic regression.
+
+The model is fit offline with NumPy (Newton's method on the standardised
+features) and saved as a small JSON file:
+
+    python -m backend.attrition synthetic_dairy_dataset_with_contacts.csv
+
+``AttritionScorer`` loads it on first use, scores every worker in one
+matrix product when the store (re)loads, and afterwards re-scores only the
+rows a mutation touches.
+"""
+import argparse
+import json
+import math
+from pathlib import Path
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .storage import frame_column
+
+MODEL_PATH = Path(__file__).resolve().parent / "attrition_model.json"
+NUMERIC_FEATURES = [
+    "Age", "DistanceFromHome", "EnvironmentSatisfaction", "JobInvolvement", "JobLevel", "JobSatisfaction",
+    "MonthlyIncome", "NumCompaniesWorked", "PercentSalaryHike", "RelationshipSatisfaction", "StockOptionLevel",
+    "TotalWorkingYears", "TrainingTimesLastYear", "WorkLifeBalance", "YearsAtCompany", "YearsInCurrentRole",
+    "YearsSinceLastPromotion", "YearsWithCurrManager", "OperatorSkillScore", "RequiredSkillByRole",
+]
+# One-hot encoded; values not seen in training encode as all zeros
+CATEGORICAL_FEATURES = ["OverTime", "BusinessTravel", "MaritalStatus", "Department"]
+DEFAULT_L2 = 1.0
+MAX_AT_RISK = 100
+
+
+class ModelUnavailable(RuntimeError):
+    pass
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 0.5 * (1.0 + np.tanh(0.5 * z))
+
+
+def _column(rows: Sequence[Dict[str, Any]], name: str) -> List[Any]:
+    return [row.get(name) for row in rows]
+
+
+def _frame_numbers(df, name: str) -> np.ndarray:
+    # As encode reads a row: missing cells and strings are NaN
+    import pandas as pd
+
+    if name not in df.columns:
+        return np.full(len(df), np.nan)
+    series = df[name]
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return series.to_numpy(np.float64, na_value=np.nan)
+    return np.array([np.nan if v is None or isinstance(v, str) else v for v in series.tolist()], dtype=np.float64)
+
+
+class AttritionModel(NamedTuple):
+    features: List[str]
+    categories: Dict[str, List[str]]
+    mean: np.ndarray
+    scale: np.ndarray
+    coef: np.ndarray
+    intercept: float
+    info: Dict[str, Any]
+
+    def encode(self, rows: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Standardised feature matrix for ``rows``; missing numbers become the mean."""
+        numeric = np.array(
+            [[np.nan if v is None or isinstance(v, str) else v for v in _column(rows, f)] for f in NUMERIC_FEATURES],
+            dtype=np.float64,
+        ).reshape(len(NUMERIC_FEATURES), len(rows)).T
+        categorical = {name: np.array(_column(rows, name), dtype=object) for name in CATEGORICAL_FEATURES}
+        return self._standardise(numeric, categorical, len(rows))
+
+    def encode_frame(self, df) -> np.ndarray:
+        """``encode`` for a DataFrame of rows, a column at a time."""
+        numeric = np.column_stack([_frame_numbers(df, f) for f in NUMERIC_FEATURES])
+        categorical = {
+            name: df[name].to_numpy(dtype=object) if name in df.columns else np.full(len(df), None, dtype=object)
+            for name in CATEGORICAL_FEATURES
+        }
+        return self._standardise(numeric, categorical, len(df))
+
+    def _standardise(self, numeric: np.ndarray, categorical: Dict[str, np.ndarray], n: int) -> np.ndarray:
+        columns = [numeric]
+        for name in CATEGORICAL_FEATURES:
+            values = categorical[name]
+            columns.append(np.array([values == c for c in self.categories[name]], dtype=np.float64)
+                           .reshape(len(self.categories[name]), n).T)
+        x = (np.hstack(columns) - self.mean) / self.scale
+        return np.where(np.isnan(x), 0.0, x)
+
+    def predict(self, rows: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Probability of attrition for every row, in one vectorized pass."""
+        if not rows:
+            return np.empty(0)
+        return _sigmoid(self.encode(rows) @ self.coef + self.intercept)
+
+    def predict_frame(self, df) -> np.ndarray:
+        """``predict`` for a DataFrame of rows."""
+        if not len(df):
+            return np.empty(0)
+        return _sigmoid(self.encode_frame(df) @ self.coef + self.intercept)
+
+    def drivers(self, row: Dict[str, Any], top: int = 3) -> List[Dict[str, Any]]:
+        """The features pushing this worker's risk up the most.
+
+        A categorical feature is one driver, ``Feature=<the worker's value>``,
+        carrying the summed contribution of all its one-hot columns.
+        """
+        contributions = self.encode([row])[0] * self.coef
+        names = list(NUMERIC_FEATURES)
+        totals = contributions[:len(NUMERIC_FEATURES)].tolist()
+        start = len(NUMERIC_FEATURES)
+        for name in CATEGORICAL_FEATURES:
+            stop = start + len(self.categories[name])
+            value = row.get(name)
+            names.append(name if value is None else f"{name}={value}")
+            totals.append(float(contributions[start:stop].sum()))
+            start = stop
+        order = sorted(range(len(totals)), key=lambda i: -totals[i])[:top]
+        return [{"feature": names[i], "contribution": round(totals[i], 4)} for i in order if totals[i] > 0]
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "features": self.features,
+            "categories": self.categories,
+            "mean": self.mean.tolist(),
+            "scale": self.scale.tolist(),
+            "coef": self.coef.tolist(),
+            "intercept": self.intercept,
+            "info": self.info,
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "AttritionModel":
+        return cls(
+            features=list(data["features"]),
+            categories={k: list(v) for k, v in data["categories"].items()},
+            mean=np.asarray(data["mean"], dtype=np.float64),
+            scale=np.asarray(data["scale"], dtype=np.float64),
+            coef=np.asarray(data["coef"], dtype=np.float64),
+            intercept=float(data["intercept"]),
+            info=dict(data.get("info", {})),
+        )
+
+    def save(self, path: Path) -> None:
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(self.to_json(), indent=1))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "AttritionModel":
+        return cls.from_json(json.loads(Path(path).read_text()))
+
+
+def _newton(x: np.ndarray, y: np.ndarray, l2: float, iterations: int = 50) -> Tuple[np.ndarray, float]:
+    # Penalised log-likelihood maximised by Newton steps; the intercept
+    # (last column) is not penalised
+    design = np.hstack([x, np.ones((len(x), 1))])
+    penalty = np.full(design.shape[1], l2)
+    penalty[-1] = 0.0
+    w = np.zeros(design.shape[1])
+    for _ in range(iterations):
+        p = _sigmoid(design @ w)
+        gradient = design.T @ (p - y) + penalty * w
+        hessian = (design * (p * (1 - p))[:, None]).T @ design + np.diag(penalty)
+        step = np.linalg.solve(hessian, gradient)
+        w -= step
+        if np.abs(step).max() < 1e-8:
+            break
+    return w[:-1], float(w[-1])
+
+
+def fit(rows: Sequence[Dict[str, Any]], l2: float = DEFAULT_L2) -> AttritionModel:
+    """Fit the model to rows with a Yes/No ``Attrition`` column."""
+    y = np.array([row.get("Attrition") == "Yes" for row in rows], dtype=np.float64)
+    categories = {
+        name: sorted({v for v in _column(rows, name) if isinstance(v, str)}) for name in CATEGORICAL_FEATURES
+    }
+    features = list(NUMERIC_FEATURES) + [f"{name}={value}" for name in CATEGORICAL_FEATURES for value in categories[name]]
+    raw = AttritionModel(
+        features, categories, np.zeros(len(features)), np.ones(len(features)), np.zeros(len(features)), 0.0, {},
+    ).encode(rows)
+    mean = raw.mean(axis=0)
+    scale = raw.std(axis=0)
+    scale[scale == 0] = 1.0
+    coef, intercept = _newton((raw - mean) / scale, y, l2)
+    return AttritionModel(features, categories, mean, scale, coef, intercept, {
+        "rows": len(rows), "positiveRate": round(float(y.mean()), 4), "l2": l2,
+    })
+
+
+def auc(y: np.ndarray, p: np.ndarray) -> float:
+    """Area under the ROC curve, via the rank-sum statistic (ties averaged)."""
+    import pandas as pd
+
+    positives = int(y.sum())
+    negatives = len(y) - positives
+    if not positives or not negatives:
+        return math.nan
+    ranks = pd.Series(p).rank().to_numpy()
+    return float((ranks[y == 1].sum() - positives * (positives + 1) / 2) / (positives * negatives))
+
+
+class AttritionScorer:
+    """Cached risk score of every worker; attach with ``store.subscribe(scorer)``.
+
+    The model file is read the first time anything needs scoring. If it is
+    missing when the store loads the scorer stays empty, and ``at_risk``
+    raises ModelUnavailable until the next (re)load.
+    """
+
+    def __init__(self, path: Path = MODEL_PATH) -> None:
+        self.path = Path(path)
+        self._model: Optional[AttritionModel] = None
+        self._model_lock = threading.Lock()
+        # True once every worker has been scored
+        self._ready = False
+        self._scores: Dict[int, Tuple[Any, float]] = {}
+        self._by_department: Dict[Any, Dict[int, float]] = {}
+        # (EmployeeNumbers, scores) per department, rebuilt after a change
+        self._arrays: Dict[Any, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @property
+    def model(self) -> AttritionModel:
+        """The model, read from disk on first use."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    if not self.path.exists():
+                        raise ModelUnavailable(
+                            f"No attrition model at {self.path}; train one with python -m backend.attrition"
+                        )
+                    self._model = AttritionModel.load(self.path)
+        return self._model
+
+    def reset(self, rows: Iterable[Dict[str, Any]]) -> None:
+        self._clear()
+        if self._ready:
+            self._add(list(rows))
+
+    def reset_frame(self, df) -> None:
+        """``reset`` from a DataFrame of every row, scored in one pass."""
+        self._clear()
+        if self._ready:
+            self._fill(
+                df["EmployeeNumber"].tolist(), frame_column(df, "Department"), self.model.predict_frame(df).tolist(),
+            )
+
+    def _clear(self) -> None:
+        self._scores = {}
+        self._by_department = {}
+        self._arrays = {}
+        self._ready = self._model is not None or self.path.exists()
+
+    def apply(self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> None:
+        if not self._ready:
+            return
+        if old is not None:
+            self._remove(int(old["EmployeeNumber"]))
+        if new is not None:
+            self._add([new])
+
+    def _add(self, rows: List[Dict[str, Any]]) -> None:
+        self._fill(
+            [row["EmployeeNumber"] for row in rows], [row.get("Department") for row in rows],
+            self.model.predict(rows).tolist(),
+        )
+
+    def _fill(self, employee_numbers: List[Any], departments: List[Any], scores: List[float]) -> None:
+        for employee_number, department, score in zip(employee_numbers, departments, scores):
+            employee_number = int(employee_number)
+            self._scores[employee_number] = (department, score)
+            self._by_department.setdefault(department, {})[employee_number] = score
+            self._arrays.pop(department, None)
+
+    def _remove(self, employee_number: int) -> None:
+        entry = self._scores.pop(employee_number, None)
+        if entry is None:
+            return
+        department = entry[0]
+        members = self._by_department[department]
+        del members[employee_number]
+        if not members:
+            del self._by_department[department]
+        self._arrays.pop(department, None)
+
+    def score(self, employee_number: int) -> Optional[float]:
+        entry = self._scores.get(employee_number)
+        return None if entry is None else entry[1]
+
+    def at_risk(self, n: int = 10, department: Optional[str] = None) -> Dict[Any, List[Tuple[int, float]]]:
+        """The ``n`` highest-risk (EmployeeNumber, score) pairs of each department."""
+        if not self._ready:
+            raise ModelUnavailable(
+                f"No attrition model was loaded from {self.path}; train one with python -m backend.attrition"
+            )
+        departments = [department] if department is not None else sorted(
+            (d for d in self._by_department if d is not None), key=str
+        )
+        result = {}
+        for dept in departments:
+            arrays = self._arrays.get(dept)
+            if arrays is None:
+                members = self._by_department.get(dept, {})
+                arrays = self._arrays[dept] = (
+                    np.fromiter(members.keys(), dtype=np.int64, count=len(members)),
+                    np.fromiter(members.values(), dtype=np.float64, count=len(members)),
+                )
+            numbers, scores = arrays
+            k = min(n, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k] if 0 < k < len(scores) else np.arange(k)
+            top = top[np.lexsort((numbers[top], -scores[top]))]
+            result[dept] = [(int(numbers[i]), float(scores[i])) for i in top]
+        return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Train the attrition-risk model from a worker CSV.")
+    parser.add_argument("csv", type=Path)
+    parser.add_argument("--out", type=Path, default=MODEL_PATH)
+    parser.add_argument("--l2", type=float, default=DEFAULT_L2, help="L2 penalty on the standardised coefficients")
+    parser.add_argument("--holdout", type=float, default=0.2, help="share of rows held out to report AUC")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from .columnar import load_columns
+
+    df = load_columns(args.csv, ["Attrition"] + NUMERIC_FEATURES + CATEGORICAL_FEATURES)
+    rows = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+    start = time.perf_counter()
+    # Report generalisation on a held-out split, then fit the shipped model on everything
+    order = np.random.default_rng(args.seed).permutation(len(rows))
+    cut = int(len(rows) * (1 - args.holdout))
+    train, test = [rows[i] for i in order[:cut]], [rows[i] for i in order[cut:]]
+    y_test = np.array([row["Attrition"] == "Yes" for row in test], dtype=np.float64)
+    holdout_auc = auc(y_test, fit(train, args.l2).predict(test)) if test else math.nan
+    model = fit(rows, args.l2)
+    y = np.array([row["Attrition"] == "Yes" for row in rows], dtype=np.float64)
+    model.info.update({
+        "dataset": args.csv.name,
+        "trainAuc": round(auc(y, model.predict(rows)), 4),
+        "holdoutAuc": round(holdout_auc, 4),
+    })
+    model.save(args.out)
+    print(
+        f"Trained on {len(rows)} rows in {time.perf_counter() - start:.2f}s: "
+        f"train AUC {model.info['trainAuc']}, holdout AUC {model.info['holdoutAuc']} -> {args.out}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""Analysis of many dataset files in one run (e.g. every plant's nightly export).
+
+Each input is analysed on its own, on a pool of worker processes, and its
+``PartialAggregates`` are merged in input order into one result for all
+inputs. Per-file results and partials are kept in a results directory with
+a small state file recording the content hash each was computed from, so
+the next run only re-analyses inputs that changed.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import glob
+import gzip
+from hashlib import blake2b
+import json
+import multiprocessing
+import os
+from pathlib import Path
+import pickle
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .analyzer import ANALYSIS_COLUMNS, analyze_frame
+from .cache import dataset_fingerprint
+from .columnar import load_columns
+from .parallel import partial_parallel
+from .serialize import dumps
+from .streaming import DEFAULT_MAX_MEMORY_MB, PartialAggregates, partial_streaming
+
+MODES = ("memory", "streaming", "parallel")
+FORMATS = ("json", "json.gz")
+STATE_FILE = "state.json"
+# Bump when per-file results or partials change shape, to invalidate old ones
+STATE_VERSION = 1
+
+
+class FileReport(NamedTuple):
+    path: Path
+    rows: int
+    # "analysed", "unchanged" or "failed"
+    status: str
+    timings: Dict[str, float]
+    error: Optional[str] = None
+
+
+class BatchReport(NamedTuple):
+    results: Optional[Dict]
+    files: List[FileReport]
+    timings: Dict[str, float]
+
+    @property
+    def failed(self) -> List[FileReport]:
+        return [f for f in self.files if f.status == "failed"]
+
+
+def expand_inputs(patterns: Iterable[str]) -> List[Path]:
+    """Dataset files named by ``patterns``: paths, globs, or directories of CSVs.
+
+    Order is kept (globs sorted) and a file named twice is analysed once.
+    """
+    files: List[Path] = []
+    for pattern in patterns:
+        path = Path(pattern)
+        if glob.has_magic(pattern):
+            matches = sorted(Path(p) for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+        elif path.is_dir():
+            matches = sorted(p for p in path.glob("*.csv") if p.is_file())
+        elif path.is_file():
+            matches = [path]
+        else:
+            raise FileNotFoundError(f"No such dataset: {pattern}")
+        if not matches:
+            raise FileNotFoundError(f"No dataset files match {pattern}")
+        files.extend(matches)
+    seen = set()
+    unique = []
+    for path in files:
+        key = path.resolve()
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return unique
+
+
+def _analyze_file(
+    path: str, mode: str, max_memory_mb: float, workers: Optional[int], sketch_k: int,
+) -> Tuple[Dict, PartialAggregates, Dict[str, float]]:
+    # Runs in a pool worker: the file's own results plus its mergeable partial
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    if mode == "memory":
+        df = load_columns(path, ANALYSIS_COLUMNS)
+        timings["load"] = time.perf_counter() - start
+        start = time.perf_counter()
+        results = analyze_frame(df)
+        timings["analyze"] = time.perf_counter() - start
+        start = time.perf_counter()
+        partial = PartialAggregates.from_frame(df, sketch_k)
+        timings["aggregate"] = time.perf_counter() - start
+        return results, partial, timings
+    if mode == "streaming":
+        partial = partial_streaming(path, max_memory_mb=max_memory_mb, sketch_k=sketch_k)
+    else:
+        partial = partial_parallel(path, workers=workers, sketch_k=sketch_k)
+    # Chunks/partitions are read and aggregated together
+    timings["aggregate"] = time.perf_counter() - start
+    start = time.perf_counter()
+    # finalize() leaves the partial as it was, so it can still be merged
+    results = partial.finalize()
+    timings["analyze"] = time.perf_counter() - start
+    return results, partial, timings
+
+
+def _output_name(path: Path) -> str:
+    # Plants often export under the same file name, so the stem alone is not unique
+    return f"{path.stem}-{blake2b(str(path.resolve()).encode(), digest_size=4).hexdigest()}"
+
+
+def _encode(obj: Any, output_format: str, compact: bool = False) -> bytes:
+    data = dumps(obj, indent=not compact)
+    return gzip.compress(data, compresslevel=6) if output_format == "json.gz" else data
+
+
+def _decode(data: bytes, output_format: str) -> Any:
+    return json.loads(gzip.decompress(data) if output_format == "json.gz" else data)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+def write_results(results: Dict, path: Path, output_format: str = "json", compact: bool = False) -> None:
+    """Write ``results`` as JSON indented by two spaces, or on one line if ``compact``."""
+    _write_atomic(Path(path), _encode(results, output_format, compact))
+
+
+def read_results(path: Path) -> Dict:
+    path = Path(path)
+    return _decode(path.read_bytes(), "json.gz" if path.name.endswith(".gz") else "json")
+
+
+class _State:
+    """The results directory: per-file results, partials and ``state.json``."""
+
+    def __init__(self, directory: Path, output_format: str, compact: bool = False) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.output_format = output_format
+        self.compact = compact
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        try:
+            data = json.loads((self.directory / STATE_FILE).read_text())
+            if data.get("version") == STATE_VERSION:
+                self.entries = data["files"]
+        except (FileNotFoundError, ValueError, KeyError):
+            pass
+
+    def result_path(self, path: Path) -> Path:
+        return self.directory / f"{_output_name(path)}.{self.output_format}"
+
+    def partial_path(self, path: Path) -> Path:
+        return self.directory / f"{_output_name(path)}.partial.pickle"
+
+    def content_hash(self, path: Path) -> str:
+        # Trust the recorded hash while size and mtime are unchanged, as
+        # dataset_fingerprint does within a process
+        st = os.stat(path)
+        entry = self.entries.get(str(path.resolve()))
+        if entry is not None and (entry["size"], entry["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+            return entry["hash"]
+        return dataset_fingerprint(path)[2]
+
+    def unchanged(self, path: Path, digest: str, mode: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(str(path.resolve()))
+        if entry is None or entry["hash"] != digest or entry["mode"] != mode:
+            return None
+        if not (self.result_path(path).exists() and self.partial_path(path).exists()):
+            return None
+        return entry
+
+    def load_partial(self, path: Path) -> PartialAggregates:
+        return pickle.loads(self.partial_path(path).read_bytes())
+
+    def record(self, path: Path, digest: str, mode: str, results: Dict, partial: PartialAggregates) -> None:
+        write_results(results, self.result_path(path), self.output_format, self.compact)
+        _write_atomic(self.partial_path(path), pickle.dumps(partial, protocol=pickle.HIGHEST_PROTOCOL))
+        st = os.stat(path)
+        self.entries[str(path.resolve())] = {
+            "size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": digest, "mode": mode,
+            "rows": partial.total, "result": self.result_path(path).name,
+        }
+        # Saved after every file so an interrupted run keeps what it finished
+        _write_atomic(
+            self.directory / STATE_FILE,
+            json.dumps({"version": STATE_VERSION, "files": self.entries}, indent=1).encode(),
+        )
+
+
+def run_batch(
+    inputs: List[Path],
+    results_dir: Path,
+    mode: str = "memory",
+    jobs: Optional[int] = None,
+    workers: Optional[int] = None,
+    max_memory_mb: float = DEFAULT_MAX_MEMORY_MB,
+    output_format: str = "json",
+    compact: bool = False,
+    force: bool = False,
+    sketch_k: int = 8192,
+    progress: Optional[Callable[[FileReport], None]] = None,
+) -> BatchReport:
+    """Analyse ``inputs`` (``jobs`` at a time) and merge them into one result.
+
+    With ``mode="parallel"`` each file is itself split across ``workers``
+    processes, so files are then analysed one at a time. A file that fails
+    is reported and left out of the merged result; the others still run.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {', '.join(MODES)}")
+    if output_format not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    jobs = 1 if mode == "parallel" else max(1, min(jobs or os.cpu_count() or 1, len(inputs)))
+    started = time.perf_counter()
+    state = _State(results_dir, output_format, compact)
+    timings: Dict[str, float] = {}
+
+    start = time.perf_counter()
+    digests = [state.content_hash(path) for path in inputs]
+    timings["hash"] = time.perf_counter() - start
+
+    reports: Dict[int, FileReport] = {}
+    partials: Dict[int, PartialAggregates] = {}
+    file_results: Dict[int, Dict] = {}
+    pending = []
+    for i, (path, digest) in enumerate(zip(inputs, digests)):
+        entry = None if force else state.unchanged(path, digest, mode)
+        if entry is None:
+            pending.append(i)
+            continue
+        start = time.perf_counter()
+        partials[i] = state.load_partial(path)
+        reports[i] = FileReport(path, entry["rows"], "unchanged", {"reuse": time.perf_counter() - start})
+        if progress is not None:
+            progress(reports[i])
+
+    def finished(i: int, outcome: Optional[Tuple[Dict, PartialAggregates, Dict[str, float]]], error: Optional[str]):
+        path = inputs[i]
+        if outcome is None:
+            reports[i] = FileReport(path, 0, "failed", {}, error)
+        else:
+            results, partial, file_timings = outcome
+            start = time.perf_counter()
+            state.record(path, digests[i], mode, results, partial)
+            file_timings["write"] = time.perf_counter() - start
+            partials[i] = partial
+            file_results[i] = results
+            reports[i] = FileReport(path, partial.total, "analysed", file_timings)
+        if progress is not None:
+            progress(reports[i])
+
+    start = time.perf_counter()
+    args = (mode, max_memory_mb, workers, sketch_k)
+    if jobs == 1 or len(pending) <= 1:
+        for i in pending:
+            try:
+                outcome = _analyze_file(str(inputs[i]), *args)
+            except Exception as exc:
+                finished(i, None, f"{type(exc).__name__}: {exc}")
+            else:
+                finished(i, outcome, None)
+    else:
+        # "spawn" like the analysis pools, so workers start from a clean interpreter
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {pool.submit(_analyze_file, str(inputs[i]), *args): i for i in pending}
+            for future in as_completed(futures):
+                exc = future.exception()
+                if exc is not None:
+                    finished(futures[future], None, f"{type(exc).__name__}: {exc}")
+                else:
+                    finished(futures[future], future.result(), None)
+    timings["analyze"] = time.perf_counter() - start
+
+    # Merge in input order, so the result does not depend on scheduling
+    start = time.perf_counter()
+    merged: Optional[Dict] = None
+    ok = [i for i in range(len(inputs)) if i in partials]
+    if len(ok) == 1 and ok[0] in file_results:
+        merged = file_results[ok[0]]
+    elif len(ok) == 1:
+        merged = read_results(state.result_path(inputs[ok[0]]))
+    elif ok:
+        total = PartialAggregates(sketch_k)
+        for i in ok:
+            total.merge(partials[i])
+        merged = total.finalize()
+    timings["merge"] = time.perf_counter() - start
+    timings["total"] = time.perf_counter() - started
+    return BatchReport(merged, [reports[i] for i in range(len(inputs))], timings)
@@ -0,0 +1,100 @@
+"""Streaming parsers and writers for bulk worker import/export.
+
+Uploads are consumed chunk by chunk and decoded into records lazily, and
+exports are produced a batch of rows at a time, so neither side ever holds
+the whole request or response body.
+"""
+import codecs
+import csv
+import io
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import anyio
+from fastapi import Request
+
+from .serialize import dumps
+from .storage import StorageBackend
+
+FORMATS = ("csv", "ndjson")
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+EXPORT_BATCH_ROWS = 1000
+
+
+def format_for(content_type: Optional[str], requested: Optional[str]) -> str:
+    """Pick the body format from an explicit ``format=`` or the Content-Type."""
+    if requested:
+        if requested not in FORMATS:
+            raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+        return requested
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines"):
+        return "ndjson"
+    return "csv"
+
+
+def iter_body(request: Request) -> Iterator[bytes]:
+    """The request body chunk by chunk, for use from a sync (threadpool) handler."""
+    stream = request.stream().__aiter__()
+    while True:
+        try:
+            chunk = anyio.from_thread.run(stream.__anext__)
+        except StopAsyncIteration:
+            return
+        if chunk:
+            yield chunk
+
+
+def _lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    # Lines keep their endings, which the csv module needs for quoted newlines
+    pending = ""
+    for text in codecs.iterdecode(chunks, "utf-8-sig"):
+        pending += text
+        end = pending.rfind("\n") + 1
+        if end:
+            yield from io.StringIO(pending[:end], newline="")
+            pending = pending[end:]
+    if pending:
+        yield from io.StringIO(pending, newline="")
+
+
+def iter_records(chunks: Iterable[bytes], fmt: str) -> Iterator[Dict[str, Any]]:
+    """Dicts parsed from a CSV (header row first) or NDJSON byte stream."""
+    if fmt == "csv":
+        for row in csv.DictReader(_lines(chunks)):
+            # Empty cells mean "use the default", like a missing key
+            yield {k: v for k, v in row.items() if k is not None and v != ""}
+        return
+    for number, line in enumerate(_lines(chunks), 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            raise ValueError(f"line {number}: invalid JSON ({exc})")
+        if not isinstance(record, dict):
+            raise ValueError(f"line {number}: expected a JSON object")
+        yield record
+
+
+def iter_export(store: StorageBackend, fields: List[str], fmt: str, batch_rows: int = EXPORT_BATCH_ROWS) -> Iterator[bytes]:
+    """Encoded rows of ``store``, ``batch_rows`` at a time.
+
+    Only the EmployeeNumbers are snapshotted up front; rows deleted while the
+    export runs are skipped and updates show up if their batch is not sent yet.
+    """
+    employee_numbers = store.employee_numbers()
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        yield buffer.getvalue().encode("utf-8")
+    for start in range(0, len(employee_numbers), batch_rows):
+        rows = store.records(fields, employee_numbers=employee_numbers[start:start + batch_rows])
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerows([row.get(f) for f in fields] for row in rows)
+            yield buffer.getvalue().encode("utf-8")
+        else:
+            yield b"".join(dumps(row) + b"\n" for row in rows)
@@ -0,0 +1,83 @@
+"""Cache of already-serialized API responses keyed on dataset identity."""
+from hashlib import blake2b
+import os
+from pathlib import Path
+import threading
+from typing import Dict, Hashable, NamedTuple, Optional, Tuple
+
+from .metrics import READ_BYTES, span
+
+_HASH_CHUNK = 1 << 20
+_fingerprints: Dict[str, Tuple[Tuple[int, int], str]] = {}
+_fingerprint_lock = threading.Lock()
+
+
+def dataset_fingerprint(path: Path) -> Tuple[int, int, str]:
+    """(size, mtime_ns, content hash) of ``path``.
+
+    The content hash is only recomputed when size or mtime change, so the
+    common case costs a single ``os.stat``.
+    """
+    st = os.stat(path)
+    stat_key = (st.st_size, st.st_mtime_ns)
+    with _fingerprint_lock:
+        known = _fingerprints.get(str(path))
+    if known is None or known[0] != stat_key:
+        digest = blake2b(digest_size=16)
+        with span("dataset.hash"), open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(_HASH_CHUNK), b""):
+                digest.update(chunk)
+        READ_BYTES.inc(stat_key[0], "hash")
+        known = (stat_key, digest.hexdigest())
+        with _fingerprint_lock:
+            _fingerprints[str(path)] = known
+    return stat_key[0], stat_key[1], known[1]
+
+
+class CachedResponse(NamedTuple):
+    key: Hashable
+    body: bytes
+    etag: str
+
+
+class ResponseCache:
+    """Finished JSON bodies per endpoint, valid while their key is unchanged."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, CachedResponse] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str, key: Hashable) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry.key == key:
+                self.hits += 1
+                return entry
+            self.misses += 1
+            return None
+
+    def put(self, name: str, key: Hashable, body: bytes) -> CachedResponse:
+        etag = '"' + blake2b(body, digest_size=12).hexdigest() + '"'
+        entry = CachedResponse(key, body, etag)
+        with self._lock:
+            self._entries[name] = entry
+        return entry
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [t.strip() for t in if_none_match.split(",")]
+    # Weak comparison, as recommended for If-None-Match
+    return etag in tags or ("W/" + etag) in tags
@@ -0,0 +1,192 @@
+"""Columnar .npy sidecar for the worker CSV with lazy, memory-mapped loads.
+
+Next to ``dataset.csv`` we keep ``dataset.csv.columns/`` holding one file
+per column plus a ``manifest.json`` recording the CSV fingerprint it was
+built from. Numeric columns are plain ``.npy`` arrays opened with
+``mmap_mode="r"``, categorical strings (see ``schema``) are dictionary-encoded
+as small integer codes, and free text is a UTF-8 blob with an offsets array
+so it is only decoded when a caller actually asks for it.
+"""
+import json
+from pathlib import Path
+import shutil
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .cache import dataset_fingerprint
+from .locking import FileLock
+from .metrics import READ_BYTES, WRITE_BYTES, span
+from .schema import apply_schema, read_csv
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+# Object columns with at most this many distinct values are dictionary-encoded
+MAX_CATEGORIES = 1024
+
+
+def sidecar_dir(csv_path: Path) -> Path:
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.name + ".columns")
+
+
+_locks: Dict[str, FileLock] = {}
+_locks_guard = threading.Lock()
+
+
+def sidecar_lock(csv_path: Path) -> FileLock:
+    """Lock held while the sidecar is rebuilt or its files are opened.
+
+    Shared per path within the process so nested use is re-entrant.
+    """
+    path = str(sidecar_dir(csv_path)) + ".lock"
+    with _locks_guard:
+        lock = _locks.get(path)
+        if lock is None:
+            lock = _locks[path] = FileLock(Path(path))
+        return lock
+
+
+def _codes_dtype(n_categories: int):
+    if n_categories < np.iinfo(np.int8).max:
+        return np.int8
+    if n_categories < np.iinfo(np.int16).max:
+        return np.int16
+    return np.int32
+
+
+def write_sidecar(df: pd.DataFrame, csv_path: Path) -> Path:
+    """Write ``df`` (the parsed contents of ``csv_path``) as a columnar sidecar."""
+    target = sidecar_dir(csv_path)
+    tmp = target.with_name(target.name + ".tmp")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir()
+
+    df = apply_schema(df)
+    columns: Dict[str, Dict] = {}
+    for i, name in enumerate(df.columns):
+        stem = f"c{i:03d}"
+        series = df[name]
+        if isinstance(series.dtype, pd.CategoricalDtype) or series.dtype == object:
+            cat = series.astype("category")
+            categories = cat.cat.categories
+            declared = isinstance(series.dtype, pd.CategoricalDtype)
+            if declared or (len(categories) <= MAX_CATEGORIES and len(categories) * 2 <= max(len(series), 2)):
+                np.save(tmp / f"{stem}.npy", cat.cat.codes.to_numpy(_codes_dtype(len(categories))))
+                columns[str(name)] = {"file": stem, "kind": "category", "categories": categories.tolist()}
+                continue
+            values = series.tolist()
+            nulls = np.fromiter((v is None or v != v for v in values), dtype=bool, count=len(values))
+            encoded = [b"" if null else str(v).encode("utf-8") for v, null in zip(values, nulls)]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+            (tmp / f"{stem}.bin").write_bytes(b"".join(encoded))
+            np.save(tmp / f"{stem}.offsets.npy", offsets)
+            np.save(tmp / f"{stem}.nulls.npy", nulls)
+            columns[str(name)] = {"file": stem, "kind": "text"}
+        else:
+            np.save(tmp / f"{stem}.npy", series.to_numpy())
+            columns[str(name)] = {"file": stem, "kind": "numeric"}
+
+    size, mtime_ns, digest = dataset_fingerprint(csv_path)
+    manifest = {
+        "format": FORMAT_VERSION,
+        "source": {"size": size, "mtime_ns": mtime_ns, "hash": digest},
+        "rows": len(df),
+        "columns": columns,
+    }
+    (tmp / MANIFEST).write_text(json.dumps(manifest))
+    WRITE_BYTES.inc(sum(f.stat().st_size for f in tmp.iterdir()), "columnar")
+
+    if target.exists():
+        old = target.with_name(target.name + ".old")
+        if old.exists():
+            shutil.rmtree(old)
+        target.rename(old)
+        tmp.rename(target)
+        shutil.rmtree(old)
+    else:
+        tmp.rename(target)
+    return target
+
+
+def _read_manifest(csv_path: Path) -> Optional[Dict]:
+    path = sidecar_dir(csv_path) / MANIFEST
+    try:
+        manifest = json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+    if manifest.get("format") != FORMAT_VERSION:
+        return None
+    # Content hash only, so a touched-but-identical CSV keeps its sidecar
+    if manifest["source"]["hash"] != dataset_fingerprint(csv_path)[2]:
+        return None
+    return manifest
+
+
+def ensure_sidecar(csv_path: Path) -> Dict:
+    """Return the manifest for ``csv_path``, (re)building the sidecar if stale."""
+    manifest = _read_manifest(csv_path)
+    if manifest is None:
+        # Other processes may notice the stale sidecar at the same time; the
+        # first one through rebuilds it and the rest find it fresh
+        with sidecar_lock(csv_path):
+            manifest = _read_manifest(csv_path)
+            if manifest is None:
+                with span("columnar.build"):
+                    READ_BYTES.inc(Path(csv_path).stat().st_size, "csv")
+                    write_sidecar(read_csv(csv_path), csv_path)
+                manifest = _read_manifest(csv_path)
+    return manifest
+
+
+def _load_column(directory: Path, spec: Dict, rows: slice):
+    stem = spec["file"]
+    if spec["kind"] == "numeric":
+        return np.load(directory / f"{stem}.npy", mmap_mode="r")[rows]
+    if spec["kind"] == "category":
+        codes = np.load(directory / f"{stem}.npy", mmap_mode="r")[rows]
+        return pd.Categorical.from_codes(np.asarray(codes), categories=spec["categories"])
+    nulls = np.load(directory / f"{stem}.nulls.npy", mmap_mode="r")[rows]
+    offsets = np.load(directory / f"{stem}.offsets.npy", mmap_mode="r")
+    start, stop, _ = rows.indices(len(offsets) - 1)
+    offsets = offsets[start:stop + 1]
+    base = int(offsets[0]) if len(offsets) else 0
+    with open(directory / f"{stem}.bin", "rb") as fh:
+        fh.seek(base)
+        data = fh.read(int(offsets[-1]) - base if len(offsets) else 0)
+    out = np.empty(len(nulls), dtype=object)
+    for i, (lo, hi, null) in enumerate(zip(offsets[:-1].tolist(), offsets[1:].tolist(), nulls.tolist())):
+        out[i] = None if null else data[lo - base:hi - base].decode("utf-8")
+    return out
+
+
+def load_columns(
+    csv_path: Path,
+    columns: Optional[Sequence[str]] = None,
+    rows: slice = slice(None),
+) -> pd.DataFrame:
+    """Load only ``columns`` of the dataset (all of them when None).
+
+    Numeric columns stay memory-mapped; categoricals come back as pandas
+    ``category`` dtype built straight from the stored codes. ``rows`` selects
+    a contiguous row range without reading the rest of each column.
+    """
+    csv_path = Path(csv_path)
+    # Open every file before another process can swap the directory; the
+    # memory maps stay valid after that
+    with span("columnar.load"), sidecar_lock(csv_path):
+        manifest = ensure_sidecar(csv_path)
+        specs = manifest["columns"]
+        names: List[str] = list(specs) if columns is None else [c for c in columns if c in specs]
+        missing = [] if columns is None else [c for c in columns if c not in specs]
+        if missing:
+            raise KeyError(f"Columns not in dataset: {missing}")
+        directory = sidecar_dir(csv_path)
+        data = {name: _load_column(directory, specs[name], rows) for name in names}
+    # Mapped pages are only read once touched; count what was asked for
+    READ_BYTES.inc(sum(getattr(v, "nbytes", 0) for v in data.values()), "columnar")
+    return pd.DataFrame(data, copy=False)
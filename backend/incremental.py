@@ -0,0 +1,563 @@
+"""Incrementally maintained version of ``analyzer.analyze_frame``.
+
+Every aggregate in the analysis is a count, a sum, a co-moment or an order
+statistic, so instead of rescanning the dataset the engine keeps running
+totals and applies each worker create/update/delete as a delta.
+"""
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+import math
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional
+
+# Every column the analysis reads; contact fields (Name, Email, ...) are never loaded
+ANALYSIS_COLUMNS = [
+    "Age", "Attrition", "Department", "DistanceFromHome", "EducationField", "EnvironmentSatisfaction",
+    "Gender", "JobInvolvement", "JobRole", "JobSatisfaction", "MaritalStatus", "MonthlyIncome",
+    "OverTime", "PerformanceRating", "TotalWorkingYears", "TrainingTimesLastYear", "WorkLifeBalance",
+    "YearsAtCompany", "YearsInCurrentRole", "YearsSinceLastPromotion", "YearsWithCurrManager",
+    "OperatorSkillScore", "RequiredSkillByRole",
+]
+MEAN_COLUMNS = [
+    "Age", "MonthlyIncome", "YearsAtCompany", "OperatorSkillScore", "RequiredSkillByRole",
+    "TrainingTimesLastYear", "PerformanceRating", "JobInvolvement", "DistanceFromHome",
+    "YearsInCurrentRole", "YearsSinceLastPromotion", "YearsWithCurrManager",
+]
+COUNT_COLUMNS = [
+    "Department", "JobRole", "Gender", "MaritalStatus", "EducationField",
+    "JobSatisfaction", "WorkLifeBalance", "OverTime", "DistanceFromHome",
+]
+CORRELATION_COLUMNS = [
+    "Age", "MonthlyIncome", "YearsAtCompany", "JobSatisfaction",
+    "EnvironmentSatisfaction", "OperatorSkillScore", "TotalWorkingYears",
+]
+AGE_BINS = [0, 25, 35, 45, 55, 100]
+AGE_LABELS = ["18-25", "26-35", "36-45", "46-55", "55+"]
+INCOME_BINS = [0, 30000, 50000, 75000, 100000, float("inf")]
+INCOME_LABELS = ["<30K", "30K-50K", "50K-75K", "75K-100K", ">100K"]
+
+
+class SortedMultiset:
+    """Sorted bag of numbers with O(sqrt n) insert/remove and k-th lookup.
+
+    Values live in sorted buckets of bounded size, so inserts only shift one
+    bucket and order statistics only walk the bucket lengths. Any mutually
+    comparable values work, e.g. ``(key, id)`` tuples for an ordered index.
+    """
+
+    BUCKET = 512
+
+    def __init__(self, values: Iterable[Any] = ()) -> None:
+        ordered = sorted(values)
+        self._buckets: List[List[Any]] = [
+            ordered[i:i + self.BUCKET] for i in range(0, len(ordered), self.BUCKET)
+        ]
+        self._len = len(ordered)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, value: float) -> None:
+        self._len += 1
+        if not self._buckets:
+            self._buckets.append([value])
+            return
+        i = self._bucket_for(value)
+        bucket = self._buckets[i]
+        insort(bucket, value)
+        if len(bucket) > 2 * self.BUCKET:
+            self._buckets[i:i + 1] = [bucket[:self.BUCKET], bucket[self.BUCKET:]]
+
+    def remove(self, value: float) -> None:
+        i = self._bucket_for(value)
+        bucket = self._buckets[i]
+        j = bisect_left(bucket, value)
+        if j == len(bucket) or bucket[j] != value:
+            raise ValueError(f"{value!r} not in multiset")
+        del bucket[j]
+        self._len -= 1
+        if not bucket:
+            del self._buckets[i]
+
+    def irange(self, start: Any = None) -> Iterator[Any]:
+        """Values >= ``start`` in ascending order (all of them if None)."""
+        if not self._buckets:
+            return
+        i = 0 if start is None else self._bucket_for(start)
+        bucket = self._buckets[i]
+        j = 0 if start is None else bisect_left(bucket, start)
+        yield from bucket[j:]
+        for bucket in self._buckets[i + 1:]:
+            yield from bucket
+
+    def kth(self, k: int) -> float:
+        for bucket in self._buckets:
+            if k < len(bucket):
+                return bucket[k]
+            k -= len(bucket)
+        raise IndexError(k)
+
+    def median(self) -> float:
+        n = self._len
+        if n == 0:
+            return math.nan
+        if n % 2:
+            return float(self.kth(n // 2))
+        return (self.kth(n // 2 - 1) + self.kth(n // 2)) / 2
+
+    def _bucket_for(self, value: float) -> int:
+        lo, hi = 0, len(self._buckets) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if value <= self._buckets[mid][-1]:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+
+def _number(value: Any) -> Optional[float]:
+    if value is None or isinstance(value, (str, bool)):
+        return None
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _bin(value: Optional[float], bins: List[float], labels: List[str]) -> Optional[str]:
+    # Right-closed intervals, matching pd.cut defaults
+    if value is None or value <= bins[0] or value > bins[-1]:
+        return None
+    return labels[bisect_left(bins, value) - 1]
+
+
+def _column_values(df, col: str):
+    import numpy as np
+
+    if col not in df.columns:
+        return np.full(len(df), None, dtype=object)
+    return df[col].to_numpy(dtype=object)
+
+
+def _numbers(df, col: str):
+    """(values, present) arrays of ``col``, with what ``_number`` would skip marked absent.
+
+    Integer columns keep their dtype so sums of them stay exact.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if col not in df.columns:
+        return np.full(len(df), np.nan), np.zeros(len(df), dtype=bool)
+    series = df[col]
+    if pd.api.types.is_integer_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return series.to_numpy(), np.ones(len(series), dtype=bool)
+    if pd.api.types.is_float_dtype(series.dtype):
+        values = series.to_numpy(np.float64)
+        return values, ~np.isnan(values)
+    values = np.array([_number(v) for v in series.tolist()], dtype=object)
+    present = np.array([v is not None for v in values], dtype=bool)
+    return np.where(present, values, np.nan).astype(np.float64), present
+
+
+def _total(values) -> float:
+    # Python int for integer arrays (exact, like the per-row sums), else float
+    import numpy as np
+
+    return int(values.sum(dtype=np.int64)) if values.dtype.kind in "iu" else float(values.sum())
+
+
+def _group_codes(keys):
+    """Integer codes (-1 for missing) and the distinct non-missing keys."""
+    import pandas as pd
+
+    codes, uniques = pd.factorize(keys)
+    return codes, list(uniques)
+
+
+def _counts(counter: Mapping[Any, int]) -> Dict[Any, int]:
+    return {k: int(v) for k, v in Counter(counter).most_common() if v}
+
+
+def _binned(counter: Mapping[str, int], labels: List[str]) -> Dict[str, int]:
+    # Every bin, most common first and ties in bin order, as value_counts()
+    # orders a pd.cut result
+    return dict(sorted(((k, int(counter.get(k, 0))) for k in labels), key=lambda kv: -kv[1]))
+
+
+def _mean(total: float, count: int) -> float:
+    return total / count if count else math.nan
+
+
+class DepartmentStats(NamedTuple):
+    count: int
+    attrition: int
+    income_mean: float
+    income_median: float
+    income_std: float
+
+
+class Aggregates(NamedTuple):
+    """Finished aggregates from which the analysis result dict is assembled.
+
+    Shared by the incremental engine and the streaming/parallel reducers so
+    every mode formats the result identically.
+    """
+    total: int
+    attrition: int
+    means: Dict[str, float]
+    counts: Dict[str, Mapping[Any, int]]
+    departments: Dict[Any, DepartmentStats]
+    role_means: Dict[Any, float]
+    age_groups: Mapping[str, int]
+    income_groups: Mapping[str, int]
+    training_total: float
+    no_training: int
+    high_performers: int
+    remote: int
+    correlation: Dict[str, Dict[str, float]]
+
+
+def correlation_matrix(n, cov, var_x, var_y) -> Dict[str, Dict[str, float]]:
+    """Nested {column: {row: r}} dict from pairwise co-moment matrices.
+
+    Entry ``[i][j]`` of each input covers the rows where both column i and
+    column j are present, as ``DataFrame.corr()`` does. Undefined entries are 0.
+    """
+    matrix: Dict[str, Dict[str, float]] = {}
+    for j, cj in enumerate(CORRELATION_COLUMNS):
+        column: Dict[str, float] = {}
+        for i, ci in enumerate(CORRELATION_COLUMNS):
+            if n[i][j] < 2 or var_x[i][j] <= 0 or var_y[i][j] <= 0:
+                column[ci] = 0
+            else:
+                r = float(cov[i][j] / math.sqrt(var_x[i][j] * var_y[i][j]))
+                column[ci] = max(-1.0, min(1.0, r))
+        matrix[cj] = column
+    return matrix
+
+
+def assemble_results(a: Aggregates) -> Dict:
+    """Format aggregates into the dict returned by ``analyze_frame``."""
+    avg_skill = a.means["OperatorSkillScore"]
+    avg_required = a.means["RequiredSkillByRole"]
+    departments = sorted(a.departments.items())
+    top_roles = sorted(a.role_means.items(), key=lambda kv: kv[1], reverse=True)[:10]
+    distances = [d for d, c in a.counts["DistanceFromHome"].items() if c]
+    return {
+        "summary": {
+            "total_employees": int(a.total),
+            "attrition_rate": round(_mean(a.attrition, a.total) * 100, 2),
+            "avg_age": round(a.means["Age"], 2),
+            "avg_monthly_income": round(a.means["MonthlyIncome"], 2),
+            "avg_years_at_company": round(a.means["YearsAtCompany"], 2),
+        },
+        "department_distribution": _counts(a.counts["Department"]),
+        "job_role_distribution": _counts(a.counts["JobRole"]),
+        "gender_distribution": _counts(a.counts["Gender"]),
+        "marital_status_distribution": _counts(a.counts["MaritalStatus"]),
+        "skill_analysis": {
+            "avg_operator_skill": round(avg_skill, 3),
+            "avg_required_skill": round(avg_required, 3),
+            "skill_gap": round(avg_required - avg_skill, 3),
+        },
+        "education_field_distribution": _counts(a.counts["EducationField"]),
+        "job_satisfaction_distribution": dict(sorted(_counts(a.counts["JobSatisfaction"]).items())),
+        "salary_by_department": {
+            k: {"mean": round(g.income_mean, 2), "median": round(g.income_median, 2), "std": round(g.income_std, 2)}
+            for k, g in departments
+        },
+        "salary_by_role": {k: round(v, 2) for k, v in top_roles},
+        "training_analysis": {
+            "avg_training_last_year": round(a.means["TrainingTimesLastYear"], 2),
+            "total_training_sessions": int(a.training_total),
+            "employees_needing_training": int(a.no_training),
+        },
+        "performance_metrics": {
+            "avg_performance_rating": round(a.means["PerformanceRating"], 2),
+            "high_performers": int(a.high_performers),
+            "avg_job_involvement": round(a.means["JobInvolvement"], 2),
+        },
+        "work_life_balance": dict(sorted(_counts(a.counts["WorkLifeBalance"]).items())),
+        "distance_analysis": {
+            "avg_distance": round(a.means["DistanceFromHome"], 2),
+            "max_distance": int(max(distances)) if distances else math.nan,
+            "remote_workers": int(a.remote),
+        },
+        "overtime_analysis": _counts(a.counts["OverTime"]),
+        "attrition_by_department": {k: int(g.attrition) for k, g in departments},
+        "attrition_rate_by_department": {k: round(g.attrition / g.count * 100, 2) for k, g in departments},
+        "tenure_analysis": {
+            "avg_years_at_company": round(a.means["YearsAtCompany"], 2),
+            "avg_years_in_role": round(a.means["YearsInCurrentRole"], 2),
+            "avg_years_since_promotion": round(a.means["YearsSinceLastPromotion"], 2),
+            "avg_years_with_manager": round(a.means["YearsWithCurrManager"], 2),
+        },
+        "age_group_distribution": _binned(a.age_groups, AGE_LABELS),
+        "income_group_distribution": _binned(a.income_groups, INCOME_LABELS),
+        "correlation_matrix": a.correlation,
+    }
+
+
+class _Group:
+    __slots__ = ("count", "attrition", "income_n", "income_sum", "income_sq", "incomes")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.attrition = 0
+        self.income_n = 0
+        self.income_sum = 0
+        self.income_sq = 0
+        self.incomes = SortedMultiset()
+
+
+class IncrementalAnalyzer:
+    """Running aggregates producing the same dict as ``analyze_frame``.
+
+    Attach it to a ``WorkerStore`` with ``store.subscribe(engine)``; the store
+    calls ``reset`` after a (re)load and ``apply`` for every mutation.
+    """
+
+    def __init__(self) -> None:
+        self.reset(())
+
+    def reset(self, rows: Iterable[Dict[str, Any]]) -> None:
+        self._clear()
+        for row in rows:
+            self._update(row, 1)
+
+    def _clear(self) -> None:
+        self._n = 0
+        self._attrition = 0
+        self._sums = {c: 0 for c in MEAN_COLUMNS}
+        self._present = {c: 0 for c in MEAN_COLUMNS}
+        self._counts = {c: Counter() for c in COUNT_COLUMNS}
+        self._age_groups = Counter()
+        self._income_groups = Counter()
+        self._no_training = 0
+        self._high_performers = 0
+        self._remote = 0
+        self._departments: Dict[Any, _Group] = defaultdict(_Group)
+        self._roles: Dict[Any, _Group] = defaultdict(_Group)
+        k = len(CORRELATION_COLUMNS)
+        # Pairwise-complete co-moments, as DataFrame.corr() skips NaN per pair
+        self._pair_n = [[0] * k for _ in range(k)]
+        self._pair_sum = [[0] * k for _ in range(k)]
+        self._pair_sq = [[0] * k for _ in range(k)]
+        self._pair_prod = [[0] * k for _ in range(k)]
+        self._cached: Optional[Dict] = None
+
+    def reset_frame(self, df) -> None:
+        """``reset`` from a DataFrame of every row, a column at a time.
+
+        Gives the same state as calling ``_update`` per row (integer sums stay
+        exact; float sums may differ in the last bits), in NumPy instead of
+        a Python loop over 7x7 co-moments per row.
+        """
+        import numpy as np
+
+        self._clear()
+        n = len(df)
+        if not n:
+            return
+        self._n = n
+        yes = _column_values(df, "Attrition") == "Yes"
+        self._attrition = int(yes.sum())
+
+        numbers = {c: _numbers(df, c) for c in set(MEAN_COLUMNS) | set(CORRELATION_COLUMNS) | {"PerformanceRating"}}
+        for col in MEAN_COLUMNS:
+            values, present = numbers[col]
+            self._sums[col] = _total(values[present])
+            self._present[col] = int(present.sum())
+        for col in COUNT_COLUMNS:
+            if col in df.columns:
+                counts = df[col].value_counts()
+                self._counts[col] = Counter({k: v for k, v in zip(counts.index.tolist(), counts.tolist()) if v})
+
+        for counter, col, bins, labels in (
+            (self._age_groups, "Age", AGE_BINS, AGE_LABELS),
+            (self._income_groups, "MonthlyIncome", INCOME_BINS, INCOME_LABELS),
+        ):
+            values, present = numbers[col]
+            binned = values[present & (values > bins[0]) & (values <= bins[-1])]
+            # Right-closed intervals, as _bin and pd.cut
+            hits = np.bincount(np.searchsorted(bins, binned, side="left") - 1, minlength=len(labels))
+            counter.update({label: int(c) for label, c in zip(labels, hits) if c})
+        self._no_training = int((numbers["TrainingTimesLastYear"][0] == 0).sum())
+        self._high_performers = int((numbers["PerformanceRating"][0] >= 4).sum())
+        self._remote = int((numbers["DistanceFromHome"][0] > 30).sum())
+
+        income, income_present = numbers["MonthlyIncome"]
+        income_filled = np.where(income_present, income, 0.0)
+        for groups, col in ((self._departments, "Department"), (self._roles, "JobRole")):
+            if col not in df.columns:
+                continue
+            codes, keys = _group_codes(df[col])
+            valid = codes >= 0
+            k = len(keys)
+            count = np.bincount(codes[valid], minlength=k)
+            attrition = np.bincount(codes[valid], weights=yes[valid], minlength=k)
+            with_income = valid & income_present
+            income_n = np.bincount(codes[with_income], minlength=k)
+            income_sum = np.bincount(codes[with_income], weights=income_filled[with_income], minlength=k)
+            income_sq = np.bincount(codes[with_income], weights=income_filled[with_income] ** 2, minlength=k)
+            for code, key in enumerate(keys):
+                if not count[code]:
+                    continue
+                group = groups[key]
+                group.count = int(count[code])
+                group.attrition = int(attrition[code])
+                group.income_n = int(income_n[code])
+                # Integer incomes sum exactly in float64 well past any payroll
+                group.income_sum = int(income_sum[code]) if income.dtype.kind in "iu" else float(income_sum[code])
+                group.income_sq = float(income_sq[code])
+                if groups is self._departments:
+                    group.incomes = SortedMultiset(income[with_income & (codes == code)].tolist())
+
+        # Pairwise-complete co-moments: missing values are zeroed, so a
+        # product only counts where both columns are present
+        present = np.column_stack([numbers[c][1] for c in CORRELATION_COLUMNS]).astype(np.float64)
+        x = np.column_stack([np.where(numbers[c][1], numbers[c][0], 0.0) for c in CORRELATION_COLUMNS])
+        self._pair_n = (present.T @ present).astype(np.int64).tolist()
+        self._pair_sum = (x.T @ present).tolist()
+        self._pair_sq = ((x * x).T @ present).tolist()
+        self._pair_prod = (x.T @ x).tolist()
+
+    def apply(self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> None:
+        """Apply one mutation: ``old`` is the row before it, ``new`` the row after."""
+        if old is not None:
+            self._update(old, -1)
+        if new is not None:
+            self._update(new, 1)
+
+    def _update(self, row: Dict[str, Any], sign: int) -> None:
+        self._cached = None
+        self._n += sign
+        yes = row.get("Attrition") == "Yes"
+        self._attrition += sign * yes
+
+        for col in MEAN_COLUMNS:
+            value = _number(row.get(col))
+            if value is not None:
+                self._sums[col] += sign * value
+                self._present[col] += sign
+        for col in COUNT_COLUMNS:
+            value = row.get(col)
+            if value is not None:
+                self._counts[col][value] += sign
+
+        age = _number(row.get("Age"))
+        income = _number(row.get("MonthlyIncome"))
+        training = _number(row.get("TrainingTimesLastYear"))
+        rating = _number(row.get("PerformanceRating"))
+        distance = _number(row.get("DistanceFromHome"))
+        for counter, label in (
+            (self._age_groups, _bin(age, AGE_BINS, AGE_LABELS)),
+            (self._income_groups, _bin(income, INCOME_BINS, INCOME_LABELS)),
+        ):
+            if label is not None:
+                counter[label] += sign
+        self._no_training += sign * (training == 0)
+        self._high_performers += sign * (rating is not None and rating >= 4)
+        self._remote += sign * (distance is not None and distance > 30)
+
+        for groups, key in ((self._departments, row.get("Department")), (self._roles, row.get("JobRole"))):
+            if key is None:
+                continue
+            group = groups[key]
+            group.count += sign
+            group.attrition += sign * yes
+            if income is not None:
+                group.income_n += sign
+                group.income_sum += sign * income
+                group.income_sq += sign * income * income
+                if groups is self._departments:
+                    if sign > 0:
+                        group.incomes.add(income)
+                    else:
+                        group.incomes.remove(income)
+            if group.count == 0:
+                del groups[key]
+
+        values = [_number(row.get(c)) for c in CORRELATION_COLUMNS]
+        for i, x in enumerate(values):
+            if x is None:
+                continue
+            for j, y in enumerate(values):
+                if y is None:
+                    continue
+                self._pair_n[i][j] += sign
+                self._pair_sum[i][j] += sign * x
+                self._pair_sq[i][j] += sign * x * x
+                self._pair_prod[i][j] += sign * x * y
+
+    def _mean_of(self, col: str) -> float:
+        return _mean(self._sums[col], self._present[col])
+
+    def _correlation(self) -> Dict[str, Dict[str, float]]:
+        k = len(CORRELATION_COLUMNS)
+        n = [[self._pair_n[i][j] for j in range(k)] for i in range(k)]
+        # Raw sums scaled by n; the scale cancels in the correlation
+        cov = [[n[i][j] * self._pair_prod[i][j] - self._pair_sum[i][j] * self._pair_sum[j][i]
+                for j in range(k)] for i in range(k)]
+        var_x = [[n[i][j] * self._pair_sq[i][j] - self._pair_sum[i][j] ** 2 for j in range(k)] for i in range(k)]
+        var_y = [[var_x[j][i] for j in range(k)] for i in range(k)]
+        return correlation_matrix(n, cov, var_x, var_y)
+
+    def results(self) -> Dict:
+        if self._cached is not None:
+            return self._cached
+
+        departments = {}
+        for dept, g in self._departments.items():
+            n = g.income_n
+            std = math.nan
+            if n > 1:
+                std = math.sqrt(max(g.income_sq - g.income_sum * g.income_sum / n, 0) / (n - 1))
+            departments[dept] = DepartmentStats(g.count, g.attrition, _mean(g.income_sum, n), g.incomes.median(), std)
+
+        self._cached = assemble_results(Aggregates(
+            total=self._n,
+            attrition=self._attrition,
+            means={c: self._mean_of(c) for c in MEAN_COLUMNS},
+            counts=self._counts,
+            departments=departments,
+            role_means={role: _mean(g.income_sum, g.income_n) for role, g in self._roles.items()},
+            age_groups=self._age_groups,
+            income_groups=self._income_groups,
+            training_total=self._sums["TrainingTimesLastYear"],
+            no_training=self._no_training,
+            high_performers=self._high_performers,
+            remote=self._remote,
+            correlation=self._correlation(),
+        ))
+        return self._cached
+
+    def verify(self, df) -> List[str]:
+        """Compare against a full ``analyze_frame`` recompute; returns mismatched keys."""
+        from .analyzer import analyze_frame
+
+        return _diff(analyze_frame(df), self.results())
+
+
+def _diff(expected: Any, actual: Any, path: str = "") -> List[str]:
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        mismatches = []
+        exp = {str(k): v for k, v in expected.items()}
+        act = {str(k): v for k, v in actual.items()}
+        for key in sorted(set(exp) | set(act)):
+            if key not in exp or key not in act:
+                mismatches.append(f"{path}/{key}")
+            else:
+                mismatches.extend(_diff(exp[key], act[key], f"{path}/{key}"))
+        return mismatches
+    try:
+        a, b = float(expected), float(actual)
+    except (TypeError, ValueError):
+        return [] if expected == actual else [path]
+    if math.isnan(a) and math.isnan(b):
+        return []
+    # Most values are rounded for display, so allow one unit in the last place
+    slack = 1e-9 if path.startswith("/correlation_matrix") else 0.0100001
+    if math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9) or abs(a - b) <= slack:
+        return []
+    return [path]
@@ -0,0 +1,315 @@
+"""Secondary indexes over the worker store for paged, filtered listings.
+
+Kept current through the store's ``reset``/``apply`` listener hooks, like
+the incremental analytics. Equality filters (department, role, overtime)
+are hash indexes of EmployeeNumber sets. Each sort order in use gets an
+ordered index of flat sort-key tuples, built the first time it is asked for
+and then maintained on every mutation. A page is produced by walking that
+index from the cursor until ``limit`` matching rows are found, or, when an
+equality filter already narrows things down to a few rows, by sorting just
+those, so the cost follows the page size rather than the dataset size.
+"""
+import base64
+from collections import OrderedDict
+import heapq
+import json
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple
+
+from .incremental import SortedMultiset
+from .storage import frame_column
+
+EQUALITY_FIELDS = ("Department", "JobRole", "OverTime")
+RANGE_FIELDS = ("OperatorSkillScore", "RequiredSkillByRole")
+NUMERIC_SORT_FIELDS = (
+    "EmployeeNumber", "Age", "MonthlyIncome", "YearsAtCompany", "OperatorSkillScore", "RequiredSkillByRole",
+)
+SORTABLE_FIELDS = NUMERIC_SORT_FIELDS + ("Name", "Department", "JobRole")
+INDEXED_FIELDS = tuple(dict.fromkeys(EQUALITY_FIELDS + RANGE_FIELDS + SORTABLE_FIELDS))
+DEFAULT_SORT = (("EmployeeNumber", False),)
+# Ordered indexes kept at once; the least recently used sort order is dropped
+MAX_SORT_INDEXES = 8
+# Sort the equality-filtered candidates directly when there are at most this
+# many per requested row, instead of walking a sort index
+CANDIDATE_SORT_FACTOR = 8
+
+Sort = Tuple[Tuple[str, bool], ...]
+
+
+class InvalidQuery(ValueError):
+    pass
+
+
+class WorkerQuery(NamedTuple):
+    # field -> accepted values
+    equals: Mapping[str, Set[Any]] = {}
+    # field -> inclusive (low, high); None leaves that side open
+    ranges: Mapping[str, Tuple[Optional[float], Optional[float]]] = {}
+    # (field, descending) pairs, most significant first
+    sort: Sort = DEFAULT_SORT
+
+
+def parse_sort(spec: Optional[str]) -> Sort:
+    """``"-MonthlyIncome,Name"`` -> ``(("MonthlyIncome", True), ("Name", False))``."""
+    if not spec:
+        return DEFAULT_SORT
+    keys = []
+    for part in spec.split(","):
+        part = part.strip()
+        field = part.lstrip("-+")
+        if field not in SORTABLE_FIELDS:
+            raise InvalidQuery(f"Cannot sort by {field!r}; sortable fields: {', '.join(SORTABLE_FIELDS)}")
+        keys.append((field, part.startswith("-")))
+    return tuple(keys)
+
+
+class _Descending:
+    """Inverts the ordering of a non-numeric value inside a sort key."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __eq__(self, other: Any) -> bool:
+        return self.value == other.value
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return other.value < self.value
+
+    def __gt__(self, other: "_Descending") -> bool:
+        return other.value > self.value
+
+    def __le__(self, other: "_Descending") -> bool:
+        return other.value <= self.value
+
+    def __ge__(self, other: "_Descending") -> bool:
+        return other.value >= self.value
+
+
+def _key_part(field: str, value: Any, descending: bool) -> Tuple[bool, Any]:
+    # (is_null, value) so missing values sort last in either direction
+    if value is None:
+        return (True, 0)
+    if field in NUMERIC_SORT_FIELDS:
+        return (False, -value if descending else value)
+    value = str(value)
+    return (False, _Descending(value) if descending else value)
+
+
+def sort_key(sort: Sort, values: List[Any]) -> Tuple[Any, ...]:
+    """Flat ascending key for a row with raw sort ``values`` plus EmployeeNumber.
+
+    Ties are broken by EmployeeNumber in the direction of the first sort key.
+    """
+    key: Tuple[Any, ...] = ()
+    for (field, descending), value in zip(sort, values):
+        key += _key_part(field, value, descending)
+    employee_number = int(values[-1])
+    return key + (-employee_number if sort[0][1] else employee_number,)
+
+
+def encode_cursor(values: List[Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: Sort) -> Tuple[Any, ...]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(sort) + 1:
+            raise ValueError(cursor)
+        return sort_key(sort, values)
+    except (ValueError, TypeError):
+        raise InvalidQuery("Invalid cursor for this sort order")
+
+
+class WorkerIndexes:
+    def __init__(self) -> None:
+        self._values: Dict[int, Tuple[Any, ...]] = {}
+        self._positions = {f: i for i, f in enumerate(INDEXED_FIELDS)}
+        self._equal: Dict[str, Dict[Any, Set[int]]] = {f: {} for f in EQUALITY_FIELDS}
+        self._sorted: "OrderedDict[Sort, SortedMultiset]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def reset(self, rows: Iterable[Dict[str, Any]]) -> None:
+        self._values = {}
+        self._equal = {f: {} for f in EQUALITY_FIELDS}
+        self._sorted = OrderedDict()
+        for row in rows:
+            self._add(row)
+
+    def reset_frame(self, df) -> None:
+        """``reset`` from a DataFrame of every row, without a per-row dict."""
+        import numpy as np
+        import pandas as pd
+
+        numbers = [int(e) for e in df["EmployeeNumber"].tolist()]
+        columns = [frame_column(df, f) for f in INDEXED_FIELDS]
+        self._values = dict(zip(numbers, zip(*columns)))
+        self._sorted = OrderedDict()
+        self._equal = {}
+        employees = np.asarray(numbers, dtype=np.int64)
+        for field in EQUALITY_FIELDS:
+            index: Dict[Any, Set[int]] = {}
+            if field not in df.columns:
+                if numbers:
+                    index[None] = set(numbers)
+            else:
+                # One stable sort by value code, then a slice per value;
+                # missing values (code -1) sort first and are kept under None
+                codes, uniques = pd.factorize(df[field])
+                order = np.argsort(codes, kind="stable")
+                bounds = np.cumsum(np.bincount(codes + 1, minlength=len(uniques) + 1))
+                keys = [None] + list(uniques)
+                start = 0
+                for key, stop in zip(keys, bounds.tolist()):
+                    if stop > start:
+                        index[key] = set(employees[order[start:stop]].tolist())
+                    start = stop
+            self._equal[field] = index
+
+    def apply(self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> None:
+        if old is not None:
+            self._remove(old)
+        if new is not None:
+            self._add(new)
+
+    def _raw(self, employee_number: int, sort: Sort) -> List[Any]:
+        values = self._values[employee_number]
+        return [values[self._positions[f]] for f, _ in sort] + [employee_number]
+
+    def _key(self, employee_number: int, sort: Sort) -> Tuple[Any, ...]:
+        return sort_key(sort, self._raw(employee_number, sort))
+
+    def _add(self, row: Dict[str, Any]) -> None:
+        employee_number = int(row["EmployeeNumber"])
+        self._values[employee_number] = tuple(row.get(f) for f in INDEXED_FIELDS)
+        for field, index in self._equal.items():
+            index.setdefault(row.get(field), set()).add(employee_number)
+        for sort, index in self._sorted.items():
+            index.add(self._key(employee_number, sort))
+
+    def _remove(self, row: Dict[str, Any]) -> None:
+        employee_number = int(row["EmployeeNumber"])
+        values = self._values.get(employee_number)
+        if values is None:
+            return
+        for sort, index in self._sorted.items():
+            index.remove(self._key(employee_number, sort))
+        for field, index in self._equal.items():
+            value = values[self._positions[field]]
+            members = index[value]
+            members.discard(employee_number)
+            if not members:
+                del index[value]
+        del self._values[employee_number]
+
+    def _sort_index(self, sort: Sort) -> SortedMultiset:
+        index = self._sorted.get(sort)
+        if index is None:
+            index = SortedMultiset(self._key(e, sort) for e in self._values)
+            self._sorted[sort] = index
+            if len(self._sorted) > MAX_SORT_INDEXES:
+                self._sorted.popitem(last=False)
+        else:
+            self._sorted.move_to_end(sort)
+        return index
+
+    def prepare(self, sort: Sort = DEFAULT_SORT) -> None:
+        """Build the ordered index for ``sort`` now instead of on the first query that needs it."""
+        self._sort_index(sort)
+
+    def _matcher(self, query: WorkerQuery) -> Callable[[int], bool]:
+        equals = [(self._positions[f], accepted) for f, accepted in query.equals.items()]
+        ranges = [(self._positions[f], low, high) for f, (low, high) in query.ranges.items()]
+
+        def matches(employee_number: int) -> bool:
+            values = self._values[employee_number]
+            for position, accepted in equals:
+                if values[position] not in accepted:
+                    return False
+            for position, low, high in ranges:
+                value = values[position]
+                if value is None or (low is not None and value < low) or (high is not None and value > high):
+                    return False
+            return True
+
+        return matches
+
+    def _narrowest(self, query: WorkerQuery) -> Optional[List[Set[int]]]:
+        """Member sets of the most selective equality filter (None without filters)."""
+        best = None
+        for field, accepted in query.equals.items():
+            index = self._equal[field]
+            sets = [index[v] for v in accepted if v in index]
+            if best is None or sum(map(len, sets)) < sum(map(len, best)):
+                best = sets
+        return best
+
+    def query(
+        self,
+        query: WorkerQuery,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[int], Optional[str]]:
+        """One page of matching EmployeeNumbers and the cursor for the next page."""
+        for field in query.equals:
+            if field not in EQUALITY_FIELDS:
+                raise InvalidQuery(f"Cannot filter on {field!r}")
+        for field in query.ranges:
+            if field not in RANGE_FIELDS:
+                raise InvalidQuery(f"Cannot range-filter on {field!r}")
+        sort = query.sort or DEFAULT_SORT
+        after = decode_cursor(cursor, sort) if cursor else None
+        limit = len(self._values) if limit is None else limit
+        matches = self._matcher(query)
+
+        narrowest = self._narrowest(query)
+        if narrowest is not None and sum(map(len, narrowest)) <= max(limit, 1) * CANDIDATE_SORT_FACTOR:
+            keys = [self._key(e, sort) for members in narrowest for e in members if matches(e)]
+            if after is not None:
+                keys = [k for k in keys if k > after]
+            page = heapq.nsmallest(limit + 1, keys)
+        else:
+            page = self._scan(query, sort, after, matches, limit + 1)
+
+        employee_numbers = [abs(k[-1]) for k in page]
+        next_cursor = None
+        if len(page) > limit:
+            next_cursor = encode_cursor(self._raw(employee_numbers[limit - 1], sort))
+        return employee_numbers[:limit], next_cursor
+
+    def _scan(
+        self,
+        query: WorkerQuery,
+        sort: Sort,
+        after: Optional[Tuple[Any, ...]],
+        matches: Callable[[int], bool],
+        wanted: int,
+    ) -> List[Tuple[Any, ...]]:
+        start = after
+        stop = None
+        field, descending = sort[0]
+        if field in query.ranges:
+            # Start at the near bound of a range filter on the first sort key
+            # and stop past the far one
+            low, high = query.ranges[field]
+            near, far = (high, low) if descending else (low, high)
+            if near is not None:
+                bound = _key_part(field, near, descending)
+                if start is None or bound > start[:2]:
+                    start = bound
+            # Range fields are numeric, so +inf sorts after every value but before nulls
+            stop = _key_part(field, far, descending) if far is not None else (False, float("inf"))
+
+        page: List[Tuple[Any, ...]] = []
+        for key in self._sort_index(sort).irange(start):
+            if stop is not None and key[:2] > stop:
+                break
+            if key == after or not matches(abs(key[-1])):
+                continue
+            page.append(key)
+            if len(page) >= wanted:
+                break
+        return page
@@ -0,0 +1,119 @@
+"""Background analysis jobs, run off the request path and coalesced by key.
+
+A job is identified by the key of the result it will produce (for analysis:
+endpoint name and store version). Submitting a key that already has a
+queued, running or finished job returns that job instead of starting
+another computation, so N identical requests cost one analysis.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import uuid
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+FINISHED = (DONE, FAILED)
+
+
+class Job:
+    def __init__(self, key: Hashable, kind: str) -> None:
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.kind = kind
+        self.status = QUEUED
+        self.done = 0
+        self.total: Optional[int] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # Bumped on every state or progress change; event streams compare it
+        self.revision = 0
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def _touch(self, **fields: Any) -> None:
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.revision += 1
+
+    def report(self, done: int, total: Optional[int] = None) -> None:
+        self._touch(done=done, total=total)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "jobId": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "progress": {"done": self.done, "total": self.total},
+                "error": self.error,
+                "createdAt": self.created_at,
+                "startedAt": self.started_at,
+                "finishedAt": self.finished_at,
+                "revision": self.revision,
+            }
+
+
+class JobManager:
+    """Runs jobs on a small dedicated thread pool.
+
+    The pool is separate from the server's request threadpool, so a queue of
+    slow analyses never delays CRUD handlers. Finished jobs are kept (up to
+    ``keep_finished``) so their results can be fetched and re-used.
+    """
+
+    def __init__(self, threads: int = 2, keep_finished: int = 64) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="analysis-job")
+        self._jobs: Dict[str, Job] = {}
+        self._by_key: Dict[Hashable, Job] = {}
+        self._lock = threading.Lock()
+        self.keep_finished = keep_finished
+        self.submitted = 0
+        self.coalesced = 0
+
+    def submit(self, key: Hashable, kind: str, fn: Callable[[Job], Any]) -> Tuple[Job, bool]:
+        """Return ``(job, coalesced)``; ``fn(job)`` runs only if no job has ``key``."""
+        with self._lock:
+            existing = self._by_key.get(key)
+            if existing is not None and existing.status != FAILED:
+                self.coalesced += 1
+                return existing, True
+            job = Job(key, kind)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+            self.submitted += 1
+            self._prune()
+        self._executor.submit(self._run, job, fn)
+        return job, False
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: Job, fn: Callable[[Job], Any]) -> None:
+        job._touch(status=RUNNING, started_at=time.time())
+        try:
+            result = fn(job)
+        except Exception as exc:
+            job._touch(status=FAILED, error=str(exc), finished_at=time.time())
+        else:
+            job._touch(status=DONE, result=result, finished_at=time.time())
+
+    def _prune(self) -> None:
+        finished = [j for j in self._jobs.values() if j.finished]
+        for job in finished[:max(len(finished) - self.keep_finished, 0)]:
+            del self._jobs[job.id]
+            if self._by_key.get(job.key) is job:
+                del self._by_key[job.key]
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,69 @@
+"""Inter-process file locks for the dataset files.
+
+Several API processes (e.g. ``uvicorn --workers N``) share one CSV, its
+journal and its sidecar; these locks serialise the steps that must not
+interleave between them.
+"""
+import os
+from pathlib import Path
+import threading
+
+try:
+    import fcntl  # type: ignore
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore
+    import msvcrt  # type: ignore
+
+
+class FileLock:
+    """Exclusive lock on ``path`` held across processes.
+
+    Re-entrant within a process: nested ``with`` blocks (from any thread
+    that already holds it) only take the OS lock once. Uses ``flock`` where
+    available and ``msvcrt.locking`` on Windows.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._mutex = threading.RLock()
+        self._fd = None
+        self._depth = 0
+
+    def acquire(self) -> None:
+        self._mutex.acquire()
+        if self._depth == 0:
+            try:
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                else:  # pragma: no cover - Windows
+                    while True:
+                        try:
+                            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                            break
+                        except OSError:
+                            continue
+            except BaseException:
+                self._mutex.release()
+                raise
+            self._fd = fd
+        self._depth += 1
+
+    def release(self) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            fd, self._fd = self._fd, None
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:  # pragma: no cover - Windows
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            os.close(fd)
+        self._mutex.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
@@ -1,37 +1,32 @@
 from pathlib import Path
+import asyncio
+import csv
 import json
-from typing import Any, Dict
-from fastapi import FastAPI, HTTPException, Body
+import math
+import os
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from fastapi import FastAPI, HTTPException, Body, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
-from .analyzer import analyze_dairy_data
-
-try:
-    import numpy as np  # type: ignore
-except Exception:  # pragma: no cover
-    np = None  # type: ignore
-
-def _to_builtin(value: Any) -> Any:
-    if np is not None:
-        # numpy scalar types
-        if isinstance(value, (np.generic,)):
-            try:
-                return value.item()
-            except Exception:
-                return str(value)
-    return value
-
-def sanitize(obj: Any) -> Any:
-    # Recursively convert numpy/pandas scalars and containers into built-in types
-    obj = _to_builtin(obj)
-    if isinstance(obj, dict):
-        return {str(k): sanitize(v) for k, v in obj.items()}
-    if isinstance(obj, (list, tuple, set)):
-        return [sanitize(v) for v in obj]
-    return obj
-
-app = FastAPI(title="Dairy Analysis API", version="1.0.0")
+from fastapi.responses import Response, StreamingResponse
+from .attrition import MAX_AT_RISK, AttritionScorer, ModelUnavailable
+from .bulk import FORMATS, MEDIA_TYPES, format_for, iter_body, iter_export, iter_records
+from .cache import CachedResponse, ResponseCache, etag_matches
+from .incremental import IncrementalAnalyzer
+from .indexes import DEFAULT_SORT, InvalidQuery, WorkerIndexes, WorkerQuery, parse_sort
+from .jobs import FAILED, Job, JobManager
+from .matching import InvalidRequirement, JobRequirement, SkillMatcher
+from . import metrics
+from .metrics import REGISTRY, CallbackCounter, Counter, MetricsMiddleware, span
+from .schema import SchemaError, validate_fields, validate_row
+from .serialize import FastJSONResponse, dumps
+from .parallel import analyze_parallel, shutdown_pools
+from .streaming import DEFAULT_MAX_MEMORY_MB, analyze_streaming
+from .storage import StorageBackend, open_store
+from .store import WorkerNotFound
+from .warmup import Warmup
+
+app = FastAPI(title="Dairy Analysis API", version="1.0.0", default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -39,27 +34,229 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let the browser read the cache and paging headers set below
+    expose_headers=["ETag", "Location", "Link", "X-Next-Cursor", "Server-Timing"],
 )
+# Latency histograms per route, and a Server-Timing stage breakdown for
+# requests sent with "X-Profile: 1"; API_METRICS=0 turns both off
+if metrics.ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
-DATASET_PATH = ROOT_DIR / "synthetic_dairy_dataset_with_contacts.csv"
+# WORKER_DATASET points the API at another CSV (e.g. a generated benchmark dataset)
+DATASET_PATH = Path(os.environ.get("WORKER_DATASET", ROOT_DIR / "synthetic_dairy_dataset_with_contacts.csv"))
+# WORKER_STORAGE=sqlite serves workers from an embedded database instead of
+# the CSV; create it with "python -m backend.sqlstore <csv> <database>"
+STORAGE_BACKEND = os.environ.get("WORKER_STORAGE", "csv")
+DATABASE_PATH = Path(os.environ.get("WORKER_DATABASE", ROOT_DIR / "workers.db"))
+# API_STARTUP=background starts listening before the dataset is loaded and
+# warms up on a thread; /health reports when it is ready (see warmup.py)
+STARTUP_MODE = os.environ.get("API_STARTUP", "eager")
+
+# Loaded once at startup; all handlers read from and write through this store.
+# With the CSV backend writes are journaled next to the CSV and compacted into
+# it in the background.
+store = open_store(STORAGE_BACKEND, DATABASE_PATH if STORAGE_BACKEND == "sqlite" else DATASET_PATH)
+# Keeps the /analysis aggregates current as workers are created/updated/deleted
+analytics = IncrementalAnalyzer()
+store.subscribe(analytics)
+# Secondary indexes behind the filtered, paged GET /workers
+worker_indexes = WorkerIndexes()
+store.subscribe(worker_indexes)
+# Skill/level arrays and per-role indexes behind POST /matching/rank
+matcher = SkillMatcher()
+store.subscribe(matcher)
+# Cached attrition risk per worker; the model file is read on first use
+attrition = AttritionScorer()
+store.subscribe(attrition)
+# Serialized /analysis bodies, keyed on the dataset fingerprint and store version
+responses = ResponseCache()
+REGISTRY.register(CallbackCounter(
+    "dairy_response_cache_requests_total", "Serialized /analysis body lookups", ("result",),
+    lambda: {("hit",): responses.hits, ("miss",): responses.misses},
+))
+NOT_MODIFIED = REGISTRY.register(Counter(
+    "dairy_http_not_modified_total", "Responses answered 304 from a matching If-None-Match",
+))
+# Background /analysis/run jobs, on their own threads so they never hold up CRUD
+jobs = JobManager()
+# Job event streams check for progress this often, and send a keep-alive
+# comment when nothing has changed for the heartbeat interval
+JOB_EVENT_POLL_SECONDS = 0.1
+JOB_EVENT_HEARTBEAT_SECONDS = 15.0
+# Dataset load and cache priming, run by the startup hook
+warmup = Warmup(STARTUP_MODE)
+
+
+def _get_store() -> StorageBackend:
+    # Requests that arrive during a background warm-up wait for the load
+    warmup.wait()
+    # Two stats when nothing changed; otherwise replays what other API
+    # processes wrote, or reloads if the CSV itself was replaced
+    if not store.in_sync():
+        if not store.path.exists():
+            raise HTTPException(status_code=404, detail="Dataset not found")
+        with span("store.sync"):
+            if store.sync():
+                responses.invalidate()
+    return store
+
+
+def _warm_store() -> None:
+    if store.path.exists():
+        store.load()
+
+
+def _warm_analysis() -> None:
+    # The default /analysis body, otherwise encoded by the first request
+    if store.loaded:
+        _analysis_response(store, "incremental", DEFAULT_MAX_MEMORY_MB, None)
+
+
+def _warm_indexes() -> None:
+    # The order paged GET /workers uses when no sort is given
+    if store.loaded:
+        with store.lock:
+            worker_indexes.prepare(DEFAULT_SORT)
+
+
+warmup.stage("store", _warm_store)
+warmup.stage("analysis", _warm_analysis)
+warmup.stage("indexes", _warm_indexes)
+
+
+@app.on_event("startup")
+def load_store() -> None:
+    warmup.start()
+
+
+@app.on_event("shutdown")
+def close_store() -> None:
+    # Fold any journaled writes back into the CSV before exiting
+    if store.loaded:
+        store.close()
+    jobs.shutdown()
+    shutdown_pools()
 
 
 @app.get("/health")
 def health() -> dict:
-    return {"status": "ok"}
+    # Always 200 while the process serves; "ready" turns true once warm-up is done
+    return {"status": "ok", "ready": warmup.ready, "warmup": warmup.snapshot()}
+
+
+@app.get("/health/ready")
+def health_ready() -> Any:
+    # For readiness probes, which only look at the status code
+    return FastJSONResponse(
+        content={"ready": warmup.ready, "warmup": warmup.snapshot()},
+        status_code=200 if warmup.ready else 503,
+    )
+
+
+@app.get("/metrics")
+def get_metrics() -> Response:
+    # Prometheus text exposition format
+    return Response(content=REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+ANALYSIS_MODES = ("incremental", "streaming", "parallel", "sql")
+# Modes that read the storage files directly, by the backend they need
+ANALYSIS_MODE_BACKENDS = {"streaming": "csv", "parallel": "csv", "sql": "sqlite"}
+
+
+def _analysis_name(mode: str, max_memory_mb: float, processes: Optional[int]) -> str:
+    # mode=streaming re-reads the CSV in bounded chunks and mode=parallel
+    # across a process pool, and mode=sql aggregates inside the database,
+    # instead of using the in-memory aggregates (e.g. to cross-check them)
+    if mode not in ANALYSIS_MODES:
+        raise HTTPException(status_code=422, detail=f"mode must be one of {', '.join(ANALYSIS_MODES)}")
+    needs = ANALYSIS_MODE_BACKENDS.get(mode, store.backend)
+    if needs != store.backend:
+        raise HTTPException(status_code=422, detail=f"mode={mode} needs the {needs} storage backend")
+    if processes is not None and processes < 1:
+        raise HTTPException(status_code=422, detail="processes must be at least 1")
+    if not (math.isfinite(max_memory_mb) and max_memory_mb > 0):
+        raise HTTPException(status_code=422, detail="max_memory_mb must be a positive number")
+    return {
+        "incremental": "analysis",
+        "streaming": f"analysis:streaming:{max_memory_mb:g}",
+        "parallel": "analysis:parallel",
+        "sql": "analysis:sql",
+    }[mode]
+
+
+def _analysis_response(
+    workers: StorageBackend,
+    mode: str,
+    max_memory_mb: float,
+    processes: Optional[int],
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+) -> CachedResponse:
+    name = _analysis_name(mode, max_memory_mb, processes)
+    with span("analysis.cache"):
+        key = (workers.fingerprint(), workers.version)
+        cached = responses.get(name, key)
+    if cached is not None:
+        return cached
+    if mode == "incremental":
+        with span("analysis.incremental"), workers.lock:
+            key = (workers.fingerprint(), workers.version)
+            results = analytics.results()
+    elif mode == "sql":
+        with span("analysis.sql"), workers.lock:
+            key = (workers.fingerprint(), workers.version)
+            results = workers.analyze()
+    else:
+        # Fold journaled writes into the CSV so the scan sees them; the
+        # version is read first so a write racing the scan forces a miss
+        version = workers.version
+        with span("analysis.compact"):
+            workers.compact()
+        key = (workers.fingerprint(), version)
+        if mode == "streaming":
+            results = analyze_streaming(str(workers.path), max_memory_mb=max_memory_mb, progress=progress)
+        else:
+            results = analyze_parallel(str(workers.path), workers=processes, progress=progress)
+    with span("encode"):
+        body = dumps(results)
+    return responses.put(name, key, body)
+
+
+def _cached_body(cached: CachedResponse, if_none_match: Optional[str]) -> Response:
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, cached.etag):
+        NOT_MODIFIED.inc()
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
 
 
 @app.get("/analysis")
-def get_analysis() -> dict:
-    if not DATASET_PATH.exists():
-        raise HTTPException(status_code=404, detail="Dataset not found")
+def get_analysis(
+    mode: str = "incremental",
+    max_memory_mb: float = DEFAULT_MAX_MEMORY_MB,
+    processes: Optional[int] = None,
+    if_none_match: Optional[str] = Header(None),
+) -> Any:
+    _analysis_name(mode, max_memory_mb, processes)
+    workers = _get_store()
     try:
-        results = analyze_dairy_data(str(DATASET_PATH))
-        safe = sanitize(results)
-        return JSONResponse(content=jsonable_encoder(safe))
+        cached = _analysis_response(workers, mode, max_memory_mb, processes)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {exc}")
+    return _cached_body(cached, if_none_match)
+
+
+@app.get("/analysis/verify")
+def verify_analysis() -> dict:
+    # Consistency check of the incremental aggregates against a full recompute
+    workers = _get_store()
+    try:
+        with workers.lock:
+            mismatches = analytics.verify(workers.frame())
+        return {"consistent": not mismatches, "mismatches": mismatches}
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Verification failed: {exc}")
 
 
 # Minimal workers API that appends to CSV
@@ -67,10 +264,9 @@ def get_analysis() -> dict:
 def _default_row_from_payload(payload: Dict, next_employee_number: int) -> Dict[str, Any]:
     # CSV header reference
     # Age,Attrition,BusinessTravel,DailyRate,Department,DistanceFromHome,Education,EducationField,EmployeeCount,EmployeeNumber,EnvironmentSatisfaction,Gender,HourlyRate,JobInvolvement,JobLevel,JobRole,JobSatisfaction,MaritalStatus,MonthlyIncome,MonthlyRate,NumCompaniesWorked,OverTime,PercentSalaryHike,PerformanceRating,RelationshipSatisfaction,StockOptionLevel,TotalWorkingYears,TrainingTimesLastYear,WorkLifeBalance,YearsAtCompany,YearsInCurrentRole,YearsSinceLastPromotion,YearsWithCurrManager,OperatorSkillScore,RequiredSkillByRole
-    dept = str(payload.get("department", "Production"))
+    dept = str(payload.get("department") or "Production")
     exp_text = str(payload.get("experience", "0")).lower()
     # parse experience like "5 years" -> 5
-    import re
     m = re.search(r"(\d+)", exp_text)
     exp_years = int(m.group(1)) if m else 0
 
@@ -135,75 +331,197 @@ def _default_row_from_payload(payload: Dict, next_employee_number: int) -> Dict[
         "Phone Number": payload.get("phone", ""),
         "Skills": payload.get("skills", ""),
     }
-    return row
+    return validate_row(row)
 
 
 @app.post("/workers/append")
 def append_worker(payload: Dict = Body(...)) -> Any:
     try:
-        import pandas as pd  # local import to keep module load fast
-        if not DATASET_PATH.exists():
-            raise HTTPException(status_code=404, detail="Dataset not found")
-
-        df = pd.read_csv(DATASET_PATH)
-        next_emp_num = int(df["EmployeeNumber"].max()) + 1 if not df.empty else 1
-        row = _default_row_from_payload(payload, next_emp_num)
-        # Append
-        df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
-        df.to_csv(DATASET_PATH, index=False)
-        return JSONResponse(content={"status": "appended", "employeeNumber": next_emp_num})
+        workers = _get_store()
+        next_emp_num = workers.create(lambda n: _default_row_from_payload(payload, n))
+        responses.invalidate()
+        return FastJSONResponse(content={"status": "appended", "employeeNumber": next_emp_num})
+    except SchemaError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
     except HTTPException:
         raise
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Failed to append worker: {exc}")
 
 
-# CSV-backed Workers CRUD
-
-def _read_dataset():
-    import pandas as pd
-    if not DATASET_PATH.exists():
-        raise HTTPException(status_code=404, detail="Dataset not found")
-    return pd.read_csv(DATASET_PATH)
+# Workers CRUD served from the in-memory store
 
+WORKER_LIST_FIELDS = [
+    "EmployeeNumber", "Name", "Email", "Phone Number", "Department", "JobRole", "Age", "Gender",
+    "MonthlyIncome", "YearsAtCompany", "OverTime", "OperatorSkillScore", "RequiredSkillByRole"
+]
 
-def _write_dataset(df) -> None:
-    df.to_csv(DATASET_PATH, index=False)
 
+MAX_WORKER_PAGE_SIZE = 1000
 
-def _df_to_worker_list(df) -> Any:
-    df = df.replace([np.nan, np.inf, -np.inf], None)
 
-    cols = [
-        "EmployeeNumber", "Name", "Email", "Phone Number", "Department", "JobRole", "Age", "Gender",
-        "MonthlyIncome", "YearsAtCompany", "OverTime", "OperatorSkillScore", "RequiredSkillByRole"
-    ]
-    existing = [c for c in cols if c in df.columns]
-    return [
-        {k: sanitize(v) for k, v in rec.items()}
-        for rec in df[existing].to_dict(orient="records")
-    ]
+def _selected_fields(workers: StorageBackend, fields: Optional[str], default: List[str]) -> List[str]:
+    # fields=a,b,c projection; unknown column names are a client error
+    if not fields:
+        return default
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in selected if f not in workers.columns]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(unknown)}")
+    return selected
 
 
 @app.get("/workers")
-def list_workers_csv() -> Any:
+def list_workers_csv(
+    request: Request,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    department: Optional[List[str]] = Query(None),
+    job_role: Optional[List[str]] = Query(None),
+    overtime: Optional[List[str]] = Query(None),
+    skill_min: Optional[float] = None,
+    skill_max: Optional[float] = None,
+    required_skill_min: Optional[float] = None,
+    required_skill_max: Optional[float] = None,
+    sort: Optional[str] = None,
+    fields: Optional[str] = None,
+) -> Any:
+    # Without limit every matching worker is returned (as the dashboard
+    # expects); with it, one page plus an X-Next-Cursor header to continue
+    if limit is not None and not 1 <= limit <= MAX_WORKER_PAGE_SIZE:
+        raise HTTPException(status_code=422, detail=f"limit must be between 1 and {MAX_WORKER_PAGE_SIZE}")
     try:
-        df = _read_dataset()
-        return JSONResponse(content=jsonable_encoder(_df_to_worker_list(df)))
+        workers = _get_store()
+        selected = _selected_fields(workers, fields, WORKER_LIST_FIELDS)
+        equals = {
+            field: set(values)
+            for field, values in (("Department", department), ("JobRole", job_role), ("OverTime", overtime))
+            if values
+        }
+        ranges = {
+            field: bounds
+            for field, bounds in (
+                ("OperatorSkillScore", (skill_min, skill_max)),
+                ("RequiredSkillByRole", (required_skill_min, required_skill_max)),
+            )
+            if bounds != (None, None)
+        }
+        query = WorkerQuery(equals=equals, ranges=ranges, sort=parse_sort(sort))
+        with span("workers.query"), workers.lock:
+            if not equals and not ranges and not sort and limit is None and cursor is None:
+                rows, next_cursor = workers.records(selected), None
+            else:
+                page, next_cursor = worker_indexes.query(query, limit=limit, cursor=cursor)
+                rows = workers.records(selected, employee_numbers=page)
+        headers = {}
+        if next_cursor is not None:
+            headers["X-Next-Cursor"] = next_cursor
+            headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+        return FastJSONResponse(content=rows, headers=headers)
+    except InvalidQuery as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
     except HTTPException:
         raise
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Failed to list workers: {exc}")
 
 
+# Bulk import/export; bodies are streamed in both directions
+
+MAX_IMPORT_ERRORS = 20
+
+
+def _import_row(record: Dict[str, Any], next_employee_number: int) -> Dict[str, Any]:
+    # Form-style keys (name, department, experience, ...) get the same defaults
+    # as POST /workers; dataset columns in the record (e.g. a re-imported
+    # export) then override those defaults
+    payload = dict(record)
+    payload.setdefault("department", record.get("Department"))
+    row = _default_row_from_payload(payload, next_employee_number)
+    overrides = {k: v for k, v in record.items() if k in row and k != "EmployeeNumber"}
+    if not overrides:
+        return row
+    row.update(overrides)
+    return validate_row(row)
+
+
+class _ImportRejected(Exception):
+    # Raised by the row stream once the body is read, so create_many stores nothing
+    def __init__(self, errors: List[str]) -> None:
+        super().__init__(f"{len(errors)} invalid records")
+        self.errors = errors
+
+
+def _validated_rows(request: Request, fmt: str) -> Iterator[Dict[str, Any]]:
+    # Rows are yielded until the first invalid record; after that the body is
+    # only checked for further errors
+    errors: List[str] = []
+    try:
+        for number, record in enumerate(iter_records(iter_body(request), fmt), 1):
+            try:
+                # Placeholder number; the real ones are assigned on commit
+                row = _import_row(record, 1)
+            except SchemaError as exc:
+                errors.append(f"record {number}: {exc}")
+                if len(errors) >= MAX_IMPORT_ERRORS:
+                    break
+                continue
+            if not errors:
+                yield row
+    except (ValueError, csv.Error) as exc:
+        errors.append(str(exc))
+    if errors:
+        raise _ImportRejected(errors)
+
+
+@app.post("/workers/import")
+def import_workers(request: Request, format: Optional[str] = None) -> Any:
+    # All rows are validated before any is stored: create_many spools them
+    # to a temporary file as they are parsed, then inserts them under
+    # consecutive EmployeeNumbers as a single commit
+    try:
+        fmt = format_for(request.headers.get("content-type"), format)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    try:
+        workers = _get_store()
+        try:
+            created = workers.create_many(_validated_rows(request, fmt))
+        except _ImportRejected as exc:
+            raise HTTPException(status_code=422, detail={"message": "No workers imported", "errors": exc.errors})
+        responses.invalidate()
+        return {
+            "status": "imported",
+            "count": len(created),
+            "firstEmployeeNumber": created[0] if created else None,
+            "lastEmployeeNumber": created[-1] if created else None,
+        }
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Failed to import workers: {exc}")
+
+
+@app.get("/workers/export")
+def export_workers(format: str = "csv", fields: Optional[str] = None) -> StreamingResponse:
+    if format not in FORMATS:
+        raise HTTPException(status_code=422, detail=f"format must be one of {', '.join(FORMATS)}")
+    workers = _get_store()
+    selected = _selected_fields(workers, fields, workers.columns)
+    return StreamingResponse(
+        iter_export(workers, selected, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="workers.{format}"'},
+    )
+
+
 @app.get("/workers/{employee_number}")
 def get_worker_csv(employee_number: int) -> Any:
     try:
-        df = _read_dataset()
-        row = df[df["EmployeeNumber"] == employee_number]
-        if row.empty:
-            raise HTTPException(status_code=404, detail="Worker not found")
-        return JSONResponse(content=jsonable_encoder(sanitize(row.iloc[0].to_dict())))
+        workers = _get_store()
+        return FastJSONResponse(content=workers.get(employee_number))
+    except WorkerNotFound:
+        raise HTTPException(status_code=404, detail="Worker not found")
     except HTTPException:
         raise
     except Exception as exc:
@@ -213,13 +531,12 @@ def get_worker_csv(employee_number: int) -> Any:
 @app.post("/workers")
 def create_worker_csv(payload: Dict = Body(...)) -> Any:
     try:
-        import pandas as pd
-        df = _read_dataset()
-        next_emp_num = int(df["EmployeeNumber"].max()) + 1 if not df.empty else 1
-        row = _default_row_from_payload(payload, next_emp_num)
-        df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
-        _write_dataset(df)
+        workers = _get_store()
+        next_emp_num = workers.create(lambda n: _default_row_from_payload(payload, n))
+        responses.invalidate()
         return {"status": "created", "employeeNumber": next_emp_num}
+    except SchemaError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
     except HTTPException:
         raise
     except Exception as exc:
@@ -229,22 +546,21 @@ def create_worker_csv(payload: Dict = Body(...)) -> Any:
 @app.put("/workers/{employee_number}")
 def update_worker_csv(employee_number: int, payload: Dict = Body(...)) -> Any:
     try:
-        df = _read_dataset()
-        idx_list = df.index[df["EmployeeNumber"] == employee_number].tolist()
-        if not idx_list:
-            raise HTTPException(status_code=404, detail="Worker not found")
-        idx = idx_list[0]
+        workers = _get_store()
         # Allowed editable fields (subset present in dataset)
         editable = {
             "Department", "JobRole", "Age", "Gender", "MonthlyIncome",
             "YearsAtCompany", "OverTime", "OperatorSkillScore", "RequiredSkillByRole",
             "Name", "Email", "Phone Number", "Skills"
         }
-        for k, v in payload.items():
-            if k in editable and k in df.columns:
-                df.at[idx, k] = v
-        _write_dataset(df)
+        changes = validate_fields({k: v for k, v in payload.items() if k in editable})
+        workers.update(employee_number, changes)
+        responses.invalidate()
         return {"status": "updated", "employeeNumber": employee_number}
+    except SchemaError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except WorkerNotFound:
+        raise HTTPException(status_code=404, detail="Worker not found")
     except HTTPException:
         raise
     except Exception as exc:
@@ -254,27 +570,236 @@ def update_worker_csv(employee_number: int, payload: Dict = Body(...)) -> Any:
 @app.delete("/workers/{employee_number}")
 def delete_worker_csv(employee_number: int) -> Any:
     try:
-        df = _read_dataset()
-        before = len(df)
-        df = df[df["EmployeeNumber"] != employee_number]
-        if len(df) == before:
-            raise HTTPException(status_code=404, detail="Worker not found")
-        _write_dataset(df)
+        workers = _get_store()
+        workers.delete(employee_number)
+        responses.invalidate()
         return {"status": "deleted", "employeeNumber": employee_number}
+    except WorkerNotFound:
+        raise HTTPException(status_code=404, detail="Worker not found")
     except HTTPException:
         raise
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Failed to delete worker: {exc}")
 
-@app.post("/analysis/run")
-def run_analysis() -> dict:
-    if not DATASET_PATH.exists():
-        raise HTTPException(status_code=404, detail="Dataset not found")
+# Worker-to-job matching, scored over every worker in one vectorized pass
+
+MATCH_FIELDS = ["EmployeeNumber", "Name", "Department", "JobRole", "OperatorSkillScore", "YearsAtCompany"]
+
+
+def _job_requirement(payload: Dict[str, Any]) -> JobRequirement:
+    skills = payload.get("skills") or []
+    if isinstance(skills, str):
+        skills = [skills]
+    if not isinstance(skills, list) or not all(isinstance(s, str) for s in skills):
+        raise InvalidRequirement("skills must be a list of strings")
+    for key in ("jobRole", "department"):
+        if payload.get(key) is not None and not isinstance(payload[key], str):
+            raise InvalidRequirement(f"{key} must be a string")
+    required = payload.get("requiredSkill")
+    if required is not None:
+        try:
+            required = float(required)
+        except (TypeError, ValueError):
+            raise InvalidRequirement("requiredSkill must be a number")
+    return JobRequirement(
+        job_role=payload.get("jobRole"),
+        skills=skills,
+        required_skill=required,
+        department=payload.get("department"),
+        within_role=bool(payload.get("withinRole", False)),
+    )
+
+
+@app.post("/matching/rank")
+def rank_workers(payload: Dict = Body(...)) -> Any:
+    # Body: jobRole, skills, requiredSkill (0-1, defaults to the role's
+    # RequiredSkillByRole), department, withinRole, k (default 10)
     try:
-        results = analyze_dairy_data(str(DATASET_PATH))
-        payload = {"status": "updated", "summary": sanitize(results.get("summary", {}))}
-        return JSONResponse(content=jsonable_encoder(payload))
+        requirement = _job_requirement(payload)
+        try:
+            k = int(payload.get("k", 10))
+        except (TypeError, ValueError):
+            raise InvalidRequirement("k must be an integer")
+        workers = _get_store()
+        with workers.lock:
+            matches, candidates = matcher.rank(requirement, k)
+            rows = workers.records(MATCH_FIELDS, employee_numbers=[m.employee_number for m in matches])
+        details = {row["EmployeeNumber"]: row for row in rows}
+        return {
+            "jobRole": requirement.job_role,
+            "requiredSkill": requirement.required_skill
+            if requirement.required_skill is not None or not requirement.job_role
+            else matcher.role_level(requirement.job_role),
+            "candidates": candidates,
+            "matches": [
+                {
+                    **details.get(m.employee_number, {"EmployeeNumber": m.employee_number}),
+                    "score": m.score,
+                    "status": m.status,
+                    "skillCoverage": m.skill_coverage,
+                    "levelFit": m.level_fit,
+                    "matchedSkills": m.matched_skills,
+                    "missingSkills": m.missing_skills,
+                }
+                for m in matches
+            ],
+        }
+    except InvalidRequirement as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except HTTPException:
+        raise
     except Exception as exc:
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {exc}")
+        raise HTTPException(status_code=500, detail=f"Matching failed: {exc}")
+
+
+@app.get("/matching/roles")
+def matching_roles() -> Any:
+    # Roles a job can be matched against, with their default required level
+    workers = _get_store()
+    with workers.lock:
+        return matcher.roles()
+
+
+# Attrition risk from the offline-trained model (backend/attrition_model.json)
 
+AT_RISK_FIELDS = ["EmployeeNumber", "Name", "Department", "JobRole", "Age", "YearsAtCompany", "OverTime"]
 
+
+@app.get("/attrition/at-risk")
+def attrition_at_risk(n: int = 10, department: Optional[str] = None) -> Any:
+    # Top-n workers by predicted attrition risk in each department (or one),
+    # with the features pushing each worker's risk up the most
+    if not 1 <= n <= MAX_AT_RISK:
+        raise HTTPException(status_code=422, detail=f"n must be between 1 and {MAX_AT_RISK}")
+    try:
+        workers = _get_store()
+        with workers.lock:
+            ranked = attrition.at_risk(n, department)
+            rows = workers.records(employee_numbers=[e for top in ranked.values() for e, _ in top])
+        model = attrition.model
+        details = {row["EmployeeNumber"]: row for row in rows}
+        return {
+            "model": model.info,
+            "departments": {
+                dept: [
+                    {
+                        **{f: details[e].get(f) for f in AT_RISK_FIELDS},
+                        "risk": round(score, 4),
+                        "drivers": model.drivers(details[e]),
+                    }
+                    for e, score in top if e in details
+                ]
+                for dept, top in ranked.items()
+            },
+        }
+    except ModelUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Attrition scoring failed: {exc}")
+
+
+@app.get("/attrition/{employee_number}")
+def attrition_for_worker(employee_number: int) -> Any:
+    try:
+        workers = _get_store()
+        with workers.lock:
+            row = workers.get(employee_number)
+            score = attrition.score(employee_number)
+        if score is None:
+            raise ModelUnavailable(f"No attrition model was loaded from {attrition.path}")
+        return {"EmployeeNumber": employee_number, "risk": round(score, 4), "drivers": attrition.model.drivers(row)}
+    except WorkerNotFound:
+        raise HTTPException(status_code=404, detail="Worker not found")
+    except ModelUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Attrition scoring failed: {exc}")
+
+
+# Analysis jobs: submit returns at once, the work runs on the job pool and
+# identical submissions share one computation
+
+def _job_or_404(job_id: str) -> Job:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def _job_status(job: Job) -> Dict[str, Any]:
+    status = job.snapshot()
+    status["resultUrl"] = f"/analysis/jobs/{job.id}/result"
+    status["eventsUrl"] = f"/analysis/jobs/{job.id}/events"
+    return status
+
+
+@app.post("/analysis/run", status_code=202)
+def run_analysis(
+    mode: str = "incremental",
+    max_memory_mb: float = DEFAULT_MAX_MEMORY_MB,
+    processes: Optional[int] = None,
+) -> Any:
+    name = _analysis_name(mode, max_memory_mb, processes)
+    workers = _get_store()
+    try:
+        # _get_store reloads, bumping the version, when the files changed on
+        # disk, so the version identifies the data; the fingerprint (which
+        # may mean hashing the CSV) is only taken inside the job
+        key = (name, workers.version)
+        job, coalesced = jobs.submit(
+            key, name,
+            lambda job: _analysis_response(workers, mode, max_memory_mb, processes, progress=job.report),
+        )
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Failed to submit analysis: {exc}")
+    payload = _job_status(job)
+    payload["coalesced"] = coalesced
+    return FastJSONResponse(status_code=202, content=payload, headers={"Location": f"/analysis/jobs/{job.id}"})
+
+
+@app.get("/analysis/jobs/{job_id}")
+async def get_analysis_job(job_id: str) -> dict:
+    return _job_status(_job_or_404(job_id))
+
+
+@app.get("/analysis/jobs/{job_id}/result")
+async def get_analysis_job_result(job_id: str, if_none_match: Optional[str] = Header(None)) -> Any:
+    job = _job_or_404(job_id)
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {job.error}")
+    if not job.finished:
+        # Not ready yet: point the client back at the status resource
+        return FastJSONResponse(status_code=202, content=_job_status(job), headers={"Retry-After": "1"})
+    return _cached_body(job.result, if_none_match)
+
+
+@app.get("/analysis/jobs/{job_id}/events")
+async def stream_analysis_job(job_id: str) -> StreamingResponse:
+    # Server-sent events: one "progress" event per change, then "done"/"failed"
+    job = _job_or_404(job_id)
+
+    async def events():
+        # Polls the job rather than blocking on it, so an open stream holds
+        # no thread; the job's revision tells whether anything changed
+        revision = None
+        idle = 0.0
+        while True:
+            if job.revision != revision or job.finished:
+                status = _job_status(job)
+                revision = status["revision"]
+                event = job.status if job.finished else "progress"
+                yield f"event: {event}\ndata: {json.dumps(status)}\n\n"
+                if job.finished:
+                    return
+                idle = 0.0
+            elif idle >= JOB_EVENT_HEARTBEAT_SECONDS:
+                yield ": keep-alive\n\n"
+                idle = 0.0
+            await asyncio.sleep(JOB_EVENT_POLL_SECONDS)
+            idle += JOB_EVENT_POLL_SECONDS
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
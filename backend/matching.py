@@ -0,0 +1,369 @@
+"""Vectorized worker-to-job matching.
+
+Every worker occupies one slot in a set of parallel NumPy arrays (skill
+level, role and department codes) plus a skill-major 0/1 matrix with one
+row per known skill, so scoring all workers against a job is a handful of
+whole-array operations and the top k come from ``np.argpartition``
+instead of a full sort. The engine is a store listener and keeps every
+array, and the per-role slot indexes, current as workers change.
+"""
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .storage import frame_column
+
+# Weights of the score components; they sum to 1 and the score is 0-100.
+# Without requested skills the coverage weight is spread over the others.
+COVERAGE_WEIGHT = 0.5
+LEVEL_WEIGHT = 0.35
+ROLE_WEIGHT = 0.15
+# Status labels shown by the skill-matching dashboard
+OPTIMAL_SCORE = 90.0
+SUBOPTIMAL_SCORE = 75.0
+MAX_MATCHES = 1000
+
+_SKILL_SEPARATORS = re.compile(r"[,;|/\n]+")
+# Row fields the bulk fill reads besides EmployeeNumber
+_FILL_FIELDS = ("OperatorSkillScore", "Department", "JobRole", "Skills", "RequiredSkillByRole")
+
+
+class InvalidRequirement(ValueError):
+    pass
+
+
+def _number(value: Any) -> Optional[float]:
+    if value is None or isinstance(value, str):
+        return None
+    value = float(value)
+    return None if value != value else value
+
+
+def parse_skills(value: Any) -> List[str]:
+    """Skill names from a list or a comma/semicolon separated string, deduplicated."""
+    if value is None or (isinstance(value, float) and value != value):
+        return []
+    parts = value if isinstance(value, (list, tuple)) else _SKILL_SEPARATORS.split(str(value))
+    skills: Dict[str, str] = {}
+    for part in parts:
+        name = " ".join(str(part).split())
+        if name:
+            skills.setdefault(name.casefold(), name)
+    return list(skills.values())
+
+
+class JobRequirement(NamedTuple):
+    # Role the job is for: workers already in it score higher, and its
+    # mean RequiredSkillByRole is the level unless required_skill is given
+    job_role: Optional[str] = None
+    skills: Sequence[str] = ()
+    required_skill: Optional[float] = None
+    department: Optional[str] = None
+    # Only rank workers currently in job_role
+    within_role: bool = False
+
+
+class Match(NamedTuple):
+    employee_number: int
+    score: float
+    skill_coverage: Optional[float]
+    level_fit: float
+    matched_skills: List[str]
+    missing_skills: List[str]
+
+    @property
+    def status(self) -> str:
+        if self.score >= OPTIMAL_SCORE:
+            return "optimal"
+        if self.score >= SUBOPTIMAL_SCORE:
+            return "suboptimal"
+        return "mismatch"
+
+
+class _Codes:
+    # Interned strings (roles, departments, skills) <-> small integer codes
+    def __init__(self) -> None:
+        self.codes: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def code(self, name: str) -> int:
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+
+class SkillMatcher:
+    """Ranks workers for a job; attach with ``store.subscribe(matcher)``."""
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._capacity = capacity
+        self.reset(())
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def reset(self, rows: Iterable[Dict[str, Any]]) -> None:
+        rows = list(rows)
+        self._clear(len(rows))
+        numbers = [int(row["EmployeeNumber"]) for row in rows]
+        if len(set(numbers)) != len(numbers):
+            for row in rows:
+                self._add(row)
+            return
+        self._fill(numbers, {f: [row.get(f) for row in rows] for f in _FILL_FIELDS})
+
+    def reset_frame(self, df) -> None:
+        """``reset`` from a DataFrame of every row, without a per-row dict."""
+        numbers = [int(e) for e in df["EmployeeNumber"].tolist()]
+        if len(set(numbers)) != len(numbers):
+            columns = {f: frame_column(df, f) for f in df.columns}
+            self.reset([dict(zip(columns, values)) for values in zip(*columns.values())])
+            return
+        self._clear(len(numbers))
+        self._fill(numbers, {f: frame_column(df, f) for f in _FILL_FIELDS})
+
+    def _clear(self, n: int) -> None:
+        capacity = max(self._capacity, n)
+        self._employee = np.zeros(capacity, dtype=np.int64)
+        self._active = np.zeros(capacity, dtype=bool)
+        self._level = np.zeros(capacity, dtype=np.float64)
+        self._role = np.full(capacity, -1, dtype=np.int32)
+        self._department = np.full(capacity, -1, dtype=np.int32)
+        # Row j is skill j across all slots (skill-major: one contiguous row
+        # per requested skill is all a query touches)
+        self._skills = np.zeros((8, capacity), dtype=np.uint8)
+        self._slot_of: Dict[int, int] = {}
+        self._free: List[int] = []
+        self._size = 0
+        self._roles = _Codes()
+        self._departments = _Codes()
+        # Skill rows, keyed by case-folded name
+        self._skill_keys = _Codes()
+        # Per role: member slots (array built on demand after a change) and
+        # the running sum/count of RequiredSkillByRole
+        self._role_slots: Dict[int, Set[int]] = {}
+        self._role_arrays: Dict[int, np.ndarray] = {}
+        self._role_required: Dict[int, List[float]] = {}
+
+    def _fill(self, numbers: List[int], columns: Dict[str, List[Any]]) -> None:
+        # Bulk fill of an empty matcher with distinct employees, a column at a time
+        n = len(numbers)
+        self._employee[:n] = numbers
+        self._active[:n] = True
+        self._level[:n] = [_number(v) or 0.0 for v in columns["OperatorSkillScore"]]
+        self._department[:n] = [self._code(self._departments, v) for v in columns["Department"]]
+        roles = self._role[:n]
+        roles[:] = [self._code(self._roles, v) for v in columns["JobRole"]]
+        self._slot_of = dict(zip(numbers, range(n)))
+        self._size = n
+        # Skill row of each separated part of a Skills string, as parse_skills
+        # would name it (-1: blank); a repeated skill just sets its cell twice
+        part_rows: Dict[str, int] = {}
+        cells: List[int] = []
+        slots: List[int] = []
+        for slot, value in enumerate(columns["Skills"]):
+            if not value:
+                continue
+            if not isinstance(value, str):
+                parsed = [self._skill_row(skill) for skill in parse_skills(value)]
+            else:
+                parsed = []
+                for part in _SKILL_SEPARATORS.split(value):
+                    row = part_rows.get(part)
+                    if row is None:
+                        name = " ".join(part.split())
+                        row = part_rows[part] = self._skill_row(name) if name else -1
+                    if row >= 0:
+                        parsed.append(row)
+            cells.extend(parsed)
+            slots.extend([slot] * len(parsed))
+        # Set once every skill has its row, since a new skill may grow the matrix
+        self._skills[cells, slots] = 1
+        required = np.array([_number(v) for v in columns["RequiredSkillByRole"]], dtype=np.float64)
+        present = (roles >= 0) & ~np.isnan(required)
+        n_roles = len(self._roles.names)
+        totals = np.bincount(roles[present], weights=required[present], minlength=n_roles)
+        counts = np.bincount(roles[present], minlength=n_roles)
+        order = np.argsort(roles, kind="stable")
+        bounds = np.searchsorted(roles[order], np.arange(n_roles + 1))
+        for code in range(n_roles):
+            self._role_slots[code] = set(order[bounds[code]:bounds[code + 1]].tolist())
+            if counts[code]:
+                self._role_required[code] = [float(totals[code]), int(counts[code])]
+
+    @staticmethod
+    def _code(codes: "_Codes", name: Any) -> int:
+        return -1 if name is None else codes.code(name)
+
+    def apply(self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> None:
+        if old is not None:
+            self._remove(int(old["EmployeeNumber"]), old)
+        if new is not None:
+            self._add(new)
+
+    def _grow(self) -> None:
+        capacity = len(self._employee) * 2
+        for name in ("_employee", "_active", "_level", "_role", "_department"):
+            array = getattr(self, name)
+            grown = np.full(capacity, -1 if array.dtype == np.int32 else 0, dtype=array.dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+        skills = np.zeros((self._skills.shape[0], capacity), dtype=np.uint8)
+        skills[:, :self._skills.shape[1]] = self._skills
+        self._skills = skills
+
+    def _skill_row(self, name: str) -> int:
+        key = name.casefold()
+        row = self._skill_keys.codes.get(key)
+        if row is None:
+            row = self._skill_keys.code(key)
+            if row == self._skills.shape[0]:
+                rows = np.zeros((row * 2, self._skills.shape[1]), dtype=np.uint8)
+                rows[:row] = self._skills
+                self._skills = rows
+        return row
+
+    def _add(self, row: Dict[str, Any]) -> None:
+        employee_number = int(row["EmployeeNumber"])
+        if employee_number in self._slot_of:
+            self._remove(employee_number, None)
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self._size == len(self._employee):
+                self._grow()
+            slot = self._size
+            self._size += 1
+        self._slot_of[employee_number] = slot
+        self._employee[slot] = employee_number
+        self._active[slot] = True
+        self._level[slot] = _number(row.get("OperatorSkillScore")) or 0.0
+        self._department[slot] = self._code(self._departments, row.get("Department"))
+        for skill in parse_skills(row.get("Skills")):
+            # The row may grow the matrix, so look it up before indexing
+            skill_row = self._skill_row(skill)
+            self._skills[skill_row, slot] = 1
+        role = row.get("JobRole")
+        if role is None:
+            self._role[slot] = -1
+            return
+        code = self._role[slot] = self._roles.code(role)
+        self._role_slots.setdefault(code, set()).add(slot)
+        self._role_arrays.pop(code, None)
+        required = _number(row.get("RequiredSkillByRole"))
+        if required is not None:
+            totals = self._role_required.setdefault(code, [0.0, 0])
+            totals[0] += required
+            totals[1] += 1
+
+    def _remove(self, employee_number: int, row: Optional[Dict[str, Any]]) -> None:
+        slot = self._slot_of.pop(employee_number, None)
+        if slot is None:
+            return
+        self._active[slot] = False
+        self._skills[:, slot] = 0
+        code = int(self._role[slot])
+        if code >= 0:
+            self._role_slots[code].discard(slot)
+            self._role_arrays.pop(code, None)
+            required = None if row is None else _number(row.get("RequiredSkillByRole"))
+            if required is not None:
+                totals = self._role_required[code]
+                totals[0] -= required
+                totals[1] -= 1
+        self._free.append(slot)
+
+    def roles(self) -> Dict[str, Dict[str, Any]]:
+        """Worker count and mean RequiredSkillByRole of every role."""
+        return {
+            name: {"workers": len(self._role_slots.get(code, ())), "requiredSkill": self.role_level(name)}
+            for code, name in enumerate(self._roles.names)
+            if self._role_slots.get(code)
+        }
+
+    def role_level(self, role: str) -> Optional[float]:
+        code = self._roles.codes.get(role)
+        totals = self._role_required.get(code) if code is not None else None
+        if not totals or totals[1] <= 0:
+            return None
+        # Rounded so the running sum's float drift does not show
+        return round(totals[0] / totals[1], 6)
+
+    def _role_members(self, code: int) -> np.ndarray:
+        members = self._role_arrays.get(code)
+        if members is None:
+            members = np.fromiter(self._role_slots.get(code, ()), dtype=np.intp)
+            members.sort()
+            self._role_arrays[code] = members
+        return members
+
+    def rank(self, requirement: JobRequirement, k: int = 10) -> Tuple[List[Match], int]:
+        """The ``k`` best workers for ``requirement``, and how many were scored."""
+        if not 1 <= k <= MAX_MATCHES:
+            raise InvalidRequirement(f"k must be between 1 and {MAX_MATCHES}")
+        role_code = self._roles.codes.get(requirement.job_role) if requirement.job_role else None
+        required = requirement.required_skill
+        if required is None and requirement.job_role:
+            required = self.role_level(requirement.job_role)
+            if required is None:
+                raise InvalidRequirement(f"Unknown jobRole: {requirement.job_role}")
+        if required is not None and not 0 <= required <= 1:
+            raise InvalidRequirement("requiredSkill must be between 0 and 1")
+        if requirement.within_role and role_code is None:
+            raise InvalidRequirement("withinRole needs a known jobRole")
+        wanted = parse_skills(list(requirement.skills))
+
+        # Candidate slots: one role's members, or every slot in use
+        if requirement.within_role:
+            slots: Optional[np.ndarray] = self._role_members(role_code)
+            valid = np.ones(len(slots), dtype=bool)
+        else:
+            slots = None
+            valid = self._active[:self._size].copy()
+        column = (lambda array: array[:self._size]) if slots is None else (lambda array: array[slots])
+        if requirement.department is not None:
+            department = self._departments.codes.get(requirement.department, -2)
+            valid &= column(self._department) == department
+        candidates = int(valid.sum())
+        if not candidates:
+            return [], 0
+
+        level = column(self._level)
+        if required:
+            fit = np.minimum(level / required, 1.0)
+        else:
+            fit = np.ones(len(level))
+        same_role = column(self._role) == (-2 if role_code is None else role_code)
+        rows = [self._skill_keys.codes.get(s.casefold()) for s in wanted]
+        known = [r for r in rows if r is not None]
+        if wanted:
+            matched = np.zeros(len(level), dtype=np.int32)
+            for r in known:
+                matched += column(self._skills[r])
+            coverage = matched / len(wanted)
+            score = COVERAGE_WEIGHT * coverage + LEVEL_WEIGHT * fit + ROLE_WEIGHT * same_role
+        else:
+            coverage = None
+            score = (LEVEL_WEIGHT * fit + ROLE_WEIGHT * same_role) / (LEVEL_WEIGHT + ROLE_WEIGHT)
+        # Among equal scores the higher skill level ranks first
+        key = np.where(valid, score + level * 1e-9, -np.inf)
+
+        k = min(k, candidates)
+        top = np.argpartition(-key, k - 1)[:k] if k < len(key) else np.arange(len(key))
+        top = top[np.argsort(-key[top], kind="stable")][:k]
+        matches = []
+        for i in top:
+            slot = int(i if slots is None else slots[i])
+            have = {r for r in known if self._skills[r, slot]}
+            matches.append(Match(
+                employee_number=int(self._employee[slot]),
+                score=round(float(score[i]) * 100, 2),
+                skill_coverage=None if coverage is None else round(float(coverage[i]), 4),
+                level_fit=round(float(fit[i]), 4),
+                matched_skills=[s for s, r in zip(wanted, rows) if r in have],
+                missing_skills=[s for s, r in zip(wanted, rows) if r not in have],
+            ))
+        return matches, candidates
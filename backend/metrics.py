@@ -0,0 +1,247 @@
+"""Request latency histograms, I/O and cache counters, and per-stage timing spans.
+
+``with span("analyzer.correlation"):`` times a block into the
+``dairy_stage_seconds`` histogram. While a request sent with
+``X-Profile: 1`` is being handled, the spans it runs are also collected and
+returned in a ``Server-Timing`` response header, innermost first.
+``MetricsMiddleware`` records the latency of every request by route, and
+``GET /metrics`` renders everything in the Prometheus text format.
+
+Set ``API_METRICS=0`` to switch it all off: ``span`` then returns a shared
+no-op, counters return at once and the middleware passes requests through.
+Only the standard library is used, so the analyzer and the CLI can import
+this module without the web stack.
+"""
+from bisect import bisect_left
+from contextvars import ContextVar
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+ENABLED = os.environ.get("API_METRICS", "1") != "0"
+# Seconds, from cached responses (~1ms) to full scans of large datasets
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROFILE_HEADER = b"x-profile"
+
+Labels = Tuple[str, ...]
+
+
+def _format_labels(names: Labels, values: Labels, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Labels = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        if not ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_format_labels(self.labels, labels)} {_number(value)}"
+
+
+class CallbackCounter(Counter):
+    """A counter kept elsewhere (e.g. ``ResponseCache.hits``), read at scrape time."""
+
+    def __init__(self, name: str, help: str, labels: Labels, read: Callable[[], Dict[Labels, float]]) -> None:
+        super().__init__(name, help, labels)
+        self._read = read
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        raise TypeError(f"{self.name} is read from its source, not incremented")
+
+    def render(self) -> Iterator[str]:
+        values = dict(self._read())
+        with self._lock:
+            self._values = values
+        yield from super().render()
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Labels = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket (last one is +Inf), sum]
+        self._series: Dict[Labels, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        if not ENABLED:
+            return
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = sorted((labels, list(counts), total) for labels, (counts, total) in self._series.items())
+        for labels, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = _format_labels(self.labels, labels, f'le="{_number(bound)}"')
+                yield f"{self.name}_bucket{le} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labels, labels)} {total!r}"
+            yield f"{self.name}_count{_format_labels(self.labels, labels)} {cumulative}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Any] = {}
+
+    def register(self, metric: Any) -> Any:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics.values() for line in metric.render()) + "\n"
+
+
+REGISTRY = Registry()
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "dairy_http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status"),
+))
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "dairy_stage_seconds", "Time spent in each instrumented stage", ("stage",),
+))
+READ_BYTES = REGISTRY.register(Counter(
+    "dairy_dataset_read_bytes_total", "Bytes of dataset files read", ("source",),
+))
+WRITE_BYTES = REGISTRY.register(Counter(
+    "dairy_dataset_write_bytes_total", "Bytes of dataset files written", ("target",),
+))
+
+
+class Profile:
+    """Stage timings of one profiled request, in the order stages finished."""
+
+    def __init__(self) -> None:
+        self.stages: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, elapsed: float) -> None:
+        with self._lock:
+            self.stages.append((name, elapsed))
+
+    def server_timing(self, total: float) -> str:
+        entries = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.stages]
+        entries.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(entries)
+
+
+_profile: ContextVar[Optional[Profile]] = ContextVar("dairy_profile", default=None)
+
+
+class _Span:
+    __slots__ = ("name", "start", "profile")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.profile = _profile.get()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        elapsed = time.perf_counter() - self.start
+        STAGE_SECONDS.observe(elapsed, self.name)
+        if self.profile is not None:
+            self.profile.add(self.name, elapsed)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str) -> Any:
+    """Context manager timing a stage; a no-op when metrics are disabled."""
+    return _Span(name) if ENABLED else _NULL_SPAN
+
+
+class MetricsMiddleware:
+    """ASGI middleware: request latency by route, and ``X-Profile`` breakdowns."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not ENABLED:
+            await self.app(scope, receive, send)
+            return
+        profile = Profile() if any(
+            name == PROFILE_HEADER and value not in (b"", b"0") for name, value in scope.get("headers", ())
+        ) else None
+        token = _profile.set(profile) if profile is not None else None
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if profile is not None:
+                    timing = profile.server_timing(time.perf_counter() - start).encode("latin-1")
+                    message = {**message, "headers": [*message.get("headers", ()), (b"server-timing", timing)]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            # The route template, not the raw path, keeps the label set bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_SECONDS.observe(time.perf_counter() - start, scope["method"], route, str(status))
+            if token is not None:
+                _profile.reset(token)
@@ -0,0 +1,125 @@
+"""Multi-process analysis over partitioned datasets.
+
+A single CSV is split into row ranges of its columnar sidecar; each worker
+process memory-maps just its slice of the ``.npy`` columns, so partitions
+are shared through the page cache rather than pickled. A directory is
+treated as one partition per CSV (e.g. one export per plant). Workers
+return small ``PartialAggregates`` which the parent merges in partition
+order, so results do not depend on scheduling.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+from pathlib import Path
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .incremental import ANALYSIS_COLUMNS
+from .metrics import span
+from .streaming import PartialAggregates
+
+# Partitions per worker, so a slow partition does not leave cores idle
+PARTITIONS_PER_WORKER = 4
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    # Pools are kept for the life of the process so repeated API calls do not
+    # pay worker start-up; "spawn" avoids forking a multi-threaded server
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pools[workers] = pool
+        return pool
+
+
+def shutdown_pools() -> None:
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(cancel_futures=True)
+        _pools.clear()
+
+
+def _range_partial(csv_path: str, start: int, stop: int, sketch_k: int) -> PartialAggregates:
+    from .columnar import load_columns
+
+    df = load_columns(csv_path, ANALYSIS_COLUMNS, rows=slice(start, stop))
+    return PartialAggregates.from_frame(df, sketch_k)
+
+
+def _file_partial(csv_path: str, sketch_k: int) -> PartialAggregates:
+    from .columnar import load_columns
+
+    return PartialAggregates.from_frame(load_columns(csv_path, ANALYSIS_COLUMNS), sketch_k)
+
+
+def row_ranges(n_rows: int, partitions: int) -> List[Tuple[int, int]]:
+    partitions = max(1, min(partitions, n_rows))
+    step = -(-n_rows // partitions)
+    return [(start, min(start + step, n_rows)) for start in range(0, n_rows, step)]
+
+
+def dataset_partitions(path: Path) -> List[Path]:
+    path = Path(path)
+    if path.is_dir():
+        files = sorted(p for p in path.glob("*.csv") if p.is_file())
+        if not files:
+            raise FileNotFoundError(f"No .csv files in {path}")
+        return files
+    return [path]
+
+
+def analyze_parallel(
+    dataset_path: str,
+    workers: Optional[int] = None,
+    partitions: Optional[int] = None,
+    sketch_k: int = 8192,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+) -> Dict:
+    """``analyze_dairy_data`` computed by a pool of ``workers`` processes.
+
+    ``progress(partitions_done, partitions)`` is called as partials are merged.
+    """
+    return partial_parallel(dataset_path, workers, partitions, sketch_k, progress).finalize()
+
+
+def partial_parallel(
+    dataset_path: str,
+    workers: Optional[int] = None,
+    partitions: Optional[int] = None,
+    sketch_k: int = 8192,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+) -> PartialAggregates:
+    """The merged aggregates behind ``analyze_parallel``, before finalizing."""
+    workers = workers or default_workers()
+    files = dataset_partitions(Path(dataset_path))
+    pool = _pool(workers)
+    if len(files) > 1:
+        futures = [pool.submit(_file_partial, str(f), sketch_k) for f in files]
+    else:
+        from .columnar import ensure_sidecar
+
+        csv_path = str(files[0])
+        # Build the sidecar once here rather than racing to build it in every worker
+        n_rows = ensure_sidecar(csv_path)["rows"]
+        ranges = row_ranges(n_rows, partitions or workers * PARTITIONS_PER_WORKER)
+        futures = [pool.submit(_range_partial, csv_path, start, stop, sketch_k) for start, stop in ranges]
+
+    total: Optional[PartialAggregates] = None
+    # Partitions are read and reduced in the pool; this is the wait for them
+    with span("parallel.scan"):
+        for done, future in enumerate(futures, 1):
+            part = future.result()
+            total = part if total is None else total.merge(part)
+            if progress is not None:
+                progress(done, len(futures))
+    if total is None:
+        total = PartialAggregates(sketch_k)
+    return total
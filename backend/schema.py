@@ -0,0 +1,142 @@
+"""Declared column types for the worker dataset.
+
+Shared by the analyzer, the API and the standalone script so every
+DataFrame of workers has the same compact layout: strings with a handful
+of distinct values are ``category``, small ordinals and counts are
+``int8``/``int16``, and only the two skill scores stay ``float64`` (their
+values do not survive a float32 round trip). pandas is only imported by
+the functions that build frames, so validating rows does not load it.
+"""
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class Column(NamedTuple):
+    name: str
+    dtype: str
+    # Inclusive bounds enforced on validation (None = only the dtype's range)
+    bounds: Optional[Tuple[float, float]] = None
+
+
+COLUMNS: List[Column] = [
+    Column("Age", "int8", (14, 100)),
+    Column("Attrition", "category"),
+    Column("BusinessTravel", "category"),
+    Column("DailyRate", "int16", (0, 32767)),
+    Column("Department", "category"),
+    Column("DistanceFromHome", "int16", (0, 1000)),
+    Column("Education", "int8", (1, 5)),
+    Column("EducationField", "category"),
+    Column("EmployeeCount", "int8", (0, 1)),
+    Column("EmployeeNumber", "int32", (1, 2**31 - 1)),
+    Column("EnvironmentSatisfaction", "int8", (1, 4)),
+    Column("Gender", "category"),
+    Column("HourlyRate", "int16", (0, 32767)),
+    Column("JobInvolvement", "int8", (1, 4)),
+    Column("JobLevel", "int8", (1, 5)),
+    Column("JobRole", "category"),
+    Column("JobSatisfaction", "int8", (1, 4)),
+    Column("MaritalStatus", "category"),
+    Column("MonthlyIncome", "int32", (0, 2**31 - 1)),
+    Column("MonthlyRate", "int32", (0, 2**31 - 1)),
+    Column("NumCompaniesWorked", "int8", (0, 100)),
+    Column("OverTime", "category"),
+    Column("PercentSalaryHike", "int8", (0, 100)),
+    Column("PerformanceRating", "int8", (1, 4)),
+    Column("RelationshipSatisfaction", "int8", (1, 4)),
+    Column("StockOptionLevel", "int8", (0, 3)),
+    Column("TotalWorkingYears", "int8", (0, 80)),
+    Column("TrainingTimesLastYear", "int8", (0, 100)),
+    Column("WorkLifeBalance", "int8", (1, 4)),
+    Column("YearsAtCompany", "int8", (0, 80)),
+    Column("YearsInCurrentRole", "int8", (0, 80)),
+    Column("YearsSinceLastPromotion", "int8", (0, 80)),
+    Column("YearsWithCurrManager", "int8", (0, 80)),
+    Column("OperatorSkillScore", "float64", (0, 1)),
+    Column("RequiredSkillByRole", "float64", (0, 1)),
+]
+SCHEMA: Dict[str, Column] = {c.name: c for c in COLUMNS}
+CATEGORICAL = [c.name for c in COLUMNS if c.dtype == "category"]
+YES_NO = {"Attrition", "OverTime"}
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def _cast(series, dtype: str):
+    import pandas as pd
+
+    if dtype == "category":
+        return series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype("category")
+    if not pd.api.types.is_numeric_dtype(series) or series.dtype == dtype:
+        return series
+    if dtype.startswith("int"):
+        # Missing values or out-of-range data keep the wider dtype pandas inferred
+        if series.isna().any():
+            return series
+        info = np.iinfo(dtype)
+        if len(series) and (series.min() < info.min or series.max() > info.max):
+            return series
+        if pd.api.types.is_float_dtype(series) and not (series % 1 == 0).all():
+            return series
+    return series.astype(dtype)
+
+
+def apply_schema(df):
+    """Return ``df`` with every declared column cast to its compact dtype."""
+    cast = {name: _cast(df[name], SCHEMA[name].dtype) for name in df.columns if name in SCHEMA}
+    if not cast:
+        return df
+    return df.assign(**cast)
+
+
+def read_csv(path, usecols: Optional[Sequence[str]] = None):
+    """``pd.read_csv`` that parses declared string columns straight to category."""
+    import pandas as pd
+
+    dtype = {name: "category" for name in CATEGORICAL if usecols is None or name in usecols}
+    return apply_schema(pd.read_csv(path, usecols=usecols, dtype=dtype))
+
+
+def validate_fields(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Check and normalise declared columns in ``values``; others pass through."""
+    clean = dict(values)
+    errors = []
+    for name, value in values.items():
+        column = SCHEMA.get(name)
+        if column is None:
+            continue
+        if column.dtype == "category":
+            if not isinstance(value, str) or not value.strip():
+                errors.append(f"{name} must be a non-empty string")
+            elif name in YES_NO and value not in ("Yes", "No"):
+                errors.append(f"{name} must be 'Yes' or 'No'")
+            continue
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            errors.append(f"{name} must be a number")
+            continue
+        if column.dtype.startswith("int"):
+            if not number.is_integer():
+                errors.append(f"{name} must be an integer")
+                continue
+            number = int(number)
+        lo, hi = column.bounds or (-np.inf, np.inf)
+        if not lo <= number <= hi:
+            errors.append(f"{name} must be between {lo} and {hi}")
+            continue
+        clean[name] = number
+    if errors:
+        raise SchemaError("; ".join(errors))
+    return clean
+
+
+def validate_row(row: Dict[str, Any], required: Iterable[str] = SCHEMA) -> Dict[str, Any]:
+    """Validate a complete worker row, requiring every declared column."""
+    missing = [name for name in required if row.get(name) is None]
+    if missing:
+        raise SchemaError(f"Missing columns: {', '.join(missing)}")
+    return validate_fields(row)
@@ -0,0 +1,101 @@
+"""One-pass JSON encoding of API payloads straight to bytes.
+
+Replaces the ``sanitize`` -> ``jsonable_encoder`` -> ``JSONResponse`` chain,
+which walked every payload three times in Python. Plain dicts/lists of
+builtins (worker rows, analysis results) are handed to the C encoder of
+``orjson`` when it is installed, else the stdlib ``json`` one; NumPy/pandas
+scalars, arrays and intervals are converted only when the encoder meets
+them. Non-finite floats become ``null`` and non-string keys strings; those
+cases fall back to a single cleaning walk.
+"""
+import json
+import math
+import sys
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from .metrics import span
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None  # type: ignore
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+
+def _default(obj: Any) -> Any:
+    # Called by the encoders only for values they do not know natively
+    if np is not None:
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+    # Not imported here, so serving JSON does not load pandas: if no other
+    # module has imported it, obj cannot be a pandas object
+    pd = sys.modules.get("pandas")
+    if pd is not None:
+        if isinstance(obj, (pd.Series, pd.Index, pd.Categorical)):
+            return list(obj)
+        if isinstance(obj, pd.DataFrame):
+            return obj.to_dict(orient="records")
+        if isinstance(obj, pd.Timestamp):
+            return obj.isoformat()
+        if obj is pd.NaT or obj is pd.NA:
+            return None
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    # Interval bins, dates, Decimals, ...
+    return str(obj)
+
+
+def _key(key: Any) -> str:
+    if np is not None and isinstance(key, np.generic):
+        key = key.item()
+    return key if isinstance(key, str) else str(key)
+
+
+def _clean(obj: Any) -> Any:
+    """Builtin-only copy of ``obj`` with NaN/inf as None and string keys."""
+    if isinstance(obj, dict):
+        return {_key(k): _clean(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_clean(v) for v in obj]
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if obj is None or isinstance(obj, (str, int, bool)):
+        return obj
+    converted = _default(obj)
+    return converted if isinstance(converted, str) else _clean(converted)
+
+
+_encoder = json.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default)
+_indented_encoder = json.JSONEncoder(ensure_ascii=False, allow_nan=False, indent=2, default=_default)
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Compact UTF-8 JSON for ``obj``, or indented by two spaces with ``indent``."""
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        try:
+            return orjson.dumps(obj, default=_default, option=option | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            return orjson.dumps(_clean(obj), default=_default, option=option)
+    encoder = _indented_encoder if indent else _encoder
+    try:
+        return encoder.encode(obj).encode("utf-8")
+    except (ValueError, TypeError):
+        # NaN/inf somewhere, or keys the encoder rejects
+        return encoder.encode(_clean(obj)).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """``JSONResponse`` rendered with :func:`dumps`."""
+
+    def render(self, content: Any) -> bytes:
+        with span("encode"):
+            return dumps(content)
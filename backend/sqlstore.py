@@ -0,0 +1,618 @@
+"""Embedded SQLite storage backend for the worker dataset.
+
+A drop-in alternative to the CSV ``WorkerStore``: rows live in one local
+SQLite file in WAL mode, so any number of processes read while one writes
+and every mutation is its own transaction. Point lookups and projections
+are indexed queries, and ``analyze`` computes the ``analyze_frame``
+aggregates in SQL instead of loading a DataFrame.
+
+Create the database from an existing CSV (journaled writes included) with
+
+    python -m backend.sqlstore synthetic_dairy_dataset_with_contacts.csv workers.db
+"""
+import argparse
+from contextlib import contextmanager
+import json
+import math
+import os
+from pathlib import Path
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .incremental import (
+    AGE_BINS, AGE_LABELS, CORRELATION_COLUMNS, COUNT_COLUMNS, INCOME_BINS, INCOME_LABELS, MEAN_COLUMNS,
+    Aggregates, DepartmentStats, assemble_results, correlation_matrix,
+)
+from .storage import INSERT_BATCH_ROWS, reset_listener, spool_rows, spooled_batches
+from .store import WorkerNotFound, coerce_value
+
+# Secondary indexes besides the EmployeeNumber primary key. Income is the
+# second key so per-group medians are an index walk rather than a sort.
+INDEXES = {"Department": ("Department", "MonthlyIncome"), "JobRole": ("JobRole", "MonthlyIncome")}
+# Change-log entries kept for other processes to catch up from; one that
+# falls further behind reloads instead
+CHANGE_LOG_KEEP = 10000
+# How long a writer waits for another process's write transaction
+BUSY_TIMEOUT_SECONDS = 30.0
+# EmployeeNumbers per "IN (...)" lookup, well under SQLite's variable limit
+LOOKUP_BATCH = 500
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sql_type(kind: Optional[type]) -> str:
+    return {int: "INTEGER", float: "REAL"}.get(kind, "TEXT")
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    # Transactions are explicit (BEGIN / BEGIN IMMEDIATE) rather than implicit
+    conn = sqlite3.connect(str(path), timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class SqliteWorkerStore:
+    """Worker rows kept in an SQLite database, with the ``WorkerStore`` interface.
+
+    Unlike the CSV store nothing is cached in memory but the ``frame()``
+    view: reads go to the database, which is what lets several processes
+    share it. Each mutation also appends its before/after rows to a
+    ``changes`` table, from which other processes replay it into their
+    listeners (the incremental analysis and the list indexes).
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: Path, compact_every: int = 1000) -> None:
+        self.path = Path(path)
+        self.compact_every = compact_every
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._columns: List[str] = []
+        self._numeric: Dict[str, type] = {}
+        self._listeners: List[Any] = []
+        # Last change-log entry reflected in the listeners, and the
+        # connection's data_version when that was checked
+        self._last_change = 0
+        self._data_version: Optional[int] = None
+        self._uncompacted = 0
+        self._frame = None
+        self.version = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._conn is not None
+
+    @property
+    def lock(self) -> threading.RLock:
+        return self._lock
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def load(self) -> None:
+        with self._lock:
+            if self._conn is None:
+                if not self.path.exists():
+                    raise FileNotFoundError(self.path)
+                self._conn = _connect(self.path)
+            with self._read():
+                self._load()
+
+    def _load(self) -> None:
+        info = self._conn.execute("PRAGMA table_info(workers)").fetchall()
+        if not info:
+            raise ValueError(f"{self.path} has no workers table")
+        self._columns = [name for _, name, _, _, _, _ in info]
+        self._numeric = {
+            name: {"INTEGER": int, "REAL": float}[kind]
+            for _, name, kind, _, _, _ in info if kind in ("INTEGER", "REAL")
+        }
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        self._last_change = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+        self._frame = None
+        self.version += 1
+        for listener in self._listeners:
+            reset_listener(self, listener)
+
+    @contextmanager
+    def _read(self) -> Iterator[None]:
+        # One snapshot for several statements (caller holds the lock)
+        if self._conn.in_transaction:
+            yield
+            return
+        self._conn.execute("BEGIN")
+        try:
+            yield
+        finally:
+            self._conn.execute("COMMIT")
+
+    @contextmanager
+    def _write(self) -> Iterator[None]:
+        # Takes SQLite's write lock up front, so nothing can commit between
+        # catching up with other processes and committing this change
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._catch_up()
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def in_sync(self) -> bool:
+        """True if no other connection committed since this store looked."""
+        if self._conn is None:
+            return False
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0] == self._data_version
+
+    def sync(self) -> bool:
+        """Replay changes other processes made; True if anything was applied."""
+        if self.in_sync():
+            return False
+        with self._lock:
+            if self._conn is None:
+                self.load()
+                return True
+            with self._read():
+                return self._catch_up()
+
+    def _catch_up(self) -> bool:
+        # data_version is read first: a commit racing the query below only
+        # makes the next in_sync() check fail and replay nothing new
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return False
+        self._data_version = data_version
+        if self._last_change < int(self._meta("pruned_through", 0)):
+            # The entries this store still needs were pruned by a compaction
+            self._load()
+            return True
+        changes = self._conn.execute(
+            "SELECT seq, old, new FROM changes WHERE seq > ? ORDER BY seq", (self._last_change,)
+        ).fetchall()
+        for seq, old, new in changes:
+            self._notify(json.loads(old) if old else None, json.loads(new) if new else None)
+            self._last_change = seq
+        if changes:
+            self._frame = None
+            self.version += 1
+        return bool(changes)
+
+    def fingerprint(self) -> Tuple[Any, ...]:
+        """Identity of the data on disk, for keying cached responses."""
+        return (str(self.path), self._last_change)
+
+    def subscribe(self, listener: Any) -> None:
+        """Register an object with ``reset(rows)`` and ``apply(old, new)`` hooks."""
+        with self._lock:
+            self._listeners.append(listener)
+            if self.loaded:
+                reset_listener(self, listener)
+
+    def _notify(self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> None:
+        for listener in self._listeners:
+            listener.apply(old, new)
+
+    def _meta(self, key: str, default: Any = None) -> Any:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def _set_meta(self, key: str, value: Any) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM workers").fetchone()[0]
+
+    def __contains__(self, employee_number: int) -> bool:
+        with self._lock:
+            return self._fetch(employee_number) is not None
+
+    def _fetch(self, employee_number: int) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(
+            f"SELECT {', '.join(map(_quote, self._columns))} FROM workers WHERE EmployeeNumber = ?",
+            (employee_number,),
+        ).fetchone()
+        return None if row is None else dict(zip(self._columns, row))
+
+    def get(self, employee_number: int) -> Dict[str, Any]:
+        with self._lock:
+            row = self._fetch(employee_number)
+        if row is None:
+            raise WorkerNotFound(employee_number)
+        return row
+
+    def employee_numbers(self) -> List[int]:
+        with self._lock:
+            return [n for n, in self._conn.execute("SELECT EmployeeNumber FROM workers ORDER BY EmployeeNumber")]
+
+    def records(
+        self,
+        fields: Optional[List[str]] = None,
+        employee_numbers: Optional[Iterable[int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Row dicts limited to ``fields``, for all rows or the given ones in order.
+
+        Only the requested columns are read from the database.
+        """
+        if fields is None:
+            fields = self._columns
+        known = set(self._columns)
+        picked = [f for f in fields if f in known]
+        select = ", ".join(["EmployeeNumber"] + [_quote(f) for f in picked])
+        with self._lock, self._read():
+            if employee_numbers is None:
+                rows = self._conn.execute(f"SELECT {select} FROM workers ORDER BY EmployeeNumber").fetchall()
+            else:
+                wanted = list(employee_numbers)
+                found: Dict[int, Tuple[Any, ...]] = {}
+                for start in range(0, len(wanted), LOOKUP_BATCH):
+                    batch = wanted[start:start + LOOKUP_BATCH]
+                    found.update((row[0], row) for row in self._conn.execute(
+                        f"SELECT {select} FROM workers WHERE EmployeeNumber IN ({', '.join('?' * len(batch))})",
+                        batch,
+                    ))
+                rows = [found[e] for e in wanted if e in found]
+        return [dict(zip(picked, row[1:])) for row in rows]
+
+    def frame(self):
+        """DataFrame view of the current rows, rebuilt only after a mutation."""
+        import pandas as pd
+        from .schema import apply_schema
+
+        with self._lock:
+            if self._frame is None:
+                self._frame = apply_schema(pd.read_sql_query(
+                    f"SELECT {', '.join(map(_quote, self._columns))} FROM workers ORDER BY EmployeeNumber",
+                    self._conn,
+                ))
+            return self._frame
+
+    def analyze(self) -> Dict:
+        """The ``analyze_frame`` result, aggregated inside the database."""
+        with self._lock, self._read():
+            return analyze_connection(self._conn)
+
+    def _sequence(self) -> int:
+        # Next unused EmployeeNumber; the meta row keeps deleted ones retired
+        last = self._conn.execute("SELECT COALESCE(MAX(EmployeeNumber), 0) FROM workers").fetchone()[0]
+        return max(int(self._meta("sequence", 0)), last) + 1
+
+    def last_employee_number(self) -> int:
+        """Highest EmployeeNumber ever handed out, deleted workers included."""
+        with self._lock, self._read():
+            return self._sequence() - 1
+
+    def _normalise(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return {c: coerce_value(self._numeric.get(c), row.get(c)) for c in self._columns}
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        self._conn.executemany(
+            f"INSERT INTO workers ({', '.join(map(_quote, self._columns))}) "
+            f"VALUES ({', '.join('?' * len(self._columns))})",
+            [tuple(row[c] for c in self._columns) for row in rows],
+        )
+
+    def _log(self, changes: List[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]) -> None:
+        self._conn.executemany(
+            "INSERT INTO changes (old, new) VALUES (?, ?)",
+            [(json.dumps(old) if old else None, json.dumps(new) if new else None) for old, new in changes],
+        )
+        self._last_change = self._conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        self._uncompacted += len(changes)
+        self._frame = None
+        self.version += 1
+
+    def _committed(self, changes: List[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]) -> None:
+        for old, new in changes:
+            self._notify(old, new)
+        if self._uncompacted >= self.compact_every:
+            self.compact()
+
+    def create(self, build_row: Callable[[int], Dict[str, Any]]) -> int:
+        """Allocate the next EmployeeNumber and insert the row built for it."""
+        with self._lock:
+            with self._write():
+                new = self._normalise(build_row(self._sequence()))
+                employee_number = int(new["EmployeeNumber"])
+                if self._fetch(employee_number) is not None:
+                    raise ValueError(f"EmployeeNumber {employee_number} already exists")
+                self._insert([new])
+                self._set_meta("sequence", max(employee_number, int(self._meta("sequence", 0))))
+                self._log([(None, new)])
+            self._committed([(None, new)])
+            return employee_number
+
+    def create_many(self, rows: Iterable[Dict[str, Any]], batch_rows: int = INSERT_BATCH_ROWS) -> range:
+        """Insert ``rows`` under consecutive new EmployeeNumbers in one transaction.
+
+        ``rows`` is spooled to a temporary file before the write lock is
+        taken, then inserted ``batch_rows`` at a time; listeners get the new
+        rows back from the database a batch at a time once committed.
+        """
+        spool, count = spool_rows(rows)
+        with spool, self._lock:
+            with self._write():
+                first = self._sequence()
+                created = range(first, first + count)
+                if not count:
+                    return created
+                employee_number = first
+                for batch in spooled_batches(spool, batch_rows):
+                    stored = [
+                        self._normalise(dict(row, EmployeeNumber=n)) for n, row in enumerate(batch, employee_number)
+                    ]
+                    employee_number += len(stored)
+                    self._insert(stored)
+                    self._log([(None, new) for new in stored])
+                self._set_meta("sequence", created[-1])
+            for start in range(created.start, created.stop, batch_rows):
+                numbers = range(start, min(start + batch_rows, created.stop))
+                self._committed([(None, new) for new in self.records(employee_numbers=numbers)])
+            return created
+
+    def update(self, employee_number: int, changes: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            with self._write():
+                old = self._fetch(employee_number)
+                if old is None:
+                    raise WorkerNotFound(employee_number)
+                changed = {
+                    k: coerce_value(self._numeric.get(k), v)
+                    for k, v in changes.items() if k in old and k != "EmployeeNumber"
+                }
+                new = dict(old, **changed)
+                if changed:
+                    self._conn.execute(
+                        f"UPDATE workers SET {', '.join(_quote(k) + ' = ?' for k in changed)} WHERE EmployeeNumber = ?",
+                        (*changed.values(), employee_number),
+                    )
+                self._log([(old, new)])
+            self._committed([(old, new)])
+            return new
+
+    def delete(self, employee_number: int) -> None:
+        with self._lock:
+            with self._write():
+                old = self._fetch(employee_number)
+                if old is None:
+                    raise WorkerNotFound(employee_number)
+                self._conn.execute("DELETE FROM workers WHERE EmployeeNumber = ?", (employee_number,))
+                self._log([(old, None)])
+            self._committed([(old, None)])
+
+    def compact(self) -> None:
+        """Prune the change log and fold the WAL back into the database file."""
+        with self._lock:
+            if self._conn is None:
+                return
+            with self._write():
+                through = self._last_change - CHANGE_LOG_KEEP
+                if through > int(self._meta("pruned_through", 0)):
+                    self._conn.execute("DELETE FROM changes WHERE seq <= ?", (through,))
+                    self._set_meta("pruned_through", through)
+            self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            self._uncompacted = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is None:
+                return
+            self.compact()
+            self._conn.close()
+            self._conn = None
+
+
+# Aggregates pushed down to SQL. Each query returns a few rows (one per
+# group or per distinct value); only those cross into Python.
+
+def _bin_case(column: str, bins: Sequence[float], labels: Sequence[str]) -> str:
+    # Right-closed intervals, matching pd.cut defaults
+    whens = []
+    for lo, hi, label in zip(bins, bins[1:], labels):
+        condition = f"{_quote(column)} > {lo!r}"
+        if not math.isinf(hi):
+            condition += f" AND {_quote(column)} <= {hi!r}"
+        whens.append(f"WHEN {condition} THEN '{label}'")
+    return f"CASE {' '.join(whens)} END"
+
+
+def _counts(conn: sqlite3.Connection, expr: str) -> Dict[Any, int]:
+    return dict(conn.execute(f"SELECT {expr} AS v, COUNT(*) FROM workers WHERE v IS NOT NULL GROUP BY v"))
+
+
+def _group_stats(conn: sqlite3.Connection, by: str, medians: bool) -> Dict[Any, DepartmentStats]:
+    key = _quote(by)
+    # Incomes are shifted by the overall mean so the sums of squares stay
+    # well conditioned for the variance
+    shift = conn.execute("SELECT COALESCE(AVG(MonthlyIncome), 0) FROM workers").fetchone()[0]
+    # A table scan with a temporary grouping beats walking the index here,
+    # which would fetch every row's Attrition through a rowid lookup
+    rows = conn.execute(f"""
+        SELECT {key}, COUNT(*), COALESCE(SUM(Attrition = 'Yes'), 0), COUNT(MonthlyIncome),
+               TOTAL(MonthlyIncome - :shift), TOTAL((MonthlyIncome - :shift) * (MonthlyIncome - :shift))
+        FROM workers NOT INDEXED WHERE {key} IS NOT NULL GROUP BY {key}
+    """, {"shift": shift}).fetchall()
+    stats = {}
+    for k, count, attrition, n, total, square in rows:
+        mean = shift + total / n if n else math.nan
+        std = math.sqrt(max(square - total * total / n, 0) / (n - 1)) if n > 1 else math.nan
+        median = math.nan
+        if medians and n:
+            # The one or two middle incomes, read off the (group, income) index
+            middle = conn.execute(
+                f"SELECT MonthlyIncome FROM workers WHERE {key} = ? AND MonthlyIncome IS NOT NULL "
+                "ORDER BY MonthlyIncome LIMIT ? OFFSET ?",
+                (k, 2 - n % 2, (n - 1) // 2),
+            ).fetchall()
+            median = sum(v for v, in middle) / len(middle)
+        stats[k] = DepartmentStats(count, attrition, mean, median, std)
+    return stats
+
+
+def _correlation(conn: sqlite3.Connection) -> Dict[str, Dict[str, float]]:
+    # Co-moments of the correlation columns in one scan, after shifting each
+    # column by its mean (keeps the sums of squares well conditioned; the
+    # correlation is unchanged). DataFrame.corr() skips missing values per
+    # pair, so pairs involving a column with gaps also get sums restricted
+    # to the rows where both are present.
+    cols = CORRELATION_COLUMNS
+    k = len(cols)
+    first = conn.execute(
+        f"SELECT COUNT(*), {', '.join(f'COUNT({_quote(c)})' for c in cols)}, "
+        f"{', '.join(f'COALESCE(AVG({_quote(c)}), 0)' for c in cols)} FROM workers"
+    ).fetchone()
+    rows, present, means = first[0], first[1:1 + k], first[1 + k:]
+    gappy = [(i, j) for i in range(k) for j in range(k) if i != j and rows not in (present[i], present[j])]
+    d = [f"d{i}" for i in range(k)]
+    terms = [f"TOTAL({d[i]})" for i in range(k)] + [f"TOTAL({d[i]} * {d[i]})" for i in range(k)]
+    terms += [f"TOTAL({d[i]} * {d[j]})" for i in range(k) for j in range(i + 1, k)]
+    for i, j in gappy:
+        # "x * (y IS NOT NULL)" drops x where y is missing
+        terms += [
+            f"SUM({d[i]} IS NOT NULL AND {d[j]} IS NOT NULL)",
+            f"TOTAL({d[i]} * ({d[j]} IS NOT NULL))",
+            f"TOTAL({d[i]} * {d[i]} * ({d[j]} IS NOT NULL))",
+        ]
+    shifted = ", ".join(f"{_quote(c)} - ? AS {d[i]}" for i, c in enumerate(cols))
+    values = iter(conn.execute(
+        f"WITH d AS MATERIALIZED (SELECT {shifted} FROM workers) SELECT {', '.join(terms)} FROM d", means,
+    ).fetchone())
+    sums = [next(values) for _ in range(k)]
+    squares = [next(values) for _ in range(k)]
+    n = [[present[i] if i == j else rows for j in range(k)] for i in range(k)]
+    total = [[sums[i]] * k for i in range(k)]
+    square = [[squares[i]] * k for i in range(k)]
+    product = [[squares[i] if i == j else 0.0 for j in range(k)] for i in range(k)]
+    for i in range(k):
+        for j in range(i + 1, k):
+            product[i][j] = product[j][i] = next(values)
+    for i, j in gappy:
+        n[i][j], total[i][j], square[i][j] = next(values) or 0, next(values), next(values)
+    # Same n-scaled co-moments as IncrementalAnalyzer._correlation
+    cov = [[n[i][j] * product[i][j] - total[i][j] * total[j][i] for j in range(k)] for i in range(k)]
+    var_x = [[n[i][j] * square[i][j] - total[i][j] ** 2 for j in range(k)] for i in range(k)]
+    var_y = [[var_x[j][i] for j in range(k)] for i in range(k)]
+    return correlation_matrix(n, cov, var_x, var_y)
+
+
+def analyze_connection(conn: sqlite3.Connection) -> Dict:
+    """``analyze_frame``'s result for the workers table of ``conn``."""
+    means = ", ".join(f"AVG({_quote(c)})" for c in MEAN_COLUMNS)
+    row = conn.execute(f"""
+        SELECT COUNT(*), COALESCE(SUM(Attrition = 'Yes'), 0), {means}, TOTAL(TrainingTimesLastYear),
+               COALESCE(SUM(TrainingTimesLastYear = 0), 0), COALESCE(SUM(PerformanceRating >= 4), 0),
+               COALESCE(SUM(DistanceFromHome > 30), 0)
+        FROM workers
+    """).fetchone()
+    total, attrition = row[0], row[1]
+    mean_values = row[2:2 + len(MEAN_COLUMNS)]
+    training_total, no_training, high_performers, remote = row[2 + len(MEAN_COLUMNS):]
+    return assemble_results(Aggregates(
+        total=total,
+        attrition=attrition,
+        means={c: math.nan if v is None else v for c, v in zip(MEAN_COLUMNS, mean_values)},
+        counts={c: _counts(conn, _quote(c)) for c in COUNT_COLUMNS},
+        departments=_group_stats(conn, "Department", medians=True),
+        role_means={k: g.income_mean for k, g in _group_stats(conn, "JobRole", medians=False).items()},
+        age_groups=_counts(conn, _bin_case("Age", AGE_BINS, AGE_LABELS)),
+        income_groups=_counts(conn, _bin_case("MonthlyIncome", INCOME_BINS, INCOME_LABELS)),
+        training_total=training_total,
+        no_training=no_training,
+        high_performers=high_performers,
+        remote=remote,
+        correlation=_correlation(conn),
+    ))
+
+
+def create_database(path: Path, columns: List[str], numeric: Dict[str, type]) -> sqlite3.Connection:
+    """An empty worker database at ``path`` with the given column layout."""
+    conn = _connect(path)
+    definitions = ", ".join(
+        f"{_quote(c)} {_sql_type(numeric.get(c))}" + (" PRIMARY KEY" if c == "EmployeeNumber" else "")
+        for c in columns
+    )
+    conn.executescript(f"""
+        CREATE TABLE workers ({definitions});
+        CREATE TABLE changes (seq INTEGER PRIMARY KEY AUTOINCREMENT, old TEXT, new TEXT);
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value);
+    """)
+    return conn
+
+
+def migrate_csv(csv_path: Path, db_path: Path, batch_rows: int = 10000) -> int:
+    """Copy the CSV dataset (with any journaled writes) into a new database.
+
+    The database is built next to ``db_path`` and moved into place at the
+    end, so an interrupted migration never leaves a half-filled file.
+    Returns the number of workers copied.
+    """
+    import pandas as pd
+    from .store import WorkerStore
+
+    source = WorkerStore(csv_path)
+    source.load()
+    frame = source.frame()
+    numeric = {
+        c: int if pd.api.types.is_integer_dtype(frame[c]) else float
+        for c in frame.columns if pd.api.types.is_numeric_dtype(frame[c])
+    }
+    columns = source.columns
+    tmp = db_path.with_name(db_path.name + ".tmp")
+    for leftover in (tmp, tmp.with_name(tmp.name + "-wal"), tmp.with_name(tmp.name + "-shm")):
+        if leftover.exists():
+            leftover.unlink()
+    conn = create_database(tmp, columns, numeric)
+    try:
+        conn.execute("BEGIN")
+        numbers = source.employee_numbers()
+        placeholders = ", ".join("?" * len(columns))
+        for start in range(0, len(numbers), batch_rows):
+            rows = source.records(columns, employee_numbers=numbers[start:start + batch_rows])
+            conn.executemany(
+                f"INSERT INTO workers VALUES ({placeholders})",
+                [tuple(coerce_value(numeric.get(c), row[c]) for c in columns) for row in rows],
+            )
+        # Indexes are cheaper to build once over the loaded table
+        for name, key in INDEXES.items():
+            if set(key) <= set(columns):
+                conn.execute(f"CREATE INDEX {_quote('workers_' + name)} ON workers ({', '.join(map(_quote, key))})")
+        conn.execute("INSERT INTO meta (key, value) VALUES ('sequence', ?)", (source.last_employee_number(),))
+        conn.execute("COMMIT")
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+    for stale in (db_path.with_name(db_path.name + "-wal"), db_path.with_name(db_path.name + "-shm")):
+        if stale.exists():
+            stale.unlink()
+    os.replace(tmp, db_path)
+    return len(numbers)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Migrate the worker CSV into an SQLite database.")
+    parser.add_argument("csv", type=Path, help="dataset CSV (its journal is included)")
+    parser.add_argument("database", type=Path, help="SQLite file to create")
+    parser.add_argument("--force", action="store_true", help="replace an existing database")
+    args = parser.parse_args(argv)
+    if not args.csv.exists():
+        parser.error(f"{args.csv} does not exist")
+    if args.database.exists() and not args.force:
+        parser.error(f"{args.database} already exists (use --force to replace it)")
+    start = time.perf_counter()
+    count = migrate_csv(args.csv, args.database)
+    print(f"Migrated {count} workers to {args.database} in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
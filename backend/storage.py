@@ -0,0 +1,143 @@
+"""The worker storage interface and its backends.
+
+``csv``: the dataset CSV is the system of record (``store.WorkerStore``):
+rows are held in memory, writes go through a journal, and the
+streaming/parallel analysis modes scan the file.
+
+``sqlite``: an embedded database file (``sqlstore.SqliteWorkerStore``)
+with indexed reads, transactional writes from any number of processes and
+the analysis aggregated in SQL. Migrate with ``python -m backend.sqlstore``.
+"""
+import json
+from pathlib import Path
+import tempfile
+import threading
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple
+
+BACKENDS = ("csv", "sqlite")
+# Rows per journal entry / INSERT batch when create_many stores a large import
+INSERT_BATCH_ROWS = 1000
+
+
+class StorageBackend(Protocol):
+    """What the API needs from a worker store.
+
+    Listeners registered with ``subscribe`` get ``reset(rows)`` (or
+    ``reset_frame(df)``, see ``reset_listener``) after every (re)load and
+    ``apply(old, new)`` for every mutation, including ones other processes
+    made once ``sync`` has replayed them.
+    """
+
+    backend: str
+    path: Path
+    version: int
+
+    @property
+    def loaded(self) -> bool: ...
+
+    @property
+    def lock(self) -> threading.RLock: ...
+
+    @property
+    def columns(self) -> List[str]: ...
+
+    def load(self) -> None: ...
+
+    def in_sync(self) -> bool: ...
+
+    def sync(self) -> bool: ...
+
+    def fingerprint(self) -> Tuple[Any, ...]: ...
+
+    def subscribe(self, listener: Any) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def __contains__(self, employee_number: int) -> bool: ...
+
+    def get(self, employee_number: int) -> Dict[str, Any]: ...
+
+    def employee_numbers(self) -> List[int]: ...
+
+    def records(
+        self, fields: Optional[List[str]] = None, employee_numbers: Optional[Iterable[int]] = None,
+    ) -> List[Dict[str, Any]]: ...
+
+    def frame(self) -> Any: ...
+
+    def last_employee_number(self) -> int: ...
+
+    def create(self, build_row: Callable[[int], Dict[str, Any]]) -> int: ...
+
+    def create_many(self, rows: Iterable[Dict[str, Any]], batch_rows: int = INSERT_BATCH_ROWS) -> range: ...
+
+    def update(self, employee_number: int, changes: Dict[str, Any]) -> Dict[str, Any]: ...
+
+    def delete(self, employee_number: int) -> None: ...
+
+    def compact(self) -> None: ...
+
+    def close(self) -> None: ...
+
+
+def reset_listener(store: StorageBackend, listener: Any) -> None:
+    """Seed ``listener`` with every row of ``store``.
+
+    Listeners that define ``reset_frame(df)`` get ``store.frame()`` and build
+    their state a column at a time; others get ``reset(rows)``.
+    """
+    reset_frame = getattr(listener, "reset_frame", None)
+    if reset_frame is not None:
+        reset_frame(store.frame())
+    else:
+        listener.reset(store.records())
+
+
+def frame_column(df: Any, field: str) -> List[Any]:
+    """Column ``field`` of ``df`` as the row dicts hold it: Python scalars, None when missing."""
+    if field not in df.columns:
+        return [None] * len(df)
+    return [None if v != v else v for v in df[field].tolist()]
+
+
+def spool_rows(rows: Iterable[Dict[str, Any]]) -> Tuple[IO[bytes], int]:
+    """Write ``rows`` to an anonymous temporary file, one JSON line each.
+
+    Lets ``create_many`` consume an upload of any size before it takes a
+    lock, without holding the rows in memory. Returns the file, rewound,
+    and the number of rows. An exception from ``rows`` discards the file.
+    """
+    spool = tempfile.TemporaryFile()
+    try:
+        count = 0
+        for row in rows:
+            spool.write(json.dumps(row).encode() + b"\n")
+            count += 1
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return spool, count
+
+
+def spooled_batches(spool: IO[bytes], size: int = INSERT_BATCH_ROWS) -> Iterator[List[Dict[str, Any]]]:
+    """The rows of a ``spool_rows`` file, ``size`` at a time."""
+    batch: List[Dict[str, Any]] = []
+    for line in spool:
+        batch.append(json.loads(line))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def open_store(backend: str, path: Path, **options: Any) -> StorageBackend:
+    """An unloaded store of the named backend on ``path``; ``options`` go to its constructor."""
+    if backend == "csv":
+        from .store import WorkerStore
+        return WorkerStore(path, **options)
+    if backend == "sqlite":
+        from .sqlstore import SqliteWorkerStore
+        return SqliteWorkerStore(path, **options)
+    raise ValueError(f"storage backend must be one of {', '.join(BACKENDS)}")
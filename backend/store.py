@@ -0,0 +1,572 @@
+"""Process-wide in-memory worker store backing the /workers endpoints."""
+from pathlib import Path
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import uuid
+
+from .locking import FileLock
+from .metrics import READ_BYTES, WRITE_BYTES, span
+from .storage import INSERT_BATCH_ROWS, reset_listener, spool_rows, spooled_batches
+
+
+class WorkerNotFound(KeyError):
+    pass
+
+
+def coerce_value(kind: Optional[type], value: Any) -> Any:
+    """``value`` as a column of ``kind`` (int, float or None for text) stores it.
+
+    Mirrors what a CSV round trip would do: blanks and NaN become None and
+    numeric strings become numbers.
+    """
+    if value is None or value == "" or (isinstance(value, float) and value != value):
+        return None
+    if kind is None:
+        return value
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return value
+    if kind is int and number.is_integer():
+        return int(number)
+    return number
+
+
+class WorkerStore:
+    """Worker rows parsed once from the CSV and indexed by EmployeeNumber.
+
+    Rows are kept as tuples in dataset column order so a point lookup is a
+    single dict access; list and analysis reads never touch the file again.
+    Mutations are appended to a write-ahead journal next to the CSV and
+    folded back into it by a background compaction once the journal grows
+    past ``compact_every`` entries.
+
+    Several processes may share the files. Every mutation first takes the
+    ``.lock`` file lock and replays journal entries other processes appended
+    since it last looked, so EmployeeNumbers (drawn from the ``.seq`` file)
+    are never handed out twice and no write is lost. A CSV replaced by
+    someone else (another process's compaction, or an edit) causes a reload.
+    """
+
+    backend = "csv"
+
+    def __init__(self, path: Path, compact_every: int = 1000, fsync: bool = True) -> None:
+        self.path = Path(path)
+        self.journal_path = self.path.with_name(self.path.name + ".journal")
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.sequence_path = self.path.with_name(self.path.name + ".seq")
+        self._journal = None
+        self._journal_entries = 0
+        # (inode, offset) of the journal entries already applied to the rows,
+        # and the id from that journal's header line
+        self._journal_position: Optional[Tuple[int, int]] = None
+        self._journal_id: Optional[str] = None
+        self._compactor: Optional[threading.Thread] = None
+        # Serialises compactions (background thread vs. explicit compact()),
+        # within this process and then across processes
+        self._compact_lock = threading.Lock()
+        self._compact_file_lock = FileLock(self.path.with_name(self.path.name + ".compact.lock"))
+        # Held around every read-modify-write of the CSV, journal and sequence
+        self._file_lock = FileLock(self.path.with_name(self.path.name + ".lock"))
+        self._listeners: List[Any] = []
+        self._file_stat: Optional[Tuple[int, int]] = None
+        self._lock = threading.RLock()
+        self._columns: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._numeric: Dict[str, type] = {}
+        self._rows: Dict[int, Tuple[Any, ...]] = {}
+        self._max_employee_number = 0
+        self._frame = None
+        self._loaded = False
+        # Bumped on every mutation so callers can cheaply detect stale views
+        self.version = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def lock(self) -> threading.RLock:
+        return self._lock
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def load(self) -> None:
+        with span("store.load"), self._lock, self._file_lock:
+            self._load()
+
+    def _load(self) -> None:
+        import pandas as pd
+        from .columnar import load_columns
+
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        df = load_columns(self.path)
+        columns = [str(c) for c in df.columns]
+        numeric: Dict[str, type] = {}
+        values = []
+        for col in columns:
+            series = df[col]
+            if pd.api.types.is_integer_dtype(series):
+                numeric[col] = int
+            elif pd.api.types.is_float_dtype(series):
+                numeric[col] = float
+            # tolist() yields Python scalars; missing cells become None
+            values.append([None if v != v else v for v in series.tolist()])
+
+        rows: Dict[int, Tuple[Any, ...]] = {}
+        emp_pos = columns.index("EmployeeNumber")
+        for row in zip(*values):
+            rows[int(row[emp_pos])] = row
+
+        self._columns = columns
+        self._positions = {c: i for i, c in enumerate(columns)}
+        self._numeric = numeric
+        self._rows = rows
+        # The loaded frame is frame() until a mutation, unless the CSV
+        # repeats an EmployeeNumber (the rows keep the last one)
+        self._frame = df if len(rows) == len(df) else None
+        self._loaded = True
+        self.version += 1
+        self._file_stat = self._stat()
+
+        # Mutations that are not in the CSV yet: an interrupted compaction's
+        # entries first, then the live journal. They stay journaled (other
+        # processes may be reading them) until the next compaction.
+        self._journal_entries = 0
+        self._journal_position = None
+        self._journal_id = None
+        if self._compacting_path.exists():
+            entries, _ = self._read_journal(self._compacting_path, 0)
+            for entry in entries:
+                self._apply(entry, notify=False)
+            if entries:
+                self._frame = None
+        self._catch_up(notify=False)
+        self._max_employee_number = max(rows) if rows else 0
+        for listener in self._listeners:
+            with span(f"store.reset.{type(listener).__name__}"):
+                reset_listener(self, listener)
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def fingerprint(self) -> Tuple[Any, ...]:
+        """Identity of the data on disk, for keying cached responses."""
+        from .cache import dataset_fingerprint
+
+        return dataset_fingerprint(self.path)
+
+    def _journal_stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.journal_path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_size
+
+    def in_sync(self) -> bool:
+        """True if neither the CSV nor the journal changed since this store looked.
+
+        Lock-free and only two ``stat`` calls, for the read path.
+        """
+        return self._loaded and self._stat() == self._file_stat and self._journal_stat() == self._journal_position
+
+    def sync(self) -> bool:
+        """Pick up changes other processes made; True if anything was applied."""
+        if self.in_sync():
+            return False
+        with self._lock, self._file_lock:
+            return self._sync()
+
+    def _sync(self) -> bool:
+        # Caller holds both locks
+        if not self._loaded or self._stat() != self._file_stat:
+            self._load()
+            return True
+        return self._catch_up()
+
+    def _catch_up(self, notify: bool = True) -> bool:
+        """Apply journal entries appended by other processes (file lock held)."""
+        current = self._journal_stat()
+        position = self._journal_position
+        if current == position:
+            return False
+        current_id = self._header_id(self.journal_path) if current is not None else None
+        applied = 0
+        if position is not None and (current is None or current_id != self._journal_id or current[1] < position[1]):
+            # Another process rotated the journal to compact it. The CSV is
+            # unchanged (checked by the caller), so that compaction is still
+            # running and our journal is now the .compacting file.
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if not self._compacting_path.exists() or self._header_id(self._compacting_path) != self._journal_id:
+                self._load()
+                return True
+            entries, _ = self._read_journal(self._compacting_path, position[1])
+            applied += sum(self._apply(entry, notify) for entry in entries)
+            self._journal_entries = 0
+            position = None
+        if current is not None:
+            entries, end = self._read_journal(self.journal_path, position[1] if position else 0)
+            count = sum(self._apply(entry, notify) for entry in entries)
+            self._journal_entries += count
+            applied += count
+            position = (current[0], end)
+        self._journal_position = position
+        self._journal_id = current_id
+        if applied:
+            self._frame = None
+            self.version += 1
+        return True
+
+    @staticmethod
+    def _header_id(journal: Path) -> Optional[str]:
+        try:
+            with open(journal, "rb") as fh:
+                first = fh.readline()
+            return json.loads(first).get("id") if first.endswith(b"\n") else None
+        except (FileNotFoundError, ValueError, AttributeError):
+            return None
+
+    def subscribe(self, listener: Any) -> None:
+        """Register an object with ``reset(rows)`` and ``apply(old, new)`` hooks.
+
+        ``reset`` receives every row after a (re)load (``reset_frame`` a
+        DataFrame of them, if the listener has it); ``apply`` receives the
+        before/after row dicts of each mutation (None for create/delete).
+        """
+        with self._lock:
+            self._listeners.append(listener)
+            if self._loaded:
+                reset_listener(self, listener)
+
+    def _notify(self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> None:
+        for listener in self._listeners:
+            listener.apply(old, new)
+
+    @property
+    def _compacting_path(self) -> Path:
+        return self.journal_path.with_name(self.journal_path.name + ".compacting")
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, employee_number: int) -> bool:
+        return employee_number in self._rows
+
+    def get(self, employee_number: int) -> Dict[str, Any]:
+        row = self._rows.get(employee_number)
+        if row is None:
+            raise WorkerNotFound(employee_number)
+        return dict(zip(self._columns, row))
+
+    def employee_numbers(self) -> List[int]:
+        with self._lock:
+            return sorted(self._rows)
+
+    def records(
+        self,
+        fields: Optional[List[str]] = None,
+        employee_numbers: Optional[Iterable[int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Row dicts limited to ``fields``, for all rows or the given ones in order."""
+        with self._lock:
+            if employee_numbers is None:
+                rows = list(self._rows.values())
+            else:
+                rows = [self._rows[e] for e in employee_numbers if e in self._rows]
+        if fields is None:
+            fields = self._columns
+        picked = [(f, self._positions[f]) for f in fields if f in self._positions]
+        return [{f: row[i] for f, i in picked} for row in rows]
+
+    def frame(self):
+        """DataFrame view of the current rows, rebuilt only after a mutation."""
+        import pandas as pd
+        from .schema import apply_schema
+
+        with self._lock:
+            if self._frame is None:
+                with span("store.frame"):
+                    self._frame = apply_schema(pd.DataFrame.from_records(
+                        list(self._rows.values()), columns=self._columns
+                    ))
+            return self._frame
+
+    def _sequence(self) -> int:
+        """Next unused EmployeeNumber across all processes (file lock held).
+
+        The ``.seq`` file keeps the last number handed out, so numbers are
+        never reused, even after the highest worker is deleted.
+        """
+        try:
+            last = int(self.sequence_path.read_text().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            last = 0
+        return max(last, self._max_employee_number) + 1
+
+    def last_employee_number(self) -> int:
+        """Highest EmployeeNumber ever handed out, deleted workers included."""
+        with self._lock, self._file_lock:
+            return self._sequence() - 1
+
+    def _reserve(self, last: int) -> None:
+        tmp = self.sequence_path.with_name(self.sequence_path.name + ".tmp")
+        tmp.write_text(str(last))
+        os.replace(tmp, self.sequence_path)
+        self._max_employee_number = max(self._max_employee_number, last)
+
+    def create(self, build_row: Callable[[int], Dict[str, Any]]) -> int:
+        """Allocate the next EmployeeNumber and insert the row built for it."""
+        with self._lock, self._file_lock:
+            self._sync()
+            row = build_row(self._sequence())
+            employee_number = int(row["EmployeeNumber"])
+            if employee_number in self._rows:
+                raise ValueError(f"EmployeeNumber {employee_number} already exists")
+            self._reserve(employee_number)
+            self._rows[employee_number] = self._to_tuple(row)
+            new = self.get(employee_number)
+            self._commit({"op": "put", "row": new})
+            self._notify(None, new)
+            return employee_number
+
+    def create_many(self, rows: Iterable[Dict[str, Any]], batch_rows: int = INSERT_BATCH_ROWS) -> range:
+        """Insert ``rows`` under consecutive new EmployeeNumbers in one commit.
+
+        Any EmployeeNumber in the rows is replaced. ``rows`` is spooled to a
+        temporary file before the locks are taken, then journaled as a group
+        of ``put_many`` entries of ``batch_rows`` rows closed by an ``end``
+        entry. Replay drops a group without its end, so after a crash the
+        import is either all there or not at all.
+        """
+        spool, count = spool_rows(rows)
+        with spool, self._lock, self._file_lock:
+            self._sync()
+            first = self._sequence()
+            created = range(first, first + count)
+            if not count:
+                return created
+            self._reserve(created[-1])
+            self._open_journal()
+            start = self._journal.tell()
+            group = uuid.uuid4().hex
+            employee_number = first
+            try:
+                for batch in spooled_batches(spool, batch_rows):
+                    stored = []
+                    for row in batch:
+                        self._rows[employee_number] = self._to_tuple(dict(row, EmployeeNumber=employee_number))
+                        stored.append(self.get(employee_number))
+                        employee_number += 1
+                    self._write_entry({"op": "put_many", "group": group, "rows": stored})
+                self._write_entry({"op": "end", "group": group})
+                self._committed(entries=count)
+            except BaseException:
+                # Nothing of the group may survive: not in memory, not on disk
+                for stored_number in range(first, employee_number):
+                    self._rows.pop(stored_number, None)
+                self._journal.truncate(start)
+                self._journal.seek(start)
+                raise
+            for employee_number in created:
+                self._notify(None, self.get(employee_number))
+            return created
+
+    def update(self, employee_number: int, changes: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock, self._file_lock:
+            self._sync()
+            old = self.get(employee_number)
+            current = dict(old)
+            for k, v in changes.items():
+                if k in self._positions and k != "EmployeeNumber":
+                    current[k] = self._coerce(k, v)
+            self._rows[employee_number] = self._to_tuple(current)
+            new = self.get(employee_number)
+            self._commit({"op": "put", "row": new})
+            self._notify(old, new)
+            return new
+
+    def delete(self, employee_number: int) -> None:
+        with self._lock, self._file_lock:
+            self._sync()
+            old = self.get(employee_number)
+            del self._rows[employee_number]
+            self._commit({"op": "delete", "EmployeeNumber": employee_number})
+            self._notify(old, None)
+
+    def _to_tuple(self, row: Dict[str, Any]) -> Tuple[Any, ...]:
+        return tuple(self._coerce(c, row.get(c)) for c in self._columns)
+
+    def _coerce(self, column: str, value: Any) -> Any:
+        return coerce_value(self._numeric.get(column), value)
+
+    def _commit(self, entry: Dict[str, Any], entries: int = 1) -> None:
+        # A single appended line per mutation; the CSV is only rewritten by
+        # compaction. Caller holds the file lock and has caught up, so the
+        # journal ends exactly at our recorded position.
+        self._open_journal()
+        self._write_entry(entry)
+        self._committed(entries)
+
+    def _open_journal(self) -> None:
+        if self._journal is None:
+            self._journal = open(self.journal_path, "ab")
+            if self._journal.tell() == 0:
+                # Lets other processes tell this journal from a later one
+                self._journal_id = uuid.uuid4().hex
+                self._journal.write(json.dumps({"op": "journal", "id": self._journal_id}).encode() + b"\n")
+
+    def _write_entry(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry).encode() + b"\n"
+        self._journal.write(line)
+        WRITE_BYTES.inc(len(line), "journal")
+
+    def _committed(self, entries: int) -> None:
+        # Make the entries written since the last commit durable
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+        self._journal_position = (os.fstat(self._journal.fileno()).st_ino, self._journal.tell())
+        self._journal_entries += entries
+        self._frame = None
+        self.version += 1
+        if self._journal_entries >= self.compact_every:
+            self._start_compaction()
+
+    def _read_journal(self, journal: Path, offset: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Complete entries of ``journal`` from byte ``offset``, and where they end."""
+        try:
+            with open(journal, "rb") as fh:
+                fh.seek(offset)
+                data = fh.read()
+        except FileNotFoundError:
+            return [], offset
+        READ_BYTES.inc(len(data), "journal")
+        entries = []
+        end = offset
+        torn = False
+        # (offset, entry index) where a create_many group without its "end" starts
+        group_start: Optional[Tuple[int, int]] = None
+        for line in data.splitlines(keepends=True):
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("incomplete entry")
+                entry = json.loads(line)
+            except ValueError:
+                # Torn trailing write from a crashed writer; everything before
+                # it is intact
+                torn = True
+                break
+            if "group" in entry:
+                if entry["op"] == "end":
+                    group_start = None
+                elif group_start is None:
+                    group_start = (end, len(entries))
+            entries.append(entry)
+            end += len(line)
+        if group_start is not None:
+            # The writer crashed part way through a group: drop all of it
+            end, kept = group_start
+            del entries[kept:]
+            torn = True
+        if torn and journal == self.journal_path:
+            # Cut it off so new entries do not run into it
+            os.truncate(journal, end)
+        return entries, end
+
+    def _apply(self, entry: Dict[str, Any], notify: bool) -> int:
+        # Apply one journal entry written by another process (or before a restart)
+        if entry["op"] in ("journal", "end"):
+            return 0
+        if entry["op"] == "put_many":
+            return sum(self._apply({"op": "put", "row": row}, notify) for row in entry["rows"])
+        if entry["op"] == "put":
+            row = entry["row"]
+            employee_number = int(row["EmployeeNumber"])
+            old = self.get(employee_number) if notify and employee_number in self._rows else None
+            self._rows[employee_number] = self._to_tuple(row)
+            self._max_employee_number = max(self._max_employee_number, employee_number)
+            if notify:
+                self._notify(old, self.get(employee_number))
+        else:
+            employee_number = int(entry["EmployeeNumber"])
+            if notify and employee_number in self._rows:
+                self._notify(self.get(employee_number), None)
+            self._rows.pop(employee_number, None)
+        return 1
+
+    def _start_compaction(self) -> None:
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self.compact, name="worker-store-compaction", daemon=True)
+        self._compactor.start()
+
+    def compact(self) -> None:
+        """Fold the journal into the CSV.
+
+        The live journal is rotated aside under the locks so writers keep
+        appending to a fresh one while the snapshot is written out.
+        """
+        with self._compact_lock, self._compact_file_lock:
+            self._compact()
+
+    def _compact(self) -> None:
+        with self._lock, self._file_lock:
+            self._sync()
+            if self._journal is None and not self.journal_path.exists():
+                return
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if self._compacting_path.exists():
+                # A previous compaction did not finish; keep its entries ahead of ours
+                with open(self._compacting_path, "a", encoding="utf-8") as dst, \
+                        open(self.journal_path, encoding="utf-8") as src:
+                    dst.write(src.read())
+                self.journal_path.unlink()
+            else:
+                os.replace(self.journal_path, self._compacting_path)
+            self._journal_entries = 0
+            self._journal_position = None
+            self._journal_id = None
+            rows = list(self._rows.values())
+            columns = list(self._columns)
+        self._write_snapshot(rows, columns)
+        # Refresh the columnar sidecar here so the next startup need not parse the CSV
+        from .columnar import ensure_sidecar
+        ensure_sidecar(self.path)
+
+    def close(self) -> None:
+        if self._compactor is not None:
+            self._compactor.join()
+        self.compact()
+
+    def _write_snapshot(self, rows: List[Tuple[Any, ...]], columns: List[str]) -> None:
+        import pandas as pd
+
+        # Only the compacting process writes here (compact file lock held)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with span("store.snapshot"):
+            pd.DataFrame.from_records(rows, columns=columns).to_csv(tmp, index=False)
+            with open(tmp, "rb") as fh:
+                os.fsync(fh.fileno())
+        WRITE_BYTES.inc(tmp.stat().st_size, "csv")
+        # Swap the CSV and drop the folded entries together, so other processes
+        # see either the old CSV plus .compacting or the new CSV, never a mix
+        with self._lock, self._file_lock:
+            os.replace(tmp, self.path)
+            if self._compacting_path.exists():
+                self._compacting_path.unlink()
+            self._file_stat = self._stat()
@@ -0,0 +1,310 @@
+"""Chunked, bounded-memory analysis for datasets larger than RAM.
+
+The dataset is read ``chunk_rows`` rows at a time. Each chunk is reduced to
+a ``PartialAggregates`` (counts, Welford-style mean/M2, pairwise
+co-moments, quantile sketches), and partials are merged pairwise, so only
+one chunk is ever resident. ``finalize`` produces the same result dict as
+``analyzer.analyze_frame``; department medians are exact until a group
+outgrows its sketch and approximate (rank error well under 1%) after that.
+"""
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional
+
+import numpy as np
+
+from .incremental import (
+    AGE_BINS, AGE_LABELS, ANALYSIS_COLUMNS, CORRELATION_COLUMNS, COUNT_COLUMNS, INCOME_BINS, INCOME_LABELS,
+    MEAN_COLUMNS, Aggregates, DepartmentStats, assemble_results, correlation_matrix,
+)
+from .metrics import READ_BYTES, span
+from .schema import CATEGORICAL
+
+DEFAULT_MAX_MEMORY_MB = 256
+# Parsing a CSV chunk transiently needs a few times the final frame size
+_PARSE_OVERHEAD = 4
+
+
+class QuantileSketch:
+    """Mergeable KLL-style quantile sketch.
+
+    Level ``h`` holds items of weight ``2**h``; a level that grows past ``k``
+    items is sorted and every other item (random offset) is promoted. Until
+    the first compaction all values are kept, so small groups are exact.
+    """
+
+    def __init__(self, k: int = 8192, seed: int = 0) -> None:
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self.levels[0] = np.concatenate((self.levels[0], values))
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        self.n += other.n
+        for h, level in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate((self.levels[h], level))
+        self._compress()
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) > self.k:
+                level = np.sort(level)
+                odd = len(level) % 2
+                # Keep one item back if odd so promoted pairs stay balanced
+                kept, level = level[len(level) - odd:], level[:len(level) - odd]
+                promoted = level[self._rng.integers(2)::2]
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate((self.levels[h + 1], promoted))
+                self.levels[h] = kept
+            h += 1
+
+    @property
+    def exact(self) -> bool:
+        return len(self.levels) == 1
+
+    def median(self) -> float:
+        if self.n == 0:
+            return float("nan")
+        if self.exact:
+            return float(np.median(self.levels[0]))
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(lv), 2.0 ** h) for h, lv in enumerate(self.levels)])
+        order = np.argsort(values)
+        cumulative = np.cumsum(weights[order])
+        return float(values[order][np.searchsorted(cumulative, cumulative[-1] / 2)])
+
+
+def _merge_moments(n_a, mean_a, m2_a, n_b, mean_b, m2_b):
+    # Chan et al. pairwise update; works elementwise on arrays
+    n = n_a + n_b
+    with np.errstate(invalid="ignore", divide="ignore"):
+        delta = mean_b - mean_a
+        frac = np.where(n > 0, n_b / np.where(n > 0, n, 1), 0)
+        mean = mean_a + delta * frac
+        m2 = m2_a + m2_b + delta * delta * n_a * frac
+    return n, mean, m2
+
+
+class _DeptPartial:
+    __slots__ = ("count", "attrition", "n", "mean", "m2", "sketch")
+
+    def __init__(self, sketch_k: int) -> None:
+        self.count = 0
+        self.attrition = 0
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sketch = QuantileSketch(sketch_k)
+
+
+class PartialAggregates:
+    """Analysis aggregates over a subset of rows; merge() combines subsets."""
+
+    def __init__(self, sketch_k: int = 8192) -> None:
+        self.sketch_k = sketch_k
+        k = len(MEAN_COLUMNS)
+        self.total = 0
+        self.attrition = 0
+        self.n = np.zeros(k)
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.training_total = 0.0
+        self.counts: Dict[str, Counter] = {c: Counter() for c in COUNT_COLUMNS}
+        self.age_groups: Counter = Counter()
+        self.income_groups: Counter = Counter()
+        self.no_training = 0
+        self.high_performers = 0
+        self.remote = 0
+        self.departments: Dict[str, _DeptPartial] = {}
+        self.role_n: Counter = Counter()
+        self.role_sum: Counter = Counter()
+        c = len(CORRELATION_COLUMNS)
+        # Pairwise-complete co-moments: [i, j] covers rows where both i and j are present
+        self.pair_n = np.zeros((c, c))
+        self.pair_mean_x = np.zeros((c, c))
+        self.pair_m2_x = np.zeros((c, c))
+        self.pair_cxy = np.zeros((c, c))
+
+    @classmethod
+    def from_frame(cls, df, sketch_k: int = 8192) -> "PartialAggregates":
+        import pandas as pd
+
+        p = cls(sketch_k)
+        p.total = len(df)
+        yes = (df["Attrition"] == "Yes").to_numpy()
+        p.attrition = int(yes.sum())
+
+        values = df[MEAN_COLUMNS].to_numpy(np.float64)
+        present = ~np.isnan(values)
+        p.n = present.sum(axis=0).astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            p.mean = np.where(p.n > 0, np.nansum(values, axis=0) / np.where(p.n > 0, p.n, 1), 0)
+        p.m2 = np.nansum((values - p.mean) ** 2, axis=0)
+        p.training_total = float(np.nansum(df["TrainingTimesLastYear"].to_numpy(np.float64)))
+
+        for col in COUNT_COLUMNS:
+            p.counts[col].update(df[col].value_counts().to_dict())
+        age = pd.cut(df["Age"], bins=AGE_BINS, labels=AGE_LABELS)
+        income = pd.cut(df["MonthlyIncome"], bins=INCOME_BINS, labels=INCOME_LABELS)
+        p.age_groups.update(age.value_counts().to_dict())
+        p.income_groups.update(income.value_counts().to_dict())
+        p.no_training = int((df["TrainingTimesLastYear"] == 0).sum())
+        p.high_performers = int((df["PerformanceRating"] >= 4).sum())
+        p.remote = int((df["DistanceFromHome"] > 30).sum())
+
+        incomes = df["MonthlyIncome"].to_numpy(np.float64)
+        for dept, idx in df.groupby("Department", observed=True, sort=False).indices.items():
+            d = _DeptPartial(sketch_k)
+            d.count = len(idx)
+            d.attrition = int(yes[idx].sum())
+            vals = incomes[idx]
+            vals = vals[~np.isnan(vals)]
+            d.n = len(vals)
+            if d.n:
+                d.mean = float(vals.mean())
+                d.m2 = float(((vals - d.mean) ** 2).sum())
+            d.sketch.update(vals)
+            p.departments[dept] = d
+        roles = df.groupby("JobRole", observed=True)["MonthlyIncome"].agg(["count", "sum"])
+        p.role_n.update(roles["count"].to_dict())
+        p.role_sum.update(roles["sum"].to_dict())
+
+        x = df[CORRELATION_COLUMNS].to_numpy(np.float64)
+        mask = (~np.isnan(x)).astype(np.float64)
+        x0 = np.nan_to_num(x)
+        p.pair_n = mask.T @ mask
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_x = np.where(p.pair_n > 0, (x0.T @ mask) / np.where(p.pair_n > 0, p.pair_n, 1), 0)
+        mean_y = mean_x.T
+        p.pair_mean_x = mean_x
+        p.pair_m2_x = (x0 * x0).T @ mask - p.pair_n * mean_x * mean_x
+        p.pair_cxy = x0.T @ x0 - p.pair_n * mean_x * mean_y
+        return p
+
+    def merge(self, other: "PartialAggregates") -> "PartialAggregates":
+        self.total += other.total
+        self.attrition += other.attrition
+        self.n, self.mean, self.m2 = _merge_moments(self.n, self.mean, self.m2, other.n, other.mean, other.m2)
+        self.training_total += other.training_total
+        for col in COUNT_COLUMNS:
+            self.counts[col].update(other.counts[col])
+        self.age_groups.update(other.age_groups)
+        self.income_groups.update(other.income_groups)
+        self.no_training += other.no_training
+        self.high_performers += other.high_performers
+        self.remote += other.remote
+        for dept, theirs in other.departments.items():
+            mine = self.departments.get(dept)
+            if mine is None:
+                self.departments[dept] = theirs
+                continue
+            mine.count += theirs.count
+            mine.attrition += theirs.attrition
+            mine.n, mine.mean, mine.m2 = _merge_moments(mine.n, mine.mean, mine.m2, theirs.n, theirs.mean, theirs.m2)
+            mine.sketch.merge(theirs.sketch)
+        self.role_n.update(other.role_n)
+        self.role_sum.update(other.role_sum)
+
+        n_a, n_b = self.pair_n, other.pair_n
+        n = n_a + n_b
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frac = np.where(n > 0, n_b / np.where(n > 0, n, 1), 0)
+        dx = other.pair_mean_x - self.pair_mean_x
+        dy = dx.T
+        self.pair_cxy = self.pair_cxy + other.pair_cxy + dx * dy * n_a * frac
+        self.pair_m2_x = self.pair_m2_x + other.pair_m2_x + dx * dx * n_a * frac
+        self.pair_mean_x = self.pair_mean_x + dx * frac
+        self.pair_n = n
+        return self
+
+    def finalize(self) -> Dict:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(self.n > 0, self.mean, np.nan)
+        departments = {}
+        for dept, d in self.departments.items():
+            std = float(np.sqrt(d.m2 / (d.n - 1))) if d.n > 1 else float("nan")
+            mean = d.mean if d.n else float("nan")
+            departments[dept] = DepartmentStats(d.count, d.attrition, mean, d.sketch.median(), std)
+        return assemble_results(Aggregates(
+            total=self.total,
+            attrition=self.attrition,
+            means=dict(zip(MEAN_COLUMNS, means.tolist())),
+            counts=self.counts,
+            departments=departments,
+            role_means={r: self.role_sum[r] / n for r, n in self.role_n.items() if n},
+            age_groups=self.age_groups,
+            income_groups=self.income_groups,
+            training_total=self.training_total,
+            no_training=self.no_training,
+            high_performers=self.high_performers,
+            remote=self.remote,
+            correlation=correlation_matrix(self.pair_n, self.pair_cxy, self.pair_m2_x, self.pair_m2_x.T),
+        ))
+
+
+def chunk_rows_for_budget(dataset_path: Path, max_memory_mb: float) -> int:
+    """Rows per chunk so that parsing one chunk stays within ``max_memory_mb``."""
+    import pandas as pd
+
+    sample = pd.read_csv(dataset_path, usecols=ANALYSIS_COLUMNS, nrows=1000)
+    per_row = max(sample.memory_usage(deep=True).sum() / max(len(sample), 1), 1) * _PARSE_OVERHEAD
+    return max(1000, int(max_memory_mb * 1024 * 1024 / per_row))
+
+
+def iter_chunks(dataset_path: Path, chunk_rows: int) -> Iterator:
+    import pandas as pd
+
+    dtype = {c: "category" for c in CATEGORICAL if c in ANALYSIS_COLUMNS}
+    yield from pd.read_csv(dataset_path, usecols=ANALYSIS_COLUMNS, dtype=dtype, chunksize=chunk_rows)
+
+
+def analyze_streaming(
+    dataset_path: str,
+    max_memory_mb: float = DEFAULT_MAX_MEMORY_MB,
+    chunk_rows: Optional[int] = None,
+    sketch_k: int = 8192,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+) -> Dict:
+    """Same result as ``analyze_dairy_data`` with peak memory bounded by chunking.
+
+    ``progress(rows_done, None)`` is called after each chunk; the total is
+    unknown until the file has been read.
+    """
+    return partial_streaming(dataset_path, max_memory_mb, chunk_rows, sketch_k, progress).finalize()
+
+
+def partial_streaming(
+    dataset_path: str,
+    max_memory_mb: float = DEFAULT_MAX_MEMORY_MB,
+    chunk_rows: Optional[int] = None,
+    sketch_k: int = 8192,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+) -> PartialAggregates:
+    """The merged aggregates behind ``analyze_streaming``, before finalizing."""
+    if chunk_rows is None:
+        chunk_rows = chunk_rows_for_budget(Path(dataset_path), max_memory_mb)
+    total: Optional[PartialAggregates] = None
+    rows_done = 0
+    with span("streaming.scan"):
+        for chunk in iter_chunks(Path(dataset_path), chunk_rows):
+            part = PartialAggregates.from_frame(chunk, sketch_k)
+            total = part if total is None else total.merge(part)
+            rows_done += len(chunk)
+            if progress is not None:
+                progress(rows_done, None)
+    READ_BYTES.inc(Path(dataset_path).stat().st_size, "csv")
+    if total is None:
+        total = PartialAggregates(sketch_k)
+    return total
@@ -0,0 +1,84 @@
+"""Startup work (loading the dataset, priming caches) and the readiness it gates.
+
+In ``eager`` mode the stages run in the startup hook, so the server starts
+listening only once they are done, as it always has. In ``background``
+mode the server listens as soon as the app is imported and the same stages
+run on a thread: ``/health`` answers at once and reports ``ready`` when
+they finish, and handlers that need the dataset wait for them meanwhile.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .metrics import span
+
+MODES = ("eager", "background")
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Warmup:
+    def __init__(self, mode: str = "eager") -> None:
+        if mode not in MODES:
+            raise ValueError(f"startup mode must be one of {', '.join(MODES)}")
+        self.mode = mode
+        self.status = PENDING
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._stages: List[Tuple[str, Callable[[], Any]]] = []
+        self._finished = threading.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self.status == DONE
+
+    def stage(self, name: str, fn: Callable[[], Any]) -> None:
+        """Add a stage; stages run in the order they were added."""
+        self._stages.append((name, fn))
+
+    def start(self) -> None:
+        """Run the stages: here in eager mode, on a daemon thread in background mode."""
+        # Marked running before the thread starts, so wait() cannot miss it
+        self.status = RUNNING
+        self.started_at = time.time()
+        if self.mode == "eager":
+            self._run()
+        else:
+            threading.Thread(target=self._run, name="warmup", daemon=True).start()
+
+    def wait(self) -> None:
+        """Block until a running warm-up has finished; returns at once if none was started."""
+        if self.status == RUNNING:
+            self._finished.wait()
+
+    def _run(self) -> None:
+        try:
+            for name, fn in self._stages:
+                start = time.perf_counter()
+                with span(f"warmup.{name}"):
+                    fn()
+                self.timings[name] = time.perf_counter() - start
+        except Exception as exc:
+            self.error = f"{type(exc).__name__}: {exc}"
+            self.status = FAILED
+            # Fails startup in eager mode; printed by the thread in background mode
+            raise
+        else:
+            self.status = DONE
+        finally:
+            self.finished_at = time.time()
+            self._finished.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "status": self.status,
+            "stages": {name: round(seconds, 4) for name, seconds in self.timings.items()},
+            "error": self.error,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+        }
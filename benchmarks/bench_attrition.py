@@ -0,0 +1,66 @@
+"""Time AttritionScorer batch scoring against per-row rescoring.
+
+    python benchmarks/bench_attrition.py [--workers 200000] [--updates 2000]
+
+Rows are the repo dataset repeated up to ``--workers``. The scorer is
+reset over all of them (one vectorized pass), then ``--updates`` single-row
+changes are applied as the store would deliver them, and the top-N query is
+timed right after a change (per-department arrays rebuilt) and again with
+them cached. Finally the cached scores are checked against a fresh batch.
+"""
+import argparse
+from pathlib import Path
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from backend.attrition import AttritionScorer  # noqa: E402
+from backend.schema import read_csv  # noqa: E402
+
+DATASET = ROOT / "synthetic_dairy_dataset_with_contacts.csv"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=200_000)
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--n", type=int, default=10)
+    args = parser.parse_args()
+
+    base = read_csv(DATASET).astype(object).to_dict(orient="records")
+    rows = [dict(base[i % len(base)], EmployeeNumber=i + 1) for i in range(args.workers)]
+    scorer = AttritionScorer()
+    start = time.perf_counter()
+    scorer.reset(rows)
+    batch = time.perf_counter() - start
+    print(f"batch scored {args.workers} workers in {batch * 1000:.0f}ms ({batch / args.workers * 1e6:.2f}us/worker)")
+
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for i in rng.integers(0, args.workers, args.updates):
+        old = rows[i]
+        rows[i] = dict(old, YearsAtCompany=int(rng.integers(0, 30)))
+        scorer.apply(old, rows[i])
+    per_row = (time.perf_counter() - start) / args.updates
+    print(f"{args.updates} updates rescored one row each: {per_row * 1e6:.0f}us/update "
+          f"(a full rescore would cost {batch * 1000:.0f}ms each)")
+
+    start = time.perf_counter()
+    scorer.at_risk(args.n)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    scorer.at_risk(args.n)
+    warm = time.perf_counter() - start
+    print(f"top-{args.n} per department: {cold * 1000:.1f}ms after a change, {warm * 1000:.2f}ms cached")
+
+    expected = scorer.model.predict(rows)
+    drift = max(abs(scorer.score(row["EmployeeNumber"]) - p) for row, p in zip(rows, expected.tolist()))
+    print(f"max difference from a fresh batch: {drift:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Time SkillMatcher.rank on a large synthetic workforce.
+
+    python benchmarks/bench_matching.py [--workers 1000000] [--repeat 20]
+
+Rows are the repo dataset repeated up to ``--workers`` with a random
+Skills list drawn from a fixed vocabulary (the dataset's own Skills column
+is mostly empty). Each query is timed end to end through ``rank`` and the
+best/median of ``--repeat`` runs is printed, next to a full ``argsort``
+of the same scores for comparison with the partial selection.
+"""
+import argparse
+from pathlib import Path
+import statistics
+import sys
+import time
+from typing import Callable, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from backend.matching import JobRequirement, SkillMatcher  # noqa: E402
+from backend.schema import read_csv  # noqa: E402
+from generate_dataset import SKILL_VOCABULARY as VOCABULARY  # noqa: E402
+
+DATASET = ROOT / "synthetic_dairy_dataset_with_contacts.csv"
+
+
+def timed(fn: Callable[[], object], repeat: int) -> List[float]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    base = read_csv(DATASET).astype(object).to_dict(orient="records")
+    counts = rng.integers(0, 7, args.workers)
+    picks = rng.integers(0, len(VOCABULARY), (args.workers, 6))
+    rows = (
+        dict(base[i % len(base)], EmployeeNumber=i + 1, Skills=", ".join(VOCABULARY[j] for j in picks[i, :counts[i]]))
+        for i in range(args.workers)
+    )
+    matcher = SkillMatcher()
+    start = time.perf_counter()
+    matcher.reset(rows)
+    print(f"generated and indexed {len(matcher)} workers in {time.perf_counter() - start:.1f}s")
+
+    role = base[0]["JobRole"]
+    queries = [
+        ("role level only", JobRequirement(job_role=role)),
+        ("role + 3 skills", JobRequirement(job_role=role, skills=VOCABULARY[:3])),
+        ("6 skills, department", JobRequirement(skills=VOCABULARY[3:9], required_skill=0.6, department=base[0]["Department"])),
+        ("within role + 3 skills", JobRequirement(job_role=role, skills=VOCABULARY[:3], within_role=True)),
+    ]
+    print(f"{'query':26} {'best':>9} {'median':>9}")
+    for name, requirement in queries:
+        times = timed(lambda: matcher.rank(requirement, args.k), args.repeat)
+        print(f"{name:26} {min(times):7.1f}ms {statistics.median(times):7.1f}ms")
+
+    scores = rng.random(args.workers)
+    part = timed(lambda: np.argpartition(-scores, args.k - 1)[:args.k], args.repeat)
+    full = timed(lambda: np.argsort(-scores)[:args.k], args.repeat)
+    print(f"top-{args.k} of {args.workers} scores: argpartition {min(part):.1f}ms, argsort {min(full):.1f}ms")
+
+    # Mutations keep the arrays current in place
+    row = dict(base[0], EmployeeNumber=args.workers + 1, Skills="Pasteurization, HACCP")
+    matcher.apply(None, row)
+    times = timed(lambda: matcher.apply(row, row), args.repeat)
+    print(f"apply (update) median {statistics.median(times) * 1000:.0f}us")
+
+
+if __name__ == "__main__":
+    main()
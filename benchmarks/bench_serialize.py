@@ -0,0 +1,84 @@
+"""Compare the old sanitize/jsonable_encoder/JSONResponse chain with serialize.dumps.
+
+    python benchmarks/bench_serialize.py [--rows 100000] [--repeat 3]
+
+Worker rows are the repo dataset repeated up to ``--rows``; the analysis
+payload is ``analyze_frame`` on the same rows.
+"""
+import argparse
+from pathlib import Path
+import sys
+import time
+from typing import Any, Callable, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from backend.analyzer import analyze_frame  # noqa: E402
+from backend.main import WORKER_LIST_FIELDS  # noqa: E402
+from backend.schema import read_csv  # noqa: E402
+from backend.serialize import dumps  # noqa: E402
+
+DATASET = ROOT / "synthetic_dairy_dataset_with_contacts.csv"
+
+
+def _to_builtin(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def sanitize(obj: Any) -> Any:
+    # The recursive walk main.py used before serialize.dumps
+    obj = _to_builtin(obj)
+    if isinstance(obj, dict):
+        return {str(k): sanitize(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, set)):
+        return [sanitize(v) for v in obj]
+    return obj
+
+
+def legacy(obj: Any) -> bytes:
+    return JSONResponse(content=jsonable_encoder(sanitize(obj))).body
+
+
+def best_of(fn: Callable[[], Any], repeat: int) -> float:
+    times: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = read_csv(DATASET)
+    df = pd.concat([df] * -(-args.rows // len(df)), ignore_index=True).iloc[:args.rows]
+    full_rows = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+    list_rows = [{f: row[f] for f in WORKER_LIST_FIELDS} for row in full_rows]
+    payloads = [
+        (f"GET /workers ({args.rows} rows, list fields)", list_rows),
+        (f"worker rows ({args.rows} rows, all columns)", full_rows),
+        ("GET /analysis", analyze_frame(df)),
+    ]
+
+    print(f"{'payload':45} {'legacy':>10} {'dumps':>10} {'speed-up':>9}")
+    for name, payload in payloads:
+        assert legacy(payload) == dumps(payload), name
+        old = best_of(lambda: legacy(payload), args.repeat)
+        new = best_of(lambda: dumps(payload), args.repeat)
+        print(f"{name:45} {old * 1000:8.1f}ms {new * 1000:8.1f}ms {old / new:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Time API import, time to first response and time to ready, per startup mode.
+
+    python benchmarks/bench_startup.py [--rows 100000] [--dataset CSV] [--repeat 3] [--modes eager background]
+
+For each ``API_STARTUP`` mode the server is started ``--repeat`` times as a
+real ``uvicorn`` process on a copy of the dataset (generated as in
+run_benchmarks.py). Times are from process spawn:
+
+- import: ``import backend.main`` alone, in a fresh interpreter
+- listening: first answer from ``GET /health``
+- first data: a ``GET /workers?limit=50`` sent as soon as it is listening
+  (in background mode it waits for the warm-up)
+- ready: first 200 from ``GET /health/ready``
+
+followed by the latency of the first few requests made once ready. One
+untimed start builds the columnar sidecar first. Medians are reported.
+Needs httpx and uvicorn.
+"""
+import argparse
+import os
+from pathlib import Path
+import shutil
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import httpx  # noqa: E402
+
+from generate_dataset import generate  # noqa: E402
+
+MODES = ("eager", "background")
+FIRST_DATA = "/workers?limit=50"
+# Timed once ready, in this order
+AFTER_READY = ["/analysis", "/workers/1", "/workers?department=Production&sort=-MonthlyIncome&limit=50"]
+POLL_SECONDS = 0.005
+TIMEOUT_SECONDS = 600
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _env(dataset: Path, mode: str) -> Dict[str, str]:
+    return {**os.environ, "WORKER_DATASET": str(dataset), "WORKER_STORAGE": "csv", "API_STARTUP": mode}
+
+
+def _import_seconds(dataset: Path, mode: str) -> float:
+    code = "import time; t = time.perf_counter(); import backend.main; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=_env(dataset, mode),
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip())
+
+
+def _until(client: httpx.Client, path: str, started: float, status: int = 200) -> float:
+    while time.perf_counter() - started < TIMEOUT_SECONDS:
+        try:
+            if client.get(path).status_code == status:
+                return time.perf_counter() - started
+        except httpx.TransportError:
+            pass
+        time.sleep(POLL_SECONDS)
+    raise TimeoutError(f"{path} did not answer {status} within {TIMEOUT_SECONDS}s")
+
+
+def _start(dataset: Path, mode: str) -> Dict[str, float]:
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=_env(dataset, mode),
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=TIMEOUT_SECONDS) as client:
+            times = {"listening": _until(client, "/health", started)}
+            response = client.get(FIRST_DATA)
+            response.raise_for_status()
+            times["first data"] = time.perf_counter() - started
+            times["ready"] = _until(client, "/health/ready", started)
+            for name, seconds in client.get("/health").json()["warmup"]["stages"].items():
+                times[f"warm-up {name}"] = seconds
+            for path in AFTER_READY:
+                call = time.perf_counter()
+                client.get(path).raise_for_status()
+                times[f"then {path}"] = time.perf_counter() - call
+        return times
+    finally:
+        server.send_signal(signal.SIGINT)
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dataset", type=Path, help="start on this CSV instead of a generated one")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+
+    source = args.dataset
+    if source is None:
+        source = Path(tempfile.gettempdir()) / f"dairy-bench-{args.rows}-{args.seed}.csv"
+        if not source.exists():
+            generate(source, args.rows, args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset = Path(tmp) / "workers.csv"
+        shutil.copy(source, dataset)
+        _start(dataset, "eager")
+
+        results: Dict[str, Dict[str, List[float]]] = {}
+        for mode in args.modes:
+            runs = results.setdefault(mode, {"import": []})
+            for _ in range(args.repeat):
+                runs["import"].append(_import_seconds(dataset, mode))
+                for name, seconds in _start(dataset, mode).items():
+                    runs.setdefault(name, []).append(seconds)
+
+    print(f"{source} ({args.rows if args.dataset is None else 'given'} rows), median of {args.repeat}, seconds")
+    names = list(dict.fromkeys(name for runs in results.values() for name in runs))
+    width = max(map(len, names))
+    print(f"{'':{width}}  " + "  ".join(f"{mode:>10}" for mode in results))
+    for name in names:
+        cells = [f"{statistics.median(runs[name]):10.3f}" if name in runs else f"{'-':>10}" for runs in results.values()]
+        print(f"{name:{width}}  " + "  ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
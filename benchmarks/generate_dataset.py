@@ -0,0 +1,122 @@
+"""Generate a synthetic worker dataset of any size with the repo dataset's schema.
+
+    python benchmarks/generate_dataset.py OUT.csv --rows 1000000 [--seed 0]
+
+Every column of ``synthetic_dairy_dataset_with_contacts.csv`` is written,
+in the same order. Values are drawn from the repo dataset's own per-column
+distributions, so category frequencies and missing-value rates match it:
+RequiredSkillByRole is drawn together with JobRole, and MonthlyIncome and
+OperatorSkillScore get a little noise so they are not limited to the
+~1k source values. Emails are derived from the drawn Name and the
+EmployeeNumber, which runs from 1. The source's Skills column is nearly
+empty, so skills are drawn from SKILL_VOCABULARY instead (0-6 per worker).
+
+Rows are generated and appended in chunks, so memory stays flat from 10k
+to 50M rows. The output depends only on ``--seed`` and ``--chunk-rows``.
+"""
+import argparse
+from pathlib import Path
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+SOURCE = ROOT / "synthetic_dairy_dataset_with_contacts.csv"
+SKILL_VOCABULARY = [
+    "Pasteurization", "Homogenization", "Quality Control", "Safety Protocols", "Equipment Maintenance",
+    "Team Leadership", "Packaging Operations", "Inventory Management", "Lab Equipment", "Data Analysis",
+    "Compliance", "Cold Chain", "Forklift", "HACCP", "CIP Cleaning", "Cheese Making", "Butter Churning",
+    "Microbiology", "Welding", "PLC Programming", "Hydraulics", "Route Planning", "Herd Health", "Milking Systems",
+]
+MAX_SKILLS = 6
+DEFAULT_CHUNK_ROWS = 100_000
+# Drawn as a pair from one source row
+JOINT = ("JobRole", "RequiredSkillByRole")
+# Derived rather than drawn
+DERIVED = ("EmployeeNumber", "Email", "Skills")
+
+
+class Profile:
+    """Per-column value pools taken from the source dataset."""
+
+    def __init__(self, source: Path = SOURCE) -> None:
+        df = pd.read_csv(source)
+        self.columns: List[str] = list(df.columns)
+        self.values: Dict[str, np.ndarray] = {c: df[c].to_numpy() for c in self.columns}
+        self.rows = len(df)
+        self.income_noise = float(df["MonthlyIncome"].std()) * 0.05
+
+    def chunk(self, start: int, n: int, rng: np.random.Generator) -> pd.DataFrame:
+        """Rows ``start + 1`` .. ``start + n`` (by EmployeeNumber)."""
+        data = {}
+        joint = rng.integers(0, self.rows, n)
+        for column in self.columns:
+            if column in DERIVED:
+                continue
+            idx = joint if column in JOINT else rng.integers(0, self.rows, n)
+            data[column] = self.values[column][idx]
+        data["EmployeeNumber"] = np.arange(start + 1, start + n + 1, dtype=np.int64)
+
+        income = data["MonthlyIncome"] + rng.normal(0, self.income_noise, n)
+        data["MonthlyIncome"] = np.maximum(income, 0).round().astype(np.int64)
+        skill = data["OperatorSkillScore"].astype(np.float64) + rng.normal(0, 0.01, n)
+        data["OperatorSkillScore"] = np.clip(skill, 0, 1).round(9)
+
+        names = pd.Series(data["Name"], dtype=object)
+        local = names.str.lower().str.replace(r"[^a-z]+", ".", regex=True).str.strip(".")
+        data["Email"] = (local + pd.Series(data["EmployeeNumber"]).astype(str) + "@example.com").to_numpy()
+
+        counts = rng.integers(0, MAX_SKILLS + 1, n)
+        picks = rng.integers(0, len(SKILL_VOCABULARY), (n, MAX_SKILLS))
+        data["Skills"] = [", ".join(SKILL_VOCABULARY[j] for j in picks[i, :counts[i]]) for i in range(n)]
+        return pd.DataFrame(data, columns=self.columns)
+
+
+def generate(
+    path: Path,
+    rows: int,
+    seed: int = 0,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    source: Path = SOURCE,
+    progress: Optional[Callable[[int], None]] = None,
+) -> None:
+    """Write ``rows`` generated workers to ``path`` (replaced atomically)."""
+    profile = Profile(source)
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", newline="") as fh:
+        for index, start in enumerate(range(0, rows, chunk_rows)):
+            rng = np.random.default_rng([seed, index])
+            chunk = profile.chunk(start, min(chunk_rows, rows - start), rng)
+            chunk.to_csv(fh, header=start == 0, index=False)
+            if progress is not None:
+                progress(start + len(chunk))
+        if rows == 0:
+            pd.DataFrame(columns=profile.columns).to_csv(fh, index=False)
+    tmp.replace(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out", type=Path)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+
+    def progress(done: int) -> None:
+        print(f"\r{done}/{args.rows} rows", end="", file=sys.stderr, flush=True)
+
+    generate(args.out, args.rows, args.seed, args.chunk_rows, progress=progress)
+    elapsed = time.perf_counter() - start
+    print(f"\rwrote {args.rows} rows to {args.out} in {elapsed:.1f}s "
+          f"({args.out.stat().st_size / 1e6:.0f} MB)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
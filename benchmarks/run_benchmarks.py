@@ -0,0 +1,313 @@
+"""Benchmark the analyzer and the API on a generated dataset, against a stored baseline.
+
+    python benchmarks/run_benchmarks.py [--rows 100000] [--requests 400] [--concurrency 16]
+        [--only NAME ...] [--baseline benchmarks/baseline.json] [--save-baseline] [--tolerance 0.25]
+
+A dataset of ``--rows`` workers is generated once with generate_dataset.py
+and kept in the temp dir for later runs (or pass ``--dataset``). Every case
+runs in a fresh process on its own copy of it, so writes do not leak from
+one case into the next and the peak RSS reported belongs to that case
+alone. API cases drive the app in-process through httpx's ASGI transport
+with ``--concurrency`` requests in flight, after a few untimed warm-up
+requests; the analyzer case calls ``analyze_dairy_data`` back to back.
+
+Each case reports throughput, p50/p99 latency and peak RSS. Every metric is
+compared with the baseline file, and the run exits non-zero if any is worse
+by more than ``--tolerance`` (a fraction). ``--save-baseline`` records this
+run as the new baseline instead. Baselines only mean something for the same
+machine and settings, so a baseline recorded with other settings is refused.
+Needs httpx (``pip install httpx``).
+"""
+import argparse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import json
+import multiprocessing
+import os
+from pathlib import Path
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from generate_dataset import generate  # noqa: E402
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+WARMUP_REQUESTS = 5
+IMPORT_BATCH = 100
+# metric -> True when higher is better
+METRICS = {"throughput": True, "p50_ms": False, "p99_ms": False, "peak_rss_mb": False}
+
+Request = Tuple[str, str, Dict[str, Any]]
+
+
+class Context(NamedTuple):
+    employee_numbers: np.ndarray
+    departments: List[str]
+
+
+class Case(NamedTuple):
+    name: str
+    # Share of --requests this case sends; whole-dataset responses send fewer
+    share: float
+    plan: Callable[[np.random.Generator, int, Context], List[Request]]
+
+
+def _get(url: str) -> Callable[[np.random.Generator, int, Context], List[Request]]:
+    return lambda rng, n, ctx: [("GET", url, {})] * n
+
+
+def _get_worker(rng: np.random.Generator, n: int, ctx: Context) -> List[Request]:
+    return [("GET", f"/workers/{e}", {}) for e in rng.choice(ctx.employee_numbers, n)]
+
+
+def _filtered_page(rng: np.random.Generator, n: int, ctx: Context) -> List[Request]:
+    return [
+        ("GET", "/workers", {"params": {"department": d, "sort": "-MonthlyIncome", "limit": 50}})
+        for d in rng.choice(ctx.departments, n)
+    ]
+
+
+def _create(rng: np.random.Generator, n: int, ctx: Context) -> List[Request]:
+    return [
+        ("POST", "/workers", {"json": {"name": f"Bench Worker {i}", "department": d, "experience": "4 years"}})
+        for i, d in enumerate(rng.choice(ctx.departments, n))
+    ]
+
+
+def _update(rng: np.random.Generator, n: int, ctx: Context) -> List[Request]:
+    return [
+        ("PUT", f"/workers/{e}", {"json": {"MonthlyIncome": int(income), "OverTime": "Yes"}})
+        for e, income in zip(rng.choice(ctx.employee_numbers, n), rng.integers(20000, 120000, n))
+    ]
+
+
+def _delete(rng: np.random.Generator, n: int, ctx: Context) -> List[Request]:
+    # Every worker at most once, or later deletes would only measure 404s
+    return [("DELETE", f"/workers/{e}", {}) for e in rng.permutation(ctx.employee_numbers)[:n]]
+
+
+def _import(rng: np.random.Generator, n: int, ctx: Context) -> List[Request]:
+    plan = []
+    for b in range(n):
+        body = "\n".join(
+            json.dumps({"name": f"Imported {b}-{i}", "department": d, "experience": "2 years"})
+            for i, d in enumerate(rng.choice(ctx.departments, IMPORT_BATCH))
+        )
+        plan.append(("POST", "/workers/import", {"content": body, "headers": {"content-type": "application/x-ndjson"}}))
+    return plan
+
+
+def _analysis_with_writes(rng: np.random.Generator, n: int, ctx: Context) -> List[Request]:
+    # Every tenth request changes a worker, so the cached body keeps going stale
+    updates = iter(_update(rng, n, ctx))
+    return [next(updates) if i % 10 == 9 else ("GET", "/analysis", {}) for i in range(n)]
+
+
+ANALYZER = "analyze_dairy_data"
+CASES = [
+    Case("GET /workers/{id}", 1.0, _get_worker),
+    Case("GET /workers?limit=100", 1.0, _get("/workers?limit=100")),
+    Case("GET /workers?department&sort&limit=50", 1.0, _filtered_page),
+    Case("GET /workers (all)", 0.02, _get("/workers")),
+    Case("POST /workers", 1.0, _create),
+    Case("PUT /workers/{id}", 1.0, _update),
+    Case("DELETE /workers/{id}", 1.0, _delete),
+    Case(f"POST /workers/import ({IMPORT_BATCH} rows)", 0.1, _import),
+    Case("GET /workers/export", 0.02, _get("/workers/export")),
+    Case("GET /analysis", 1.0, _get("/analysis")),
+    Case("GET /analysis + 10% PUT", 1.0, _analysis_with_writes),
+]
+CASE_NAMES = [ANALYZER] + [c.name for c in CASES]
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _summary(latencies: List[float], wall: float, errors: int, setup: float) -> Dict[str, Any]:
+    ms = np.asarray(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": round(len(latencies) / wall, 2),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "setup_s": round(setup, 2),
+    }
+
+
+async def _drive(app: Any, plan: List[Request], concurrency: int) -> Tuple[List[float], float, int]:
+    import httpx
+
+    latencies = [0.0] * len(plan)
+    errors = 0
+    pending = iter(enumerate(plan))
+
+    async def client_loop(client: "httpx.AsyncClient") -> None:
+        nonlocal errors
+        # The iterator is shared, so each request is sent by exactly one loop
+        for i, (method, url, kwargs) in pending:
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies[i] = time.perf_counter() - start
+            if response.status_code >= 400:
+                errors += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        wall = time.perf_counter() - start
+    return latencies, wall, errors
+
+
+def _run_case(name: str, dataset: str, requests: int, concurrency: int, seed: int, analyzer_repeat: int) -> Dict[str, Any]:
+    # Runs in a fresh process per case
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "workers.csv"
+        shutil.copy(dataset, path)
+        start = time.perf_counter()
+        if name == ANALYZER:
+            from backend.analyzer import analyze_dairy_data
+
+            # The first call also builds the columnar sidecar
+            analyze_dairy_data(str(path))
+            setup = time.perf_counter() - start
+            latencies = []
+            wall_start = time.perf_counter()
+            for _ in range(analyzer_repeat):
+                call = time.perf_counter()
+                analyze_dairy_data(str(path))
+                latencies.append(time.perf_counter() - call)
+            return _summary(latencies, time.perf_counter() - wall_start, 0, setup)
+
+        os.environ["WORKER_DATASET"] = str(path)
+        os.environ["WORKER_STORAGE"] = "csv"
+        from backend import main
+
+        main.load_store()
+        setup = time.perf_counter() - start
+        case = next(c for c in CASES if c.name == name)
+        rng = np.random.default_rng(seed)
+        departments = {row["Department"] for row in main.store.records(["Department"])} - {None}
+        ctx = Context(np.asarray(main.store.employee_numbers()), sorted(departments))
+        n = max(WARMUP_REQUESTS, int(requests * case.share))
+        plan = case.plan(rng, n + WARMUP_REQUESTS, ctx)
+        asyncio.run(_drive(main.app, plan[:WARMUP_REQUESTS], 1))
+        latencies, wall, errors = asyncio.run(_drive(main.app, plan[WARMUP_REQUESTS:], concurrency))
+        result = _summary(latencies, wall, errors, setup)
+        main.close_store()
+        return result
+
+
+def _dataset(args: argparse.Namespace) -> Path:
+    if args.dataset:
+        return args.dataset
+    path = Path(tempfile.gettempdir()) / f"dairy-bench-{args.rows}-{args.seed}.csv"
+    if not path.exists():
+        start = time.perf_counter()
+        generate(path, args.rows, args.seed)
+        print(f"generated {args.rows} rows into {path} in {time.perf_counter() - start:.1f}s")
+    return path
+
+
+def _compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    regressions = []
+    for metric, higher_is_better in METRICS.items():
+        now, then = current[metric], baseline.get(metric)
+        if not then:
+            continue
+        worse = then / now - 1 if higher_is_better else now / then - 1
+        if worse > tolerance:
+            regressions.append(f"{metric} {then:g} -> {now:g} ({worse:+.0%})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dataset", type=Path, help="benchmark this CSV instead of a generated one")
+    parser.add_argument("--requests", type=int, default=400, help="timed requests per case (fewer for whole-dataset ones)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--analyzer-repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="cases whose name contains any of these")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    names = [n for n in CASE_NAMES if not args.only or any(o in n for o in args.only)]
+    if not names:
+        parser.error(f"no case matches {args.only}; cases: {', '.join(CASE_NAMES)}")
+    config = {
+        "rows": args.rows if not args.dataset else str(args.dataset),
+        "requests": args.requests, "concurrency": args.concurrency,
+        "analyzer_repeat": args.analyzer_repeat, "seed": args.seed,
+    }
+    baseline: Optional[Dict[str, Any]] = None
+    if not args.save_baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("config") != config:
+            print(f"{args.baseline} was recorded with {baseline.get('config')}, not {config}; "
+                  "rerun with the same settings or --save-baseline", file=sys.stderr)
+            sys.exit(2)
+    dataset = _dataset(args)
+
+    print(f"{'case':40} {'reqs':>5} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'RSS MB':>8}  vs baseline")
+    results: Dict[str, Dict[str, Any]] = {}
+    failed = []
+    ctx = multiprocessing.get_context("spawn")
+    for name in names:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            result = pool.submit(
+                _run_case, name, str(dataset), args.requests, args.concurrency, args.seed, args.analyzer_repeat,
+            ).result()
+        results[name] = result
+        notes = []
+        if result["errors"]:
+            notes.append(f"{result['errors']} error responses")
+            failed.append(name)
+        if baseline is not None:
+            if name in baseline["cases"]:
+                regressions = _compare(result, baseline["cases"][name], args.tolerance)
+                notes.extend(regressions or ["ok"])
+                if regressions:
+                    failed.append(name)
+            else:
+                notes.append("not in baseline")
+        print(f"{name:40} {result['requests']:5} {result['throughput']:9.1f} {result['p50_ms']:9.2f} "
+              f"{result['p99_ms']:9.2f} {result['peak_rss_mb']:8.0f}  {'; '.join(notes)}", flush=True)
+
+    if args.save_baseline:
+        cases = results
+        if args.only and args.baseline.exists():
+            # Re-record just the selected cases of a baseline with the same settings
+            previous = json.loads(args.baseline.read_text())
+            if previous.get("config") == config:
+                cases = {**previous["cases"], **results}
+        args.baseline.write_text(json.dumps({
+            "config": config,
+            "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+            "cases": cases,
+        }, indent=1) + "\n")
+        print(f"baseline saved to {args.baseline}")
+    if failed:
+        print(f"FAIL: {', '.join(dict.fromkeys(failed))}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Stress the worker store with many concurrent writers in several processes.
+
+    python benchmarks/stress_storage.py [--processes 8] [--threads 25] [--ops 20] [--backend csv]
+
+Each writer (processes x threads of them) creates workers, updates and
+deletes some of its own, all against one copy of the dataset, with a small
+compaction threshold so journal rotations and CSV swaps happen mid-run.
+Afterwards a fresh store is loaded from disk and checked: no EmployeeNumber
+handed out twice, no write lost, every surviving row holds its last update.
+Exits non-zero on any violation.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+from pathlib import Path
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from backend.sqlstore import migrate_csv  # noqa: E402
+from backend.storage import BACKENDS, StorageBackend, open_store  # noqa: E402
+
+DATASET = ROOT / "synthetic_dairy_dataset_with_contacts.csv"
+
+# (created EmployeeNumbers, deleted ones, final Age of each surviving one, mutations)
+WriterResult = Tuple[List[int], List[int], Dict[int, int], int]
+
+
+def _writer(store: StorageBackend, name: str, ops: int) -> WriterResult:
+    created: List[int] = []
+    deleted: List[int] = []
+    ages: Dict[int, int] = {}
+    mutations = 0
+    for i in range(ops):
+        number = store.create(lambda n: {"EmployeeNumber": n, "Name": f"{name}-{i}", "Age": 20, "Department": "Logistics"})
+        created.append(number)
+        ages[number] = 20
+        mutations += 1
+        if i % 3 == 1:
+            target = created[-2]
+            if target in ages:
+                ages[target] = 21 + i % 60
+                store.update(target, {"Age": ages[target]})
+                mutations += 1
+        if i % 5 == 4:
+            target = created[-3]
+            if target in ages:
+                store.delete(target)
+                deleted.append(target)
+                del ages[target]
+                mutations += 1
+    return created, deleted, ages, mutations
+
+
+def _process(backend: str, path: str, index: int, threads: int, ops: int, compact_every: int) -> List[WriterResult]:
+    store = open_store(backend, Path(path), compact_every=compact_every)
+    store.load()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = [pool.submit(_writer, store, f"p{index}t{t}", ops) for t in range(threads)]
+        results = [f.result() for f in futures]
+    store.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=25, help="writer threads per process")
+    parser.add_argument("--ops", type=int, default=20, help="creates per writer")
+    parser.add_argument("--compact-every", type=int, default=200)
+    parser.add_argument("--backend", choices=BACKENDS, default="csv")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "workers.csv"
+        shutil.copy(DATASET, path)
+        if args.backend == "sqlite":
+            migrate_csv(path, path.with_suffix(".db"))
+            path = path.with_suffix(".db")
+        baseline = open_store(args.backend, path)
+        baseline.load()
+        before = set(baseline.employee_numbers())
+        baseline.close()
+
+        start = time.perf_counter()
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(args.processes) as pool:
+            per_process = pool.starmap(
+                _process,
+                [(args.backend, str(path), p, args.threads, args.ops, args.compact_every) for p in range(args.processes)],
+            )
+        elapsed = time.perf_counter() - start
+        results = [r for rs in per_process for r in rs]
+
+        created = [n for c, _, _, _ in results for n in c]
+        deleted = {n for _, d, _, _ in results for n in d}
+        expected_ages = {n: age for _, _, ages, _ in results for n, age in ages.items()}
+        mutations = sum(m for _, _, _, m in results)
+
+        final = open_store(args.backend, path)
+        final.load()
+        errors = []
+        if len(created) != len(set(created)):
+            errors.append(f"{len(created) - len(set(created))} EmployeeNumbers handed out twice")
+        if set(created) & before:
+            errors.append("new workers reused existing EmployeeNumbers")
+        expected = (before | set(created)) - deleted
+        actual = set(final.employee_numbers())
+        if actual != expected:
+            errors.append(f"{len(expected - actual)} rows lost, {len(actual - expected)} unexpected rows")
+        wrong = [n for n, age in expected_ages.items() if n in actual and final.get(n)["Age"] != age]
+        if wrong:
+            errors.append(f"{len(wrong)} rows lost their last update")
+
+        writers = args.processes * args.threads
+        print(f"{writers} writers in {args.processes} processes: {mutations} mutations in {elapsed:.1f}s "
+              f"({mutations / elapsed:.0f}/s), {len(actual)} rows on disk")
+        if errors:
+            for error in errors:
+                print("FAIL:", error)
+            sys.exit(1)
+        print("OK: unique EmployeeNumbers, no lost writes, last updates kept")
+
+
+if __name__ == "__main__":
+    main()
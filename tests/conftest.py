@@ -0,0 +1,27 @@
+from pathlib import Path
+import shutil
+import sys
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+DATASET = ROOT / "synthetic_dairy_dataset_with_contacts.csv"
+
+
+@pytest.fixture
+def dataset(tmp_path: Path) -> Path:
+    # A private copy, so journals, sidecars and compactions never touch the repo's CSV
+    path = tmp_path / "workers.csv"
+    shutil.copy(DATASET, path)
+    return path
+
+
+@pytest.fixture
+def store(dataset: Path):
+    from backend.store import WorkerStore
+
+    workers = WorkerStore(dataset, fsync=False)
+    workers.load()
+    return workers
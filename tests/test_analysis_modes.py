@@ -0,0 +1,55 @@
+"""Every analysis mode against a full ``analyze_frame`` recompute."""
+import pytest
+
+from backend.analyzer import analyze_frame
+from backend.incremental import IncrementalAnalyzer, _diff
+from backend.parallel import analyze_parallel, shutdown_pools
+from backend.streaming import analyze_streaming
+
+DISTRIBUTIONS = ["department_distribution", "age_group_distribution", "income_group_distribution"]
+
+
+def _assert_matches(expected, actual):
+    assert _diff(expected, actual) == []
+    # Distributions are ordered like value_counts(): most common first
+    for name in DISTRIBUTIONS:
+        assert list(actual[name]) == list(expected[name]), name
+
+
+def test_incremental_reset_matches_analyze_frame(store):
+    from_frame = IncrementalAnalyzer()
+    store.subscribe(from_frame)
+    from_rows = IncrementalAnalyzer()
+    from_rows.reset(store.records())
+
+    expected = analyze_frame(store.frame())
+    _assert_matches(expected, from_frame.results())
+    _assert_matches(expected, from_rows.results())
+
+
+def test_incremental_follows_mutations(store):
+    analytics = IncrementalAnalyzer()
+    store.subscribe(analytics)
+    template = store.get(1)
+    created = store.create(lambda n: dict(template, EmployeeNumber=n, MonthlyIncome=250000, Attrition="Yes"))
+    store.update(2, {"Department": "Maintenance", "Age": 61})
+    store.delete(3)
+    store.create_many([dict(template, Age=age) for age in (19, 33, 58)], batch_rows=2)
+
+    assert created in store
+    _assert_matches(analyze_frame(store.frame()), analytics.results())
+
+
+def test_streaming_matches_analyze_frame(store):
+    # Small chunks, so results are merged across many partials
+    _assert_matches(analyze_frame(store.frame()), analyze_streaming(str(store.path), chunk_rows=97))
+
+
+@pytest.fixture
+def pools():
+    yield
+    shutdown_pools()
+
+
+def test_parallel_matches_analyze_frame(store, pools):
+    _assert_matches(analyze_frame(store.frame()), analyze_parallel(str(store.path), workers=2, partitions=5))
@@ -0,0 +1,51 @@
+"""Attrition scores and their drivers, from the committed model."""
+import math
+
+import numpy as np
+
+from backend.attrition import CATEGORICAL_FEATURES, NUMERIC_FEATURES, AttritionScorer
+
+
+def _names(drivers):
+    return [d["feature"] for d in drivers]
+
+
+def test_drivers_name_the_workers_own_category(store):
+    model = AttritionScorer().model
+    for row in store.records()[:200]:
+        drivers = model.drivers(row, top=len(model.features))
+        names = _names(drivers)
+        assert len(names) == len(set(names))
+        for name in CATEGORICAL_FEATURES:
+            reported = [n for n in names if n.split("=")[0] == name]
+            assert reported in ([], [f"{name}={row[name]}"])
+        contributions = [d["contribution"] for d in drivers]
+        assert all(c > 0 for c in contributions)
+        assert contributions == sorted(contributions, reverse=True)
+
+
+def test_drivers_sum_each_categorical_group(store):
+    model = AttritionScorer().model
+    row = next(r for r in store.records() if r["OverTime"] == "Yes")
+    contributions = model.encode([row])[0] * model.coef
+    # OverTime's one-hot columns come right after the numeric features
+    assert CATEGORICAL_FEATURES[0] == "OverTime"
+    start = len(NUMERIC_FEATURES)
+    overtime = contributions[start:start + len(model.categories["OverTime"])].sum()
+
+    drivers = {d["feature"]: d["contribution"] for d in model.drivers(row, top=len(model.features))}
+    assert "OverTime=No" not in drivers
+    if overtime > 0:
+        assert math.isclose(drivers["OverTime=Yes"], round(overtime, 4))
+    assert model.drivers(row, top=2) == model.drivers(row, top=len(model.features))[:2]
+
+
+def test_reset_from_frame_scores_like_reset_from_rows(store):
+    from_rows, from_frame = AttritionScorer(), AttritionScorer()
+    from_rows.reset(store.records())
+    from_frame.reset_frame(store.frame())
+
+    assert from_rows._scores.keys() == from_frame._scores.keys()
+    numbers = list(from_rows._scores)
+    assert [from_rows._scores[e][0] for e in numbers] == [from_frame._scores[e][0] for e in numbers]
+    assert np.allclose([from_rows._scores[e][1] for e in numbers], [from_frame._scores[e][1] for e in numbers])
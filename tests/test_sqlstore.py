@@ -0,0 +1,53 @@
+"""Migrating the CSV store to SQLite and using the result."""
+from backend.analyzer import analyze_frame
+from backend.incremental import _diff
+from backend.sqlstore import SqliteWorkerStore, migrate_csv
+
+
+def _by_number(rows):
+    return {row["EmployeeNumber"]: row for row in rows}
+
+
+def test_migration_round_trip(store, tmp_path):
+    # Journaled writes that are not in the CSV yet must be migrated too
+    store.update(1, {"Age": 52, "Skills": "Welding"})
+    store.delete(2)
+    created = store.create_many([dict(store.get(4), Name="Imported")])
+    last = store.last_employee_number()
+
+    db = tmp_path / "workers.db"
+    assert migrate_csv(store.path, db) == len(store)
+    migrated = SqliteWorkerStore(db)
+    migrated.load()
+    try:
+        assert migrated.columns == store.columns
+        assert _by_number(migrated.records()) == _by_number(store.records())
+        assert migrated.last_employee_number() == last
+        assert migrated.get(created[0])["Name"] == "Imported"
+        assert _diff(analyze_frame(store.frame()), migrated.analyze()) == []
+
+        # EmployeeNumbers continue from the CSV store's sequence
+        template = migrated.get(1)
+        assert migrated.create(lambda n: dict(template, EmployeeNumber=n)) == last + 1
+        assert list(migrated.create_many([template, template], batch_rows=1)) == [last + 2, last + 3]
+    finally:
+        migrated.close()
+
+
+def test_sqlite_writes_persist(store, tmp_path):
+    db = tmp_path / "workers.db"
+    migrate_csv(store.path, db)
+    writer = SqliteWorkerStore(db)
+    writer.load()
+    writer.update(1, {"Age": 61})
+    writer.delete(3)
+    writer.close()
+
+    reader = SqliteWorkerStore(db)
+    reader.load()
+    try:
+        assert reader.get(1)["Age"] == 61
+        assert 3 not in reader
+        assert len(reader) == len(store) - 1
+    finally:
+        reader.close()